@@ -14,24 +14,43 @@ import getpass
 import socket
 import requests
 import json
-import winreg
+import sqlite3
+import struct
+import mmap
+import zlib
+import gzip
+import queue
+import array
+import bisect
 import glob
 import subprocess
-from logging.handlers import RotatingFileHandler
-from typing import Dict, List, Optional, Tuple, Set, Any
+import concurrent.futures
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Dict, List, Optional, Tuple, Set, Any, Iterator, Callable
 from enum import Enum
-from dataclasses import dataclass
+import dataclasses
+from dataclasses import dataclass, field
 
 import psutil
-import pythoncom
-import wmi
-import win32gui
-import win32process
-import win32com.client
-import win32api
-import win32con
-import win32evtlog
-import win32evtlogutil
+
+# Windows-only modules. Without them only the platform-neutral parts (categorization,
+# title parsing, persistence) work - enough for the benchmarks to run headless.
+try:
+    import winreg
+    import pythoncom
+    import wmi
+    import win32gui
+    import win32process
+    import win32com.client
+    import win32api
+    import win32con
+    import win32evtlog
+    import win32evtlogutil
+    WIN32_AVAILABLE = True
+except ImportError:
+    WIN32_AVAILABLE = False
 from enum import Enum
 from typing import Tuple
 
@@ -351,6 +370,73 @@ class Category(Enum):
     UNPRODUCTIVE = "Unproductive"
     UNCATEGORIZED = "Uncategorized"  # ADDED: New category for uncategorized websites
 
+class ActivityEventType(Enum):
+    SESSION = "session"  # Login, logout, startup, shutdown (see ActivityEvent.kind)
+    ACTIVITY = "activity"  # One window's cumulative seconds today, from an activity log block
+    UNPRODUCTIVE_OPENED = "unproductive_opened"
+    UNPRODUCTIVE_CLOSED = "unproductive_closed"
+    BACKGROUND_VIDEO_DETECTED = "background_video_detected"
+    BACKGROUND_VIDEO_STATE = "background_video_state"  # Audio started/stopped (see ActivityEvent.playing)
+    BACKGROUND_VIDEO_STOPPED = "background_video_stopped"
+    MESSAGE = "message"  # Free text with no typed fields
+
+@dataclass
+class ActivityEvent:
+    """One line of monitor_events.jsonl - fields left as None are not written"""
+    type: ActivityEventType
+    ts: str = ""  # Local time, ISO 8601 with milliseconds; filled in when buffered
+    kind: Optional[str] = None  # SESSION: login / logout / startup / shutdown / final_report
+    app: Optional[str] = None  # Cleaned base app name
+    title: Optional[str] = None
+    key_id: Optional[int] = None  # KeyTable id, only stable within one tracked day
+    category: Optional[str] = None
+    duration: Optional[float] = None  # Seconds
+    verified: Optional[float] = None  # Seconds of audio-verified background playback
+    site: Optional[str] = None
+    playing: Optional[bool] = None
+    text: Optional[str] = None  # The line written to monitor_output.log
+
+    SESSION_KINDS = ("login", "logout", "startup", "shutdown")
+    OPTIONAL_FIELDS = ("kind", "app", "title", "key_id", "category", "duration", "verified", "site", "playing", "text")
+
+    def to_json(self) -> str:
+        record: Dict[str, Any] = {'type': self.type.value, 'ts': self.ts}
+        for name in self.OPTIONAL_FIELDS:
+            value = getattr(self, name)
+            if value is not None:
+                record[name] = value
+        return json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+
+    @classmethod
+    def from_json(cls, line: str) -> 'ActivityEvent':
+        record = json.loads(line)
+        return cls(ActivityEventType(record['type']), record.get('ts', ""),
+                   **{name: record[name] for name in cls.OPTIONAL_FIELDS if name in record})
+
+    @classmethod
+    def parse_line(cls, line: str, event_types: Optional[Set[ActivityEventType]] = None) -> Optional['ActivityEvent']:
+        """The event on one line, or None for other types (checked before parsing) and torn lines"""
+        if event_types and not any(f'"type":"{event_type.value}"' in line for event_type in event_types):
+            return None
+        try:
+            event = cls.from_json(line)
+        except (ValueError, KeyError, TypeError):
+            return None
+        return event if not event_types or event.type in event_types else None
+
+    @classmethod
+    def iter_file(cls, filepath: str, event_types: Optional[Set[ActivityEventType]] = None) -> Iterator['ActivityEvent']:
+        """Events from a JSON-lines file, skipping other types and any torn lines"""
+        with open(filepath, "r", encoding="utf-8") as f:
+            for line in f:
+                event = cls.parse_line(line, event_types)
+                if event is not None:
+                    yield event
+
+    def log_line(self) -> str:
+        """The "[YYYY-mm-dd HH:MM:SS] text" form the session parsers expect"""
+        return f"[{self.ts[:19].replace('T', ' ')}] {self.text or ''}"
+
 class AppNameCleaner:
     """Helper class to clean and format app names for better display"""
     
@@ -802,23 +888,59 @@ class CompleteEnhancedConfig:
     CLEANUP_DAYS_TO_KEEP: int = 7
     MAX_LOG_SIZE_MB: int = 10
     LOG_BACKUP_COUNT: int = 5
-    MAX_ACTIVITY_LOG_SIZE_MB: int = 50
-    
+    MAX_ACTIVITY_LOG_SIZE_MB: int = 50  # monitor_output.log / monitor_events.jsonl roll over to a segment at this size
+    ROTATE_ACTIVITY_LOG_DAILY: bool = True  # Also roll them over on the first flush of a new day
+    COMPRESS_ROTATED_LOGS: bool = True  # gzip rotated segments on a background thread
+    LOGGING_MODE: str = "queue"  # "queue" (handlers run on one listener thread) or "direct" (on the logging thread)
+    LOG_QUEUE_SIZE: int = 10000  # Records buffered for the listener before the drop policy applies
+    LOG_QUEUE_DROP_POLICY: str = "drop_new"  # "drop_new", "drop_oldest" or "block" (waits up to 1s)
+    ENABLE_EVENT_LOG: bool = True  # Write typed events to monitor_events.jsonl alongside monitor_output.log
+    LOG_FLUSH_INTERVAL: int = 10  # Seconds between background writes of the activity log buffers
+    LOG_FLUSH_MAX_LINES: int = 200  # Buffered lines that wake the flusher early
+
     # Dated Backup Settings
     DATED_BACKUP_DAYS_TO_KEEP: int = 30
     ENABLE_DATED_BACKUPS: bool = True
+    DATED_BACKUP_FORMAT: str = "gzip"  # "gzip" (backup_*.jsonl.gz), "json" (app_times_/background_video_ files) or "binary" (day_*.bin)
+
+    # Weekly/Monthly Rollup Settings
+    ENABLE_PERIOD_ROLLUPS: bool = True  # Fold each closed day into logs/rollups/week_*.json and month_*.json
+    ROLLUP_TOP_TITLES: int = 25  # Titles listed in a weekly/monthly report
+
+    # Day Rollover Settings
+    ENABLE_DAY_ROLLOVER: bool = True  # Seal the day's counters at local midnight and start the trackers fresh
+
+    # Schema Migration Settings
+    SCHEMA_BULK_MIGRATION: bool = False  # Upgrade every old artefact at startup instead of lazily on first read
+    SCHEMA_MIGRATION_WORKERS: int = 4
+
+    # Tracking Data Persistence Settings
+    PERSISTENCE_MODE: str = "json"  # "json" (full rewrite every save) or "journal" (append changed counters, opt-in)
+    JOURNAL_COMPACT_INTERVAL: int = 3600  # Seconds between folding the journal into the snapshot files
+    JOURNAL_MAX_SIZE_MB: int = 5  # Compact early once the journal grows past this
+    PERSISTENCE_BACKEND: str = "files"  # "files" (JSON snapshot/journal) or "sqlite"
     
     # Missed Report Settings
     MISSED_REPORT_DAYS_BACK: int = 3
     ENABLE_MISSED_REPORT_RECOVERY: bool = True
 
+    # Foreground Tracking Settings
+    FOREGROUND_TRACKING_MODE: str = "poll"  # "poll" (sample every SLEEP_INTERVAL) or "event" (SetWinEventHook, opt-in)
+    EVENT_RESYNC_INTERVAL: int = 30  # Seconds between safety re-samples in event mode
+
+    # Title Canonicalization Settings
+    TITLE_CANONICALIZATION: bool = True
+    TITLE_CANONICAL_EXTRA_RULES: List[Tuple[str, str]] = field(default_factory=list)  # (regex, replacement) pairs
+
     LOG_DIR: str = os.path.join(os.getcwd(), "logs")
 
     def __post_init__(self):
         os.makedirs(self.LOG_DIR, exist_ok=True)
         self.ACTIVITY_LOG = os.path.join(self.LOG_DIR, "monitor_output.log")
+        self.ACTIVITY_EVENTS_LOG = os.path.join(self.LOG_DIR, "monitor_events.jsonl")
         self.DEBUG_LOG = os.path.join(self.LOG_DIR, "startup_debug.log")
         self.EMAIL_TRACK_FILE = os.path.join(self.LOG_DIR, "last_productivity_email_sent.txt")
+        self.SQLITE_DB_FILE = os.path.join(self.LOG_DIR, "activity_monitor.db")
 
         if getattr(sys, 'frozen', False):
             self.CONFIG_PATH = os.path.join(os.path.dirname(sys.executable), "config.txt")
@@ -835,10 +957,752 @@ class CompleteEnhancedConfig:
             self.SLEEP_INTERVAL = 1
         if self.LOG_INTERVAL < 10:
             self.LOG_INTERVAL = 60
+        if self.FOREGROUND_TRACKING_MODE not in ("event", "poll"):
+            self.FOREGROUND_TRACKING_MODE = "poll"
+        if self.EVENT_RESYNC_INTERVAL < 1:
+            self.EVENT_RESYNC_INTERVAL = 30
+        if self.PERSISTENCE_MODE not in ("journal", "json"):
+            self.PERSISTENCE_MODE = "json"
+        if self.JOURNAL_COMPACT_INTERVAL < 60:
+            self.JOURNAL_COMPACT_INTERVAL = 3600
+        if self.JOURNAL_MAX_SIZE_MB < 1:
+            self.JOURNAL_MAX_SIZE_MB = 5
+        if self.PERSISTENCE_BACKEND not in ("files", "sqlite"):
+            self.PERSISTENCE_BACKEND = "files"
+        if self.DATED_BACKUP_FORMAT not in ("gzip", "json", "binary"):
+            self.DATED_BACKUP_FORMAT = "gzip"
+        if self.LOGGING_MODE not in ("queue", "direct"):
+            self.LOGGING_MODE = "queue"
+        if self.LOG_QUEUE_SIZE < 100:
+            self.LOG_QUEUE_SIZE = 10000
+        if self.LOG_QUEUE_DROP_POLICY not in BoundedQueueHandler.DROP_POLICIES:
+            self.LOG_QUEUE_DROP_POLICY = "drop_new"
+        if self.LOG_FLUSH_INTERVAL < 1:
+            self.LOG_FLUSH_INTERVAL = 10
+        if self.LOG_FLUSH_MAX_LINES < 1:
+            self.LOG_FLUSH_MAX_LINES = 200
+        if self.MAX_ACTIVITY_LOG_SIZE_MB < 1:
+            self.MAX_ACTIVITY_LOG_SIZE_MB = 50
+        if self.ROLLUP_TOP_TITLES < 1:
+            self.ROLLUP_TOP_TITLES = 25
+        if self.SCHEMA_MIGRATION_WORKERS < 1:
+            self.SCHEMA_MIGRATION_WORKERS = 4
         os.makedirs(self.LOG_DIR, exist_ok=True)
 
+class SQLiteTrackingStore:
+    """SQLite backend for per-day counters, focus segments, session events and the report ledger
+
+    One connection per database file is shared by the persistence class and the activity
+    logger (see for_path). WAL mode lets reports read while the monitor writes; every
+    save is a single transaction.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS app_times (
+            day TEXT NOT NULL,
+            app TEXT NOT NULL,
+            seconds REAL NOT NULL,
+            PRIMARY KEY (day, app)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS background_video_times (
+            day TEXT NOT NULL,
+            site TEXT NOT NULL,
+            seconds REAL NOT NULL DEFAULT 0,
+            verified_seconds REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, site)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS focus_segments (
+            start REAL NOT NULL,
+            end REAL NOT NULL,
+            day TEXT NOT NULL,
+            app TEXT NOT NULL,
+            category TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_focus_segments_start ON focus_segments (start);
+
+        CREATE TABLE IF NOT EXISTS session_events (
+            ts REAL NOT NULL,
+            day TEXT NOT NULL,
+            event TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_session_events_day ON session_events (day, ts);
+
+        CREATE TABLE IF NOT EXISTS sent_reports (
+            report_date TEXT NOT NULL,
+            report_type TEXT NOT NULL,
+            sent_at REAL NOT NULL,
+            PRIMARY KEY (report_date, report_type)
+        ) WITHOUT ROWID;
+    """
+
+    _instances: Dict[str, 'SQLiteTrackingStore'] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, db_path: str):
+        self.logger = logging.getLogger(__name__)
+        self.db_path = db_path
+        self.is_new = not os.path.exists(db_path)
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+
+    @classmethod
+    def for_path(cls, db_path: str) -> 'SQLiteTrackingStore':
+        """Shared store per database file"""
+        with cls._instances_lock:
+            store = cls._instances.get(db_path)
+            if store is None:
+                store = cls._instances[db_path] = cls(db_path)
+            return store
+
+    def _transaction(self, statements: List[Tuple[str, List[tuple]]]):
+        """Run several executemany() batches in one transaction"""
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                for sql, rows in statements:
+                    if rows:
+                        self.conn.executemany(sql, rows)
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def save_day(self, day: str, app_times: Dict[str, Optional[float]],
+                 bg_video_times: Dict[str, Optional[float]], verified_times: Dict[str, Optional[float]],
+                 segments: Optional[List[Tuple[float, float, str, Optional[Category]]]] = None):
+        """Upsert changed counters (None deletes a key) and append new focus segments"""
+        statements = [
+            ("INSERT INTO app_times (day, app, seconds) VALUES (?, ?, ?) "
+             "ON CONFLICT (day, app) DO UPDATE SET seconds = excluded.seconds",
+             [(day, app, secs) for app, secs in app_times.items() if secs is not None]),
+            ("DELETE FROM app_times WHERE day = ? AND app = ?",
+             [(day, app) for app, secs in app_times.items() if secs is None]),
+            ("INSERT INTO background_video_times (day, site, seconds) VALUES (?, ?, ?) "
+             "ON CONFLICT (day, site) DO UPDATE SET seconds = excluded.seconds",
+             [(day, site, secs) for site, secs in bg_video_times.items() if secs is not None]),
+            ("INSERT INTO background_video_times (day, site, verified_seconds) VALUES (?, ?, ?) "
+             "ON CONFLICT (day, site) DO UPDATE SET verified_seconds = excluded.verified_seconds",
+             [(day, site, secs) for site, secs in verified_times.items() if secs is not None]),
+            ("DELETE FROM background_video_times WHERE day = ? AND site = ?",
+             [(day, site) for site, secs in bg_video_times.items() if secs is None]),
+            ("INSERT INTO focus_segments (start, end, day, app, category) VALUES (?, ?, ?, ?, ?)",
+             [(start, end, datetime.datetime.fromtimestamp(start).strftime('%Y-%m-%d'), app,
+               category.value if category else None) for start, end, app, category in (segments or [])]),
+        ]
+        self._transaction(statements)
+
+    def load_day(self, day: str) -> Tuple[Dict[str, float], Dict[str, float], Dict[str, float]]:
+        """(app_times, background_video_times, verified_playing_times) for one day"""
+        with self.lock:
+            app_rows = self.conn.execute("SELECT app, seconds FROM app_times WHERE day = ?", (day,)).fetchall()
+            bg_rows = self.conn.execute(
+                "SELECT site, seconds, verified_seconds FROM background_video_times WHERE day = ?", (day,)).fetchall()
+        return ({app: secs for app, secs in app_rows},
+                {site: secs for site, secs, _ in bg_rows},
+                {site: verified for site, _, verified in bg_rows if verified})
+
+    def days_with_data(self, start_day: str, end_day: str) -> List[str]:
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT DISTINCT day FROM app_times WHERE day BETWEEN ? AND ? ORDER BY day", (start_day, end_day)).fetchall()
+        return [row[0] for row in rows]
+
+    def app_times_between(self, start_day: str, end_day: str) -> Dict[str, Dict[str, float]]:
+        """Per-day app times for an inclusive date range - one indexed range scan"""
+        days: Dict[str, Dict[str, float]] = {}
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT day, app, seconds FROM app_times WHERE day BETWEEN ? AND ? ORDER BY day",
+                (start_day, end_day)).fetchall()
+        for day, app, secs in rows:
+            days.setdefault(day, {})[app] = secs
+        return days
+
+    def background_times_between(self, start_day: str,
+                                 end_day: str) -> Dict[str, Tuple[Dict[str, float], Dict[str, float]]]:
+        """Per-day (background_video_times, verified_playing_times) for an inclusive date range"""
+        days: Dict[str, Tuple[Dict[str, float], Dict[str, float]]] = {}
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT day, site, seconds, verified_seconds FROM background_video_times "
+                "WHERE day BETWEEN ? AND ? ORDER BY day", (start_day, end_day)).fetchall()
+        for day, site, secs, verified in rows:
+            bg_video_times, verified_times = days.setdefault(day, ({}, {}))
+            bg_video_times[site] = secs
+            if verified:
+                verified_times[site] = verified
+        return days
+
+    def append_session_events(self, events: List[Tuple[float, str]]):
+        self._transaction([(
+            "INSERT INTO session_events (ts, day, event) VALUES (?, ?, ?)",
+            [(ts, datetime.datetime.fromtimestamp(ts).strftime('%Y-%m-%d'), event) for ts, event in events]
+        )])
+
+    def session_events_for_day(self, day: str) -> List[Tuple[float, str]]:
+        with self.lock:
+            return self.conn.execute(
+                "SELECT ts, event FROM session_events WHERE day = ? ORDER BY ts", (day,)).fetchall()
+
+    def mark_report_sent(self, report_date: str, report_type: str):
+        self._transaction([(
+            "INSERT OR REPLACE INTO sent_reports (report_date, report_type, sent_at) VALUES (?, ?, ?)",
+            [(report_date, report_type, time.time())]
+        )])
+
+    def import_sent_reports(self, entries: List[Tuple[str, str, float]]):
+        """Seed the ledger with (report_date, report_type, sent_at) rows; existing rows win"""
+        self._transaction([(
+            "INSERT OR IGNORE INTO sent_reports (report_date, report_type, sent_at) VALUES (?, ?, ?)", entries
+        )])
+
+    def was_report_sent(self, report_date: str, report_type: str) -> bool:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM sent_reports WHERE report_date = ? AND report_type = ?",
+                (report_date, report_type)).fetchone()
+        return row is not None
+
+    def delete_days_before(self, cutoff_day: str) -> int:
+        """Drop counters, segments and events older than cutoff_day"""
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                removed = self.conn.execute("DELETE FROM app_times WHERE day < ?", (cutoff_day,)).rowcount
+                self.conn.execute("DELETE FROM background_video_times WHERE day < ?", (cutoff_day,))
+                self.conn.execute("DELETE FROM focus_segments WHERE day < ?", (cutoff_day,))
+                self.conn.execute("DELETE FROM session_events WHERE day < ?", (cutoff_day,))
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return removed
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+        with self._instances_lock:
+            self._instances.pop(self.db_path, None)
+
+class BinaryDayFile:
+    """Compact binary dated backup, read through mmap
+
+    Layout (little-endian, version 2):
+        header      HEADER struct - magic, version, flags, day ordinal, counts, section offsets
+        apps        app_count counters, longest first; app i is string i
+        background  bg_count x (string id u32, seconds counter, verified seconds counter)
+        buckets     only with FLAG_HAS_BUCKETS - per category column (Productive / Unproductive /
+                    Uncategorized), runs of active minutes: RUN (first minute u16, minute count u16,
+                    column u8) followed by one u8 of focused seconds per minute. Idle minutes take no space
+        strings     (string_count + 1) offsets into the NUL-separated UTF-8 blob that follows
+
+    Counters use the narrowest width that holds the day: whole seconds as u16, hundredths of a
+    second as u32 (FLAG_CENTISECONDS), or f64 (FLAG_FLOAT_COUNTERS). String offsets are u16
+    when the blob is small enough (FLAG_SHORT_OFFSETS), u32 otherwise. Every title is stored once
+    in the string table. Totals and minute buckets are read without decoding a single string,
+    so scanning many days only pages in the small sections; a full read decodes the whole blob
+    in one call. Version 1 files (u32 id + f64 per app, dense MINUTES x 3 buckets) stay readable.
+    """
+
+    MAGIC = b'AMDF'
+    VERSION = 2
+    FLAG_HAS_BUCKETS = 0x1
+    FLAG_CENTISECONDS = 0x2
+    FLAG_FLOAT_COUNTERS = 0x4
+    FLAG_SHORT_OFFSETS = 0x8
+    HEADER = struct.Struct('<4sHHIIIIIII')
+    V1_APP_RECORD = struct.Struct('<Id')
+    V1_BG_RECORD = struct.Struct('<Idd')
+    RUN = struct.Struct('<HHB')
+    MINUTES = 24 * 60
+    BUCKET_CATEGORIES = (Category.PRODUCTIVE, Category.UNPRODUCTIVE, Category.UNCATEGORIZED)
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            (magic, self.version, self.flags, ordinal, self.string_count, self.app_count, self.bg_count,
+             self._buckets_offset, self._strings_offset, self._blob_offset) = self.HEADER.unpack_from(self._map, 0)
+            if magic != self.MAGIC or self.version not in (1, self.VERSION):
+                raise ValueError(f"Not a version 1 or {self.VERSION} binary day file: {path}")
+        except Exception:
+            self.close()
+            raise
+
+        self._offsets = struct.Struct('<HH' if self.flags & self.FLAG_SHORT_OFFSETS else '<II')
+        if self.version == 1:
+            self._app_record, self._bg_record, self._unit = self.V1_APP_RECORD, self.V1_BG_RECORD, 1.0
+        else:
+            code, self._unit = self._counter_code(self.flags)
+            self._app_record = struct.Struct('<' + code)
+            self._bg_record = struct.Struct('<I' + code * 2)
+
+        self.day = datetime.date.fromordinal(ordinal).isoformat()
+        self._apps_offset = self.HEADER.size
+        self._bg_offset = self._apps_offset + self.app_count * self._app_record.size
+        self._strings: Dict[int, str] = {}
+        self._all_strings: Optional[List[str]] = None
+
+    def __enter__(self) -> 'BinaryDayFile':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if getattr(self, '_map', None) is not None:
+            self._map.close()
+            self._map = None
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    @classmethod
+    def _counter_code(cls, flags: int) -> Tuple[str, float]:
+        """(struct code, seconds per unit) of the counters in a version 2 file"""
+        if flags & cls.FLAG_FLOAT_COUNTERS:
+            return 'd', 1.0
+        if flags & cls.FLAG_CENTISECONDS:
+            return 'I', 0.01
+        return 'H', 1.0
+
+    @classmethod
+    def _counter_flags(cls, values: List[float]) -> int:
+        """Flags for the narrowest counter that holds every value (see _counter_code)"""
+        if all(0 <= value <= 0xFFFF and value == int(value) for value in values):
+            return 0
+        if all(0 <= value and round(value * 100) <= 0xFFFFFFFF for value in values):
+            return cls.FLAG_CENTISECONDS
+        return cls.FLAG_FLOAT_COUNTERS
+
+    @property
+    def has_buckets(self) -> bool:
+        return bool(self.flags & self.FLAG_HAS_BUCKETS)
+
+    def string(self, string_id: int) -> str:
+        if self._all_strings is not None:
+            return self._all_strings[string_id]
+        text = self._strings.get(string_id)
+        if text is None:
+            position = self._strings_offset + string_id * (self._offsets.size // 2)
+            start, end = self._offsets.unpack_from(self._map, position)
+            text = self._strings[string_id] = self._map[self._blob_offset + start:self._blob_offset + end - 1].decode('utf-8')
+        return text
+
+    def strings(self) -> List[str]:
+        """The whole string table, decoded in one pass"""
+        if self._all_strings is None:
+            self._all_strings = self._map[self._blob_offset:].decode('utf-8').split('\x00') if self.string_count else []
+        return self._all_strings
+
+    def _app_records(self, limit: Optional[int] = None) -> Iterator[Tuple[int, float]]:
+        count = self.app_count if limit is None else min(limit, self.app_count)
+        records = self._app_record.iter_unpack(
+            self._map[self._apps_offset:self._apps_offset + count * self._app_record.size])
+        if self.version == 1:
+            return records
+        return ((string_id, counter * self._unit) for string_id, (counter,) in enumerate(records))
+
+    def total_seconds(self) -> float:
+        return sum(seconds for _, seconds in self._app_records())
+
+    def app_times(self) -> Dict[str, float]:
+        strings = self.strings()
+        return {strings[string_id]: seconds for string_id, seconds in self._app_records()}
+
+    def top_apps(self, limit: int = 10) -> List[Tuple[str, float]]:
+        """Records are stored longest first, so this only reads `limit` of them"""
+        return [(self.string(string_id), seconds) for string_id, seconds in self._app_records(limit)]
+
+    def background_times(self) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """(background_video_times, verified_playing_times)"""
+        bg_video_times: Dict[str, float] = {}
+        verified_times: Dict[str, float] = {}
+        end = self._bg_offset + self.bg_count * self._bg_record.size
+        for string_id, seconds, verified in self._bg_record.iter_unpack(self._map[self._bg_offset:end]):
+            site = self.string(string_id)
+            if seconds:
+                bg_video_times[site] = seconds * self._unit
+            if verified:
+                verified_times[site] = verified * self._unit
+        return bg_video_times, verified_times
+
+    def category_minutes(self) -> Dict[str, bytes]:
+        """Per category, one byte of focused seconds for every minute of the day ({} without buckets)"""
+        if not self.has_buckets:
+            return {}
+        width = len(self.BUCKET_CATEGORIES)
+        if self.version == 1:
+            buckets = self._map[self._buckets_offset:self._buckets_offset + self.MINUTES * width]
+        else:
+            buckets = bytearray(self.MINUTES * width)
+            position = self._buckets_offset
+            while position < self._strings_offset:
+                first_minute, minutes, column = self.RUN.unpack_from(self._map, position)
+                position += self.RUN.size
+                start = first_minute * width + column
+                buckets[start:start + minutes * width:width] = self._map[position:position + minutes]
+                position += minutes
+        return {category.value: bytes(buckets[column::width]) for column, category in enumerate(self.BUCKET_CATEGORIES)}
+
+    def category_totals(self) -> Dict[str, float]:
+        return {name: float(sum(minutes)) for name, minutes in self.category_minutes().items()}
+
+    @classmethod
+    def encode_buckets(cls, minute_buckets: bytes) -> bytes:
+        """Run-length encode dense MINUTES x 3 buckets per category, keeping only the active minutes"""
+        width = len(cls.BUCKET_CATEGORIES)
+        runs = []
+        for column in range(width):
+            seconds = minute_buckets[column::width]
+            minute = 0
+            while minute < cls.MINUTES:
+                if not seconds[minute]:
+                    minute += 1
+                    continue
+                first_minute = minute
+                while minute < cls.MINUTES and seconds[minute]:
+                    minute += 1
+                runs.append(cls.RUN.pack(first_minute, minute - first_minute, column))
+                runs.append(seconds[first_minute:minute])
+        return b''.join(runs)
+
+    @classmethod
+    def buckets_from_timeline(cls, timeline: 'ActivityTimeline', day: str) -> bytes:
+        """Fold a day's focus segments into per-minute category buckets"""
+        width = len(cls.BUCKET_CATEGORIES)
+        columns = {category: column for column, category in enumerate(cls.BUCKET_CATEGORIES)}
+        seconds = [0.0] * (cls.MINUTES * width)
+
+        day_start = datetime.datetime.strptime(day, '%Y-%m-%d')
+        start_ts = day_start.timestamp()
+        end_ts = (day_start + datetime.timedelta(days=1)).timestamp()
+        for seg_start, seg_end, _, category in timeline.iter_segments(start_ts, end_ts):
+            column = columns.get(category)
+            if column is None:
+                continue
+            cursor = seg_start
+            while cursor < seg_end:
+                moment = datetime.datetime.fromtimestamp(cursor)
+                minute_end = (moment.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)).timestamp()
+                piece_end = min(seg_end, minute_end)
+                seconds[(moment.hour * 60 + moment.minute) * width + column] += piece_end - cursor
+                cursor = piece_end
+
+        return bytes(min(255, int(round(value))) for value in seconds)
+
+    @classmethod
+    def write(cls, path: str, day: str, app_times: Dict[str, float],
+              bg_video_times: Optional[Dict[str, float]] = None,
+              verified_times: Optional[Dict[str, float]] = None,
+              minute_buckets: Optional[bytes] = None) -> int:
+        """Write one day atomically (temp file + rename) and return its size in bytes"""
+        bg_video_times = bg_video_times or {}
+        verified_times = verified_times or {}
+
+        # App i is string i, so app titles go in first and are never merged with each other
+        apps = sorted(app_times.items(), key=lambda item: item[1], reverse=True)
+        strings: List[bytes] = [str(app).replace('\x00', '').encode('utf-8') for app, _ in apps]  # NUL separates strings
+        string_ids: Dict[bytes, int] = {}
+        for string_id, encoded in enumerate(strings):
+            string_ids.setdefault(encoded, string_id)
+
+        def intern(text: str) -> int:
+            encoded = text.replace('\x00', '').encode('utf-8')
+            string_id = string_ids.get(encoded)
+            if string_id is None:
+                string_id = string_ids[encoded] = len(strings)
+                strings.append(encoded)
+            return string_id
+
+        sites = sorted(set(bg_video_times) | set(verified_times))
+        bg_values = [(float(bg_video_times.get(site, 0.0)), float(verified_times.get(site, 0.0))) for site in sites]
+        flags = cls._counter_flags([float(seconds) for _, seconds in apps] +
+                                   [seconds for values in bg_values for seconds in values])
+        code, unit = cls._counter_code(flags)
+        scale = (lambda seconds: int(round(seconds / unit))) if code != 'd' else float
+        app_section = struct.pack(f'<{len(apps)}{code}', *(scale(float(seconds)) for _, seconds in apps))
+        bg_record = struct.Struct('<I' + code * 2)
+        bg_section = b''.join(bg_record.pack(intern(str(site)), scale(seconds), scale(verified))
+                              for site, (seconds, verified) in zip(sites, bg_values))
+
+        bucket_section = b''  # The header offsets let readers skip a section that is not there
+        if minute_buckets is not None and len(minute_buckets) == cls.MINUTES * len(cls.BUCKET_CATEGORIES):
+            flags |= cls.FLAG_HAS_BUCKETS
+            bucket_section = cls.encode_buckets(minute_buckets)
+
+        # Each string is followed by a NUL separator, so offsets[i + 1] - 1 is where string i ends
+        ends = [0]
+        for encoded in strings:
+            ends.append(ends[-1] + len(encoded) + 1)
+        if ends[-1] <= 0xFFFF:
+            flags |= cls.FLAG_SHORT_OFFSETS
+        offsets = array.array('H' if flags & cls.FLAG_SHORT_OFFSETS else 'I', ends)
+        if sys.byteorder != 'little':
+            offsets.byteswap()
+
+        buckets_offset = cls.HEADER.size + len(app_section) + len(bg_section)
+        strings_offset = buckets_offset + len(bucket_section)
+        blob_offset = strings_offset + len(offsets) * offsets.itemsize
+        header = cls.HEADER.pack(cls.MAGIC, cls.VERSION, flags,
+                                 datetime.datetime.strptime(day, '%Y-%m-%d').date().toordinal(),
+                                 len(strings), len(apps), len(sites), buckets_offset, strings_offset, blob_offset)
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            for chunk in (header, app_section, bg_section, bucket_section, offsets.tobytes(), b'\x00'.join(strings)):
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+        return os.path.getsize(path)
+
+@dataclass(frozen=True)
+class TrackingSnapshot:
+    """Counters captured for one save - copied out of the trackers, never mutated afterwards"""
+    date: str
+    taken_at: float
+    app_times: Dict[str, float]
+    bg_video_times: Dict[str, float]
+    verified_times: Dict[str, float]
+    has_background: bool
+    timeline: Optional['ActivityTimeline'] = None  # Append-only with its own lock; read for new segments / buckets
+    sealed: bool = False  # Final counters of a day closed by DayRolloverManager
+
+class PersistedSchema:
+    """Schema versions and migrations for the JSON artefacts written to logs/
+
+    Every payload carries a "schema_version" field. Readers pass what they loaded through
+    upgrade(), which applies the registered migrations one version at a time, so old files
+    are upgraded lazily the first time they are read. Files written before versioning
+    existed count as version 0; a file from a newer build is refused rather than misread.
+    """
+
+    VERSION_KEY = "schema_version"
+    CURRENT_VERSIONS = {
+        'app_times': 1,         # app_times_data.json and daily_backups/app_times_<date>.json
+        'background_video': 1,  # background_video_data.json and daily_backups/background_video_<date>.json
+        'sent_reports': 1,      # sent_reports.json (missed-report ledger)
+        'email_timestamp': 1,   # last_productivity_email_sent.txt
+        'rollup': 1,            # rollups/week_*.json and month_*.json
+    }
+    MIGRATIONS: Dict[Tuple[str, int], Callable[[Dict[str, Any]], Dict[str, Any]]] = {}
+
+    @classmethod
+    def register(cls, kind: str, from_version: int):
+        """Decorator: the function upgrades a `kind` payload from `from_version` to the next version"""
+        def decorator(migration):
+            cls.MIGRATIONS[(kind, from_version)] = migration
+            return migration
+        return decorator
+
+    @classmethod
+    def stamp(cls, kind: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        data[cls.VERSION_KEY] = cls.CURRENT_VERSIONS[kind]
+        return data
+
+    @classmethod
+    def version_of(cls, data: Dict[str, Any]) -> int:
+        return int(data.get(cls.VERSION_KEY, 0))
+
+    @classmethod
+    def upgrade(cls, kind: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Bring a payload up to the current version; raises ValueError if that is not possible"""
+        version, target = cls.version_of(data), cls.CURRENT_VERSIONS[kind]
+        if version > target:
+            raise ValueError(f"{kind} schema version {version} is newer than this build supports ({target})")
+        while version < target:
+            migration = cls.MIGRATIONS.get((kind, version))
+            if migration is None:
+                raise ValueError(f"No migration registered for {kind} schema version {version}")
+            data = migration(dict(data))
+            version += 1
+            data[cls.VERSION_KEY] = version
+        return data
+
+    @classmethod
+    def read_plain(cls, path: str, kind: str) -> Tuple[Dict[str, Any], int]:
+        """(upgraded payload, version on disk) for a plain JSON artefact; ({}, current) if missing"""
+        if not os.path.exists(path):
+            return {}, cls.CURRENT_VERSIONS[kind]
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read().strip()
+        if kind == 'email_timestamp' and not text.startswith('{'):
+            data: Dict[str, Any] = {'last_sent': text}  # Bare float written before versioning
+        else:
+            data = json.loads(text) if text else {}
+        version = cls.version_of(data)
+        return cls.upgrade(kind, data), version
+
+    @classmethod
+    def write_plain(cls, path: str, kind: str, data: Dict[str, Any]):
+        """Stamp and atomically write a plain JSON artefact"""
+        temp_path = path + '.tmp'
+        cls.write_temp_file(temp_path, json.dumps(cls.stamp(kind, data), indent=2).encode('utf-8'))
+        cls.commit_temp_file(temp_path, path)
+
+    @staticmethod
+    def write_temp_file(temp_path: str, payload: bytes):
+        with open(temp_path, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+
+    @staticmethod
+    def commit_temp_file(temp_path: str, filepath: str, keep_previous: bool = False):
+        """Move a fsynced temp file into place, optionally keeping the current file as .prev"""
+        if keep_previous and os.path.exists(filepath):
+            os.replace(filepath, filepath + '.prev')
+        os.replace(temp_path, filepath)
+
+        if os.name != 'nt':
+            # Make the renames themselves durable (directories cannot be opened on Windows)
+            dir_fd = os.open(os.path.dirname(filepath) or '.', os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+
+
+@PersistedSchema.register('app_times', 0)
+def _migrate_app_times_v0(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Unversioned app times: counters coerced to float, date and totals filled in"""
+    app_times = {str(app): float(secs) for app, secs in (data.get('app_times') or {}).items()}
+    data['app_times'] = app_times
+    if not data.get('date'):
+        saved_at = data.get('last_updated') or data.get('timestamp')
+        if saved_at:
+            data['date'] = datetime.datetime.fromtimestamp(float(saved_at)).strftime('%Y-%m-%d')
+    data['total_apps'] = len(app_times)
+    data['total_time'] = sum(app_times.values())
+    return data
+
+
+@PersistedSchema.register('background_video', 0)
+def _migrate_background_video_v0(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Unversioned background video data: both maps present and float-valued"""
+    for name in ('background_video_times', 'verified_playing_times'):
+        data[name] = {str(site): float(secs) for site, secs in (data.get(name) or {}).items()}
+    data['total_sites'] = len(data['background_video_times'])
+    data['total_bg_time'] = sum(data['background_video_times'].values())
+    return data
+
+
+@PersistedSchema.register('sent_reports', 0)
+def _migrate_sent_reports_v0(data: Dict[str, Any]) -> Dict[str, Any]:
+    """The ledger used to be {date: {type: entry}} at the top level; it now lives under 'reports'"""
+    return {'reports': {date: reports for date, reports in data.items() if isinstance(reports, dict)}}
+
+
+@PersistedSchema.register('email_timestamp', 0)
+def _migrate_email_timestamp_v0(data: Dict[str, Any]) -> Dict[str, Any]:
+    """The timestamp file used to hold a bare time.time() value"""
+    return {'last_sent': float(data.get('last_sent') or 0.0)}
+
+
+@PersistedSchema.register('rollup', 0)
+def _migrate_rollup_v0(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Rollups written before versioning have the same layout"""
+    return data
+
+
+class SchemaMigrator:
+    """Bulk-upgrades persisted artefacts on a thread pool, so later reads find them current
+
+    The live snapshot files and today's dated backup are left to the lazy path - the
+    PersistenceWriter may be rewriting them while this runs.
+    """
+
+    def __init__(self, persistence: 'CompleteEnhancedProductivityDataPersistence', max_workers: int = 4):
+        self.persistence = persistence
+        self.max_workers = max_workers
+        self.logger = logging.getLogger(__name__)
+        self.stats = {'checked': 0, 'migrated': 0, 'failed': 0}
+        self.stats_lock = threading.Lock()
+
+    def artefacts(self) -> List[Tuple[str, str]]:
+        """(path, schema kind) for every versioned artefact that may be migrated now"""
+        config = self.persistence.config
+        today = datetime.datetime.now().strftime('%Y-%m-%d')
+        found = []
+        for pattern, kind in (("app_times_*.json", 'app_times'), ("background_video_*.json", 'background_video')):
+            for path in glob.glob(os.path.join(self.persistence.dated_backup_dir, pattern)):
+                if today not in os.path.basename(path):
+                    found.append((path, kind))
+        if self.persistence.rollups:
+            found.extend((path, 'rollup') for path in glob.glob(os.path.join(self.persistence.rollups.rollup_dir, "*.json")))
+        for path, kind in ((os.path.join(config.LOG_DIR, "sent_reports.json"), 'sent_reports'),
+                           (config.EMAIL_TRACK_FILE, 'email_timestamp')):
+            if os.path.exists(path):
+                found.append((path, kind))
+        return sorted(found)
+
+    def migrate_file(self, path: str, kind: str) -> bool:
+        """Rewrite one artefact at the current schema version; returns True if it was upgraded"""
+        if kind in ('sent_reports', 'email_timestamp'):
+            data, version = PersistedSchema.read_plain(path, kind)
+            if version >= PersistedSchema.CURRENT_VERSIONS[kind]:
+                return False
+            PersistedSchema.write_plain(path, kind, data)
+            return True
+
+        rollup_lock = self.persistence.rollups.lock if kind == 'rollup' else None
+        if rollup_lock:
+            rollup_lock.acquire()
+        try:
+            _, data = self.persistence._read_snapshot(path)
+            if PersistedSchema.version_of(data) >= PersistedSchema.CURRENT_VERSIONS[kind]:
+                return False
+            self.persistence._save_json_file(path, PersistedSchema.upgrade(kind, data))
+            return True
+        finally:
+            if rollup_lock:
+                rollup_lock.release()
+
+    def _migrate_counted(self, path: str, kind: str):
+        try:
+            migrated = self.migrate_file(path, kind)
+            outcome = 'migrated' if migrated else None
+        except Exception as e:
+            self.logger.warning(f"⚠️  Could not migrate {path}: {e}")
+            outcome = 'failed'
+        with self.stats_lock:
+            self.stats['checked'] += 1
+            if outcome:
+                self.stats[outcome] += 1
+
+    def run(self) -> Dict[str, int]:
+        artefacts = self.artefacts()
+        self.stats = {'checked': 0, 'migrated': 0, 'failed': 0}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers,
+                                                   thread_name_prefix="SchemaMigrator") as pool:
+            list(pool.map(lambda artefact: self._migrate_counted(*artefact), artefacts))
+        if self.stats['migrated'] or self.stats['failed']:
+            self.logger.info(f"🔄 Schema migration: {self.stats}")
+        return dict(self.stats)
+
+    def start(self) -> threading.Thread:
+        """Run the bulk migration on a daemon thread"""
+        thread = threading.Thread(target=self.run, name="SchemaMigrator", daemon=True)
+        thread.start()
+        return thread
+
 class CompleteEnhancedProductivityDataPersistence:
     """Complete persistence with log management and dated backups for missed reports"""
+
+    SNAPSHOT_KEY = "_snapshot"  # Last key of every snapshot: {"generation", "crc32", "length"} of the bytes before it
+    SNAPSHOT_MAGIC = "AMSNAP1"  # Header line used by older builds: "<magic> <generation> <crc32 hex> <body length>"
+    GZIP_BACKUP_FORMAT = "activity-monitor-dated-backup"
+    GZIP_SECTIONS = {'a': 'app', 'b': 'background', 'v': 'verified'}
     
     def __init__(self, config: CompleteEnhancedConfig):
         self.config = config
@@ -853,24 +1717,92 @@ class CompleteEnhancedProductivityDataPersistence:
         self.dated_backup_dir = os.path.join(config.LOG_DIR, "daily_backups")
         if config.ENABLE_DATED_BACKUPS:
             os.makedirs(self.dated_backup_dir, exist_ok=True)
-        
+
+        # Journal mode: each save appends only the counters that changed; the two JSON files
+        # above become the compacted snapshot the journal is replayed on top of
+        self.journal_file = os.path.join(config.LOG_DIR, "tracking_journal.jsonl")
+        self._journal_date: Optional[str] = None
+        self._last_saved: Dict[str, Dict[str, float]] = {'a': {}, 'b': {}, 'v': {}}
+        self._last_compaction = time.time()
+        self.write_stats = {'journal_records': 0, 'journal_bytes': 0, 'snapshot_bytes': 0, 'compactions': 0,
+                            'schema_upgrades': 0}
+        self._generations: Dict[str, int] = {}  # Last snapshot generation written/loaded per file
+
+        # Binary dated backups fold the tracker's timeline into per-minute buckets; journal
+        # compactions run without a tracker, so keep the last one seen
+        self._timeline: Optional['ActivityTimeline'] = None
+
+        # Optional SQLite backend - replaces the JSON snapshot/journal and dated backups
+        self.store: Optional[SQLiteTrackingStore] = None
+        self._segments_saved_until = 0.0
+        if config.PERSISTENCE_BACKEND == "sqlite":
+            self.store = SQLiteTrackingStore.for_path(config.SQLITE_DB_FILE)
+            if self.store.is_new:
+                self._import_dated_backups_into_store()
+
+        # Weekly/monthly rollups - a day is folded in when the first snapshot of the next day arrives
+        self.rollups: Optional[HistoryRollupIndex] = HistoryRollupIndex(self) if config.ENABLE_PERIOD_ROLLUPS else None
+        self._snapshot_date: Optional[str] = None
+        self._sealed_dates: Set[str] = set()  # Days whose final counters were written by a rollover seal
+        
+    def capture_snapshot(self, tracker: 'ForegroundTracker', bg_tracker: 'BackgroundVideoTracker') -> 'TrackingSnapshot':
+        """Copy the counters to save - each tracker lock is held only for a dict copy
+
+        The snapshot is dated with the tracker's day rather than the wall clock, so a save
+        that races the midnight seal still lands on the day its counters belong to.
+        """
+        day, app_times = tracker.get_day_and_app_times() if tracker else (None, {})
+        day = day or datetime.datetime.now().strftime('%Y-%m-%d')
+        bg_video_times, verified_times = {}, {}
+        if bg_tracker:
+            with bg_tracker.lock:
+                if getattr(bg_tracker, 'day', day) == day:  # Mid-rollover the sealed snapshot carries these
+                    bg_video_times = dict(bg_tracker.background_video_times)
+                    verified_times = dict(bg_tracker.verified_playing_times)
+
+        return TrackingSnapshot(
+            date=day,
+            taken_at=time.time(),
+            app_times=app_times,
+            bg_video_times=bg_video_times,
+            verified_times=verified_times,
+            has_background=bg_tracker is not None,
+            timeline=getattr(tracker, 'timeline', None)
+        )
+
     def save_tracking_data(self, tracker: 'ForegroundTracker', bg_tracker: 'BackgroundVideoTracker'):
         """Save current tracking data AND create dated backup for missed reports"""
-        
-        print(f"🔍 SAVE CALLED: {datetime.datetime.now()}")
-        print(f"   Tracker: {tracker is not None}")
-        print(f"   BG Tracker: {bg_tracker is not None}")
-    
-        if tracker:
-            with tracker.lock:
-                app_count = len(tracker.app_times)
-                print(f"   Apps to save: {app_count}")
+        self.write_snapshot(self.capture_snapshot(tracker, bg_tracker))
 
+    def write_snapshot(self, snapshot: 'TrackingSnapshot'):
+        """Serialise a captured snapshot to disk (runs on the PersistenceWriter thread)"""
         try:
-            current_date = datetime.datetime.now().strftime('%Y-%m-%d')
+            current_date = snapshot.date
+            if snapshot.timeline is not None:
+                self._timeline = snapshot.timeline
+            if snapshot.sealed:
+                self._sealed_dates.add(current_date)
+            elif current_date in self._sealed_dates:
+                self.logger.debug(f"Skipping late snapshot for sealed day {current_date}")
+                return
+            if self.rollups and self._snapshot_date and self._snapshot_date != current_date:
+                self.rollups.close_day(self._snapshot_date)
+            self._snapshot_date = current_date
             
             # ORIGINAL: Save current session data
-            app_times = tracker.get_app_times() if tracker else {}
+            app_times = snapshot.app_times
+            bg_video_times = snapshot.bg_video_times
+            verified_times = snapshot.verified_times
+
+            if self.store or self.config.PERSISTENCE_MODE == "journal":
+                if self.store:
+                    self._sqlite_save(snapshot.timeline, current_date, app_times, bg_video_times, verified_times)
+                else:
+                    self._journal_save(current_date, app_times, bg_video_times, verified_times)
+                    if snapshot.sealed and self.config.ENABLE_DATED_BACKUPS:
+                        # Journal mode only refreshes dated backups on compaction - write the final one now
+                        self._save_dated_backup(None, None, current_date, app_times, bg_video_times, verified_times)
+                return
             
             app_data = {
                 'app_times': {str(app): float(time_val) for app, time_val in app_times.items()},
@@ -879,14 +1811,10 @@ class CompleteEnhancedProductivityDataPersistence:
                 'total_apps': len(app_times),
                 'total_time': sum(app_times.values()) if app_times else 0
             }
-            self._save_json_file(self.app_times_file, app_data)
+            self._save_json_file(self.app_times_file, PersistedSchema.stamp('app_times', app_data))
             
             # Background video data
-            if bg_tracker:
-                with bg_tracker.lock:
-                    bg_video_times = dict(bg_tracker.background_video_times)
-                    verified_times = dict(bg_tracker.verified_playing_times)
-                
+            if snapshot.has_background:
                 background_data = {
                     'background_video_times': {str(site): float(time_val) for site, time_val in bg_video_times.items()},
                     'verified_playing_times': {str(site): float(time_val) for site, time_val in verified_times.items()},
@@ -895,11 +1823,11 @@ class CompleteEnhancedProductivityDataPersistence:
                     'total_sites': len(bg_video_times),
                     'total_bg_time': sum(bg_video_times.values()) if bg_video_times else 0
                 }
-                self._save_json_file(self.background_video_file, background_data)
+                self._save_json_file(self.background_video_file, PersistedSchema.stamp('background_video', background_data))
             
             # NEW: Also save dated backup for missed report recovery
             if self.config.ENABLE_DATED_BACKUPS:
-                self._save_dated_backup(tracker, bg_tracker, current_date, app_times, bg_video_times if bg_tracker else {}, verified_times if bg_tracker else {})
+                self._save_dated_backup(None, None, current_date, app_times, bg_video_times, verified_times)
             
             # Log save summary
             total_tracked_time = sum(app_times.values()) if app_times else 0
@@ -909,8 +1837,216 @@ class CompleteEnhancedProductivityDataPersistence:
             self.logger.error(f"Error saving tracking data: {e}")
             self.logger.error(f"Full traceback: {traceback.format_exc()}")
 
+    def _journal_save(self, current_date: str, app_times: Dict[str, float],
+                      bg_video_times: Dict[str, float], verified_times: Dict[str, float]):
+        """Append one compact record holding only the counters that changed since the last save"""
+        current = {'a': app_times, 'b': bg_video_times, 'v': verified_times}
+
+        if self._journal_date != current_date:
+            # New day (or first save) - start the journal from a full snapshot
+            self.compact_journal(current_date, app_times, bg_video_times, verified_times)
+            return
+
+        record: Dict[str, Any] = {'t': round(time.time(), 3), 'd': current_date}
+        record.update({section: changed for section, changed in self._changed_counters(current).items() if changed})
+
+        if len(record) > 2:
+            line = json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n"
+            try:
+                with open(self.journal_file, 'a', encoding='utf-8') as f:
+                    f.write(line)
+                self.write_stats['journal_records'] += 1
+                self.write_stats['journal_bytes'] += len(line.encode('utf-8'))
+            except Exception as e:
+                self.logger.error(f"Error appending to tracking journal: {e}")
+                return
+
+        self._last_saved = {section: dict(values) for section, values in current.items()}
+
+        journal_size = os.path.getsize(self.journal_file) if os.path.exists(self.journal_file) else 0
+        if (time.time() - self._last_compaction >= self.config.JOURNAL_COMPACT_INTERVAL or
+                journal_size >= self.config.JOURNAL_MAX_SIZE_MB * 1024 * 1024):
+            self.compact_journal(current_date, app_times, bg_video_times, verified_times)
+        else:
+            self.logger.info(f"💾 Journaled tracking data: {len(record) - 2} changed sections, "
+                             f"{len(app_times)} apps tracked, journal {journal_size / 1024:.1f} KB")
+
+    def _changed_counters(self, current: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, Optional[float]]]:
+        """Per section, the counters that differ from the last save; keys that disappeared map to None"""
+        changes = {}
+        for section, values in current.items():
+            previous = self._last_saved[section]
+            changed: Dict[str, Optional[float]] = {str(key): float(value) for key, value in values.items()
+                                                   if previous.get(key) != value}
+            changed.update({str(key): None for key in previous if key not in values})
+            changes[section] = changed
+        return changes
+
+    def _sqlite_save(self, timeline: Optional['ActivityTimeline'], current_date: str, app_times: Dict[str, float],
+                     bg_video_times: Dict[str, float], verified_times: Dict[str, float]):
+        """Write changed counters and new focus segments to SQLite in one transaction"""
+        current = {'a': app_times, 'b': bg_video_times, 'v': verified_times}
+        if self._journal_date != current_date:
+            self._last_saved = {'a': {}, 'b': {}, 'v': {}}
+        changes = self._changed_counters(current)
+
+        segments = []
+        if timeline is not None:
+            segments = timeline.query(start=self._segments_saved_until)
+            segments = [segment for segment in segments if segment[1] > segment[0]]
+
+        self.store.save_day(current_date, changes['a'], changes['b'], changes['v'], segments)
+
+        if segments:
+            self._segments_saved_until = max(end for _, end, _, _ in segments)
+        self._journal_date = current_date
+        self._last_saved = {section: dict(values) for section, values in current.items()}
+        self.logger.info(f"💾 Saved tracking data to SQLite: {len(changes['a'])} changed apps, "
+                         f"{len(segments)} new segments, {len(app_times)} apps tracked")
+
+    def _import_dated_backups_into_store(self):
+        """Seed a new database with the existing dated JSON backups so history is not lost"""
+        imported = 0
+        for day in self._dated_backup_days():
+            historical = self._load_dated_backup(day)
+            if not historical:
+                continue
+            app_data = historical['app_data'] or {}
+            bg_data = historical['bg_data'] or {}
+            try:
+                self.store.save_day(
+                    day,
+                    {app: float(secs) for app, secs in app_data.get('app_times', {}).items()},
+                    {site: float(secs) for site, secs in bg_data.get('background_video_times', {}).items()},
+                    {site: float(secs) for site, secs in bg_data.get('verified_playing_times', {}).items()}
+                )
+                imported += 1
+            except Exception as e:
+                self.logger.warning(f"⚠️  Could not import dated backup for {day}: {e}")
+        if imported:
+            self.logger.info(f"📥 Imported {imported} dated backups into {self.store.db_path}")
+
+    def compact_journal(self, current_date: str, app_times: Dict[str, float],
+                        bg_video_times: Dict[str, float], verified_times: Dict[str, float]):
+        """Fold the journal into the snapshot files (and dated backups), then truncate it"""
+        self._write_snapshot_files(current_date, app_times, bg_video_times, verified_times)
+
+        if self.config.ENABLE_DATED_BACKUPS:
+            self._save_dated_backup(None, None, current_date, app_times, bg_video_times, verified_times)
+
+        # Snapshot first, truncate second: a stale journal replayed over a newer snapshot of the
+        # same day is harmless because records carry absolute values, and _replay_journal skips
+        # records from before the snapshot's date (a crash here at the first save of a new day)
+        try:
+            open(self.journal_file, 'w', encoding='utf-8').close()
+        except Exception as e:
+            self.logger.error(f"Error truncating tracking journal: {e}")
+
+        self._journal_date = current_date
+        self._last_saved = {'a': dict(app_times), 'b': dict(bg_video_times), 'v': dict(verified_times)}
+        self._last_compaction = time.time()
+        self.write_stats['compactions'] += 1
+        self.logger.info(f"🗜️ Compacted tracking journal into snapshot: {len(app_times)} apps for {current_date}")
+
+    def _write_snapshot_files(self, current_date: str, app_times: Dict[str, float],
+                              bg_video_times: Dict[str, float], verified_times: Dict[str, float]):
+        app_data = {
+            'app_times': {str(app): float(time_val) for app, time_val in app_times.items()},
+            'last_updated': time.time(),
+            'date': current_date,
+            'total_apps': len(app_times),
+            'total_time': sum(app_times.values()) if app_times else 0
+        }
+        self._save_json_file(self.app_times_file, PersistedSchema.stamp('app_times', app_data))
+
+        background_data = {
+            'background_video_times': {str(site): float(time_val) for site, time_val in bg_video_times.items()},
+            'verified_playing_times': {str(site): float(time_val) for site, time_val in verified_times.items()},
+            'last_updated': time.time(),
+            'date': current_date,
+            'total_sites': len(bg_video_times),
+            'total_bg_time': sum(bg_video_times.values()) if bg_video_times else 0
+        }
+        self._save_json_file(self.background_video_file, PersistedSchema.stamp('background_video', background_data))
+
+        for filepath in (self.app_times_file, self.background_video_file):
+            if os.path.exists(filepath):
+                self.write_stats['snapshot_bytes'] += os.path.getsize(filepath)
+
+    def _replay_journal(self, app_data: Dict[str, Any], bg_data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Apply journal records on top of the snapshot files
+
+        Returns app/background dicts in the snapshot file format. Days the journal moved past
+        are written out as dated backups so missed-report recovery still sees them. Records dated
+        before the snapshot are skipped: they are left over from a crash between a new day's
+        snapshot write and the journal truncate, and must not move the state back a day.
+        """
+        state = {
+            'a': {'date': app_data.get('date'), 'values': dict(app_data.get('app_times', {}))},
+            'b': {'date': bg_data.get('date'), 'values': dict(bg_data.get('background_video_times', {}))},
+            'v': {'date': bg_data.get('date'), 'values': dict(bg_data.get('verified_playing_times', {}))},
+        }
+
+        records = stale = 0
+        if os.path.exists(self.journal_file):
+            with open(self.journal_file, 'r', encoding='utf-8') as f:
+                for line_number, line in enumerate(f, 1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Most likely a record cut short by a crash - everything before it is intact
+                        self.logger.warning(f"⚠️  Skipping unreadable journal record at line {line_number}")
+                        continue
+
+                    record_date = record.get('d')
+                    if record_date and state['a']['date'] and record_date < state['a']['date']:
+                        stale += 1
+                        continue
+                    if record_date and record_date != state['a']['date']:
+                        self._fold_replayed_day(state)
+                        for section in state.values():
+                            section['date'] = record_date
+                            section['values'] = {}
+
+                    for section in ('a', 'b', 'v'):
+                        for key, value in record.get(section, {}).items():
+                            if value is None:
+                                state[section]['values'].pop(key, None)
+                            else:
+                                state[section]['values'][key] = value
+                    records += 1
+
+        if records:
+            self.logger.info(f"📜 Replayed {records} journal records on top of the snapshot")
+        if stale:
+            self.logger.info(f"📜 Skipped {stale} journal records older than the snapshot date")
+
+        app_data = dict(app_data, date=state['a']['date'], app_times=state['a']['values'])
+        bg_data = dict(bg_data, date=state['b']['date'],
+                       background_video_times=state['b']['values'],
+                       verified_playing_times=state['v']['values'])
+        return app_data, bg_data
+
+    def _fold_replayed_day(self, state: Dict[str, Dict[str, Any]]):
+        """Persist a finished day found while replaying the journal as its dated backup"""
+        day = state['a']['date']
+        if day and self.config.ENABLE_DATED_BACKUPS and any(section['values'] for section in state.values()):
+            self._save_dated_backup(None, None, day, state['a']['values'], state['b']['values'], state['v']['values'])
+            self.logger.info(f"📅 Folded journaled data for {day} into its dated backup")
+
     def _save_dated_backup(self, tracker, bg_tracker, current_date: str, app_times: dict, bg_video_times: dict, verified_times: dict):
         """Save dated backup files for missed report recovery"""
+        if self.config.DATED_BACKUP_FORMAT == "binary":
+            self._save_binary_dated_backup(tracker, current_date, app_times, bg_video_times, verified_times)
+        elif self.config.DATED_BACKUP_FORMAT == "gzip":
+            self._save_gzip_dated_backup(current_date, app_times, bg_video_times, verified_times)
+        else:
+            self._save_json_dated_backup(current_date, app_times, bg_video_times, verified_times)
+
+    def _save_json_dated_backup(self, current_date: str, app_times: dict, bg_video_times: dict, verified_times: dict):
         try:
             # Save dated app times backup
             dated_app_file = os.path.join(self.dated_backup_dir, f"app_times_{current_date}.json")
@@ -921,7 +2057,7 @@ class CompleteEnhancedProductivityDataPersistence:
                 'total_apps': len(app_times),
                 'total_time': sum(app_times.values()) if app_times else 0
             }
-            self._save_json_file(dated_app_file, app_backup_data)
+            self._save_json_file(dated_app_file, PersistedSchema.stamp('app_times', app_backup_data))
             
             # Save dated background video backup
             if bg_video_times or verified_times:
@@ -934,22 +2070,146 @@ class CompleteEnhancedProductivityDataPersistence:
                     'total_sites': len(bg_video_times),
                     'total_bg_time': sum(bg_video_times.values()) if bg_video_times else 0
                 }
-                self._save_json_file(dated_bg_file, bg_backup_data)
+                self._save_json_file(dated_bg_file, PersistedSchema.stamp('background_video', bg_backup_data))
             
             self.logger.debug(f"💾 Saved dated backup for {current_date}")
             
         except Exception as e:
             self.logger.error(f"Error saving dated backup: {e}")
     
+    def _binary_backup_path(self, day: str) -> str:
+        return os.path.join(self.dated_backup_dir, f"day_{day}.bin")
+
+    def _save_binary_dated_backup(self, tracker, current_date: str, app_times: dict,
+                                  bg_video_times: dict, verified_times: dict):
+        """Write the day as a single BinaryDayFile, with minute buckets when a timeline is available"""
+        try:
+            timeline = getattr(tracker, 'timeline', None) or self._timeline
+            buckets = BinaryDayFile.buckets_from_timeline(timeline, current_date) if timeline is not None else None
+            size = BinaryDayFile.write(self._binary_backup_path(current_date), current_date,
+                                       app_times, bg_video_times, verified_times, buckets)
+            self.logger.debug(f"💾 Saved binary dated backup for {current_date} ({size / 1024:.1f} KB)")
+        except Exception as e:
+            self.logger.error(f"Error saving binary dated backup: {e}")
+
+    def _gzip_backup_path(self, day: str) -> str:
+        return os.path.join(self.dated_backup_dir, f"backup_{day}.jsonl.gz")
+
+    def _save_gzip_dated_backup(self, current_date: str, app_times: dict, bg_video_times: dict, verified_times: dict):
+        """Write the day as gzip-compressed JSON lines: a header, then one [section, key, seconds] per counter
+
+        Goes through the same temp file + fsync + rename path as the snapshot files (without a
+        .prev copy); gzip's own CRC catches anything torn.
+        """
+        try:
+            lines = [json.dumps({'format': self.GZIP_BACKUP_FORMAT, 'version': 1,
+                                 'date': current_date, 'timestamp': time.time()})]
+            for section, values in (('a', app_times), ('b', bg_video_times), ('v', verified_times)):
+                lines.extend(json.dumps([section, str(key), float(seconds)], ensure_ascii=False)
+                             for key, seconds in values.items())
+            payload = gzip.compress(("\n".join(lines) + "\n").encode('utf-8'), compresslevel=6)
+
+            filepath = self._gzip_backup_path(current_date)
+            temp_path = filepath + '.tmp'
+            PersistedSchema.write_temp_file(temp_path, payload)
+            PersistedSchema.commit_temp_file(temp_path, filepath)
+            self.logger.debug(f"💾 Saved compressed dated backup for {current_date} ({len(payload) / 1024:.1f} KB)")
+        except Exception as e:
+            self.logger.error(f"Error saving compressed dated backup: {e}")
+
+    def _iter_gzip_backup(self, filepath: str) -> Iterator[Tuple[str, str, float]]:
+        """Stream (section, key, seconds) from a compressed backup without building the whole day in memory"""
+        with gzip.open(filepath, 'rb') as f:
+            header = json.loads(f.readline() or b'{}')
+            if header.get('format') != self.GZIP_BACKUP_FORMAT:
+                raise ValueError(f"Not a compressed dated backup: {filepath}")
+
+            # Decode ~64 KB of complete lines per json.loads call - far cheaper than one call
+            # per line, and memory stays bounded by the chunk size
+            remainder = b''
+            while True:
+                chunk = f.read(65536)
+                if chunk:
+                    chunk = remainder + chunk
+                    cut = chunk.rfind(b'\n') + 1
+                    lines, remainder = chunk[:cut].strip(), chunk[cut:]
+                else:
+                    lines, remainder = remainder.strip(), b''
+                if lines:
+                    for section, key, seconds in json.loads(b"[" + lines.replace(b"\n", b",") + b"]"):
+                        yield self.GZIP_SECTIONS[section], key, seconds
+                if not chunk:
+                    break
+
+    def iter_historical_entries(self, target_date: str) -> Iterator[Tuple[str, str, float]]:
+        """Stream a day's counters as (section, key, seconds); section is 'app', 'background' or 'verified'
+
+        Compressed backups are decoded line by line. SQLite, binary and legacy JSON backups
+        are read whole and then yielded, so callers can use one code path for every format.
+        """
+        gzip_file = self._gzip_backup_path(target_date)
+        streamable = (self.config.ENABLE_DATED_BACKUPS and os.path.exists(gzip_file) and
+                      not os.path.exists(self._binary_backup_path(target_date)))
+
+        if self.store:
+            app_times, bg_video_times, verified_times = self.store.load_day(target_date)
+        elif streamable:
+            yield from self._iter_gzip_backup(gzip_file)
+            return
+        else:
+            historical = self.load_historical_data(target_date) or {}
+            app_data = historical.get('app_data') or {}
+            bg_data = historical.get('bg_data') or {}
+            app_times = app_data.get('app_times', {})
+            bg_video_times = bg_data.get('background_video_times', {})
+            verified_times = bg_data.get('verified_playing_times', {})
+
+        for section, values in (('app', app_times), ('background', bg_video_times), ('verified', verified_times)):
+            for key, seconds in values.items():
+                yield section, key, float(seconds)
+
+    def _dated_backup_days(self) -> List[str]:
+        """Every day with a dated backup in any format, oldest first"""
+        days = set()
+        for pattern in ("app_times_*.json", "background_video_*.json", "day_*.bin", "backup_*.jsonl.gz"):
+            for backup_file in glob.glob(os.path.join(self.dated_backup_dir, pattern)):
+                date_match = re.search(r'\d{4}-\d{2}-\d{2}', os.path.basename(backup_file))
+                if date_match:
+                    days.add(date_match.group(0))
+        return sorted(days)
+
     def load_tracking_data(self, tracker: 'ForegroundTracker', bg_tracker: 'BackgroundVideoTracker'):
         """Load tracking data from disk and restore to trackers"""
         try:
             current_date = datetime.datetime.now().strftime('%Y-%m-%d')
             self.logger.info(f"🔄 Loading tracking data for date: {current_date}")
             
-            # Load app times data
-            app_data = self._load_json_file(self.app_times_file)
-            if app_data:
+            if self.store:
+                app_times, bg_video_times, verified_times = self.store.load_day(current_date)
+                app_data = {'date': current_date, 'app_times': app_times} if app_times else {}
+                bg_data = ({'date': current_date, 'background_video_times': bg_video_times,
+                            'verified_playing_times': verified_times} if bg_video_times or verified_times else {})
+                self._journal_date = current_date
+                self._last_saved = {'a': dict(app_times), 'b': dict(bg_video_times), 'v': dict(verified_times)}
+            else:
+                # Load app times data
+                app_data = self._load_json_file(self.app_times_file, 'app_times')
+                bg_data = self._load_json_file(self.background_video_file, 'background_video')
+
+            if not self.store and self.config.PERSISTENCE_MODE == "journal":
+                app_data, bg_data = self._replay_journal(app_data, bg_data)
+                # Start the new session from a freshly compacted snapshot
+                self.compact_journal(
+                    app_data.get('date') or current_date,
+                    app_data.get('app_times', {}),
+                    bg_data.get('background_video_times', {}),
+                    bg_data.get('verified_playing_times', {})
+                )
+                if app_data.get('date') != current_date:
+                    # Yesterday's data is safe in its dated backup - today's journal starts empty
+                    self._journal_date = None
+
+            if app_data.get('app_times') or app_data.get('date'):
                 self.logger.info(f"📂 App data file found, date: {app_data.get('date', 'Unknown')}")
                 
                 if app_data.get('date') == current_date:
@@ -965,6 +2225,7 @@ class CompleteEnhancedProductivityDataPersistence:
                         with tracker.lock:
                             tracker.app_times.clear()
                             tracker.app_times.update(loaded_app_times)
+                            tracker.change_version += 1
                         
                         restored_apps = len(loaded_app_times)
                         total_time = sum(loaded_app_times.values())
@@ -981,8 +2242,7 @@ class CompleteEnhancedProductivityDataPersistence:
                 self.logger.info("📂 No previous app data file found - starting fresh")
             
             # Load background video data
-            bg_data = self._load_json_file(self.background_video_file)
-            if bg_data:
+            if bg_data.get('background_video_times') or bg_data.get('verified_playing_times') or bg_data.get('date'):
                 self.logger.info(f"📂 Background video data file found, date: {bg_data.get('date', 'Unknown')}")
                 
                 if bg_data.get('date') == current_date and bg_tracker:
@@ -1002,6 +2262,7 @@ class CompleteEnhancedProductivityDataPersistence:
                                     bg_tracker.verified_playing_times[str(site)] = float(time_val)
                                 except (ValueError, TypeError):
                                     self.logger.warning(f"⚠️  Invalid verified time for {site}: {time_val}")
+                        bg_tracker.change_version += 1
                     
                     restored_videos = len(bg_data.get('background_video_times', {}))
                     total_bg_time = sum(float(t) for t in bg_data.get('background_video_times', {}).values())
@@ -1017,9 +2278,30 @@ class CompleteEnhancedProductivityDataPersistence:
 
     def load_historical_data(self, target_date: str) -> Optional[Dict[str, Any]]:
         """Load historical tracking data for a specific date (for missed reports)"""
+        if self.store:
+            return self._load_historical_data_from_store(target_date)
+
         if not self.config.ENABLE_DATED_BACKUPS:
             return None
-            
+
+        return self._load_dated_backup(target_date)
+
+    def _load_dated_backup(self, target_date: str) -> Optional[Dict[str, Any]]:
+        """Read a day's dated backup - binary, then compressed, then the legacy JSON pair"""
+        binary_file = self._binary_backup_path(target_date)
+        if os.path.exists(binary_file):
+            try:
+                return self._load_binary_dated_backup(binary_file, target_date)
+            except Exception as e:
+                self.logger.warning(f"⚠️  Unreadable binary backup {binary_file}, trying other formats: {e}")
+
+        gzip_file = self._gzip_backup_path(target_date)
+        if os.path.exists(gzip_file):
+            try:
+                return self._load_gzip_dated_backup(gzip_file, target_date)
+            except Exception as e:
+                self.logger.warning(f"⚠️  Unreadable compressed backup {gzip_file}: {e}")
+
         try:
             dated_app_file = os.path.join(self.dated_backup_dir, f"app_times_{target_date}.json")
             dated_bg_file = os.path.join(self.dated_backup_dir, f"background_video_{target_date}.json")
@@ -1028,11 +2310,11 @@ class CompleteEnhancedProductivityDataPersistence:
             bg_data = None
             
             if os.path.exists(dated_app_file):
-                app_data = self._load_json_file(dated_app_file)
+                app_data = self._load_json_file(dated_app_file, 'app_times')
                 self.logger.info(f"📂 Found app data for {target_date}: {app_data.get('total_apps', 0)} apps")
             
             if os.path.exists(dated_bg_file):
-                bg_data = self._load_json_file(dated_bg_file)
+                bg_data = self._load_json_file(dated_bg_file, 'background_video')
                 self.logger.info(f"📂 Found background video data for {target_date}: {bg_data.get('total_sites', 0)} sites")
             
             if app_data or bg_data:
@@ -1049,8 +2331,180 @@ class CompleteEnhancedProductivityDataPersistence:
             self.logger.error(f"Error loading historical data for {target_date}: {e}")
             return None
 
+    def _load_binary_dated_backup(self, binary_file: str, target_date: str) -> Dict[str, Any]:
+        with BinaryDayFile(binary_file) as day_file:
+            app_times = day_file.app_times()
+            bg_video_times, verified_times = day_file.background_times()
+
+        self.logger.info(f"📂 Found binary data for {target_date}: {len(app_times)} apps, {len(bg_video_times)} sites")
+        return self._historical_result(target_date, app_times, bg_video_times, verified_times)
+
+    def _load_gzip_dated_backup(self, gzip_file: str, target_date: str) -> Dict[str, Any]:
+        values: Dict[str, Dict[str, float]] = {'app': {}, 'background': {}, 'verified': {}}
+        for section, key, seconds in self._iter_gzip_backup(gzip_file):
+            values[section][key] = seconds
+
+        self.logger.info(f"📂 Found compressed data for {target_date}: "
+                         f"{len(values['app'])} apps, {len(values['background'])} sites")
+        return self._historical_result(target_date, values['app'], values['background'], values['verified'])
+
+    def _historical_result(self, target_date: str, app_times: Dict[str, float],
+                           bg_video_times: Dict[str, float], verified_times: Dict[str, float]) -> Dict[str, Any]:
+        """Same shape as the JSON dated-backup result"""
+        return {
+            'app_data': {
+                'app_times': app_times,
+                'date': target_date,
+                'total_apps': len(app_times),
+                'total_time': sum(app_times.values())
+            },
+            'bg_data': {
+                'background_video_times': bg_video_times,
+                'verified_playing_times': verified_times,
+                'date': target_date,
+                'total_sites': len(bg_video_times),
+                'total_bg_time': sum(bg_video_times.values())
+            } if bg_video_times or verified_times else None,
+            'date': target_date
+        }
+
+    def _load_historical_data_from_store(self, target_date: str) -> Optional[Dict[str, Any]]:
+        """Same shape as the dated-backup result, read from SQLite"""
+        try:
+            app_times, bg_video_times, verified_times = self.store.load_day(target_date)
+            if not app_times and not bg_video_times:
+                self.logger.info(f"📂 No historical data found for {target_date}")
+                return None
+
+            self.logger.info(f"📂 Found SQLite data for {target_date}: {len(app_times)} apps, {len(bg_video_times)} sites")
+            return self._historical_result(target_date, app_times, bg_video_times, verified_times)
+        except Exception as e:
+            self.logger.error(f"Error loading historical data for {target_date} from SQLite: {e}")
+            return None
+
+    def load_date_range(self, start_date: str, end_date: str) -> Dict[str, List[Tuple[str, str, float]]]:
+        """iter_historical_entries() tuples per day for an inclusive YYYY-MM-DD range (e.g. a weekly rollup)
+
+        SQLite answers the whole range with two indexed range scans; other backends read day by day.
+        """
+        days: Dict[str, List[Tuple[str, str, float]]] = {}
+        if self.store:
+            for date_str, app_times in self.store.app_times_between(start_date, end_date).items():
+                days[date_str] = [('app', app, float(secs)) for app, secs in app_times.items()]
+            for date_str, (bg_video_times, verified_times) in self.store.background_times_between(
+                    start_date, end_date).items():
+                entries = days.setdefault(date_str, [])
+                entries += [('background', site, float(secs)) for site, secs in bg_video_times.items()]
+                entries += [('verified', site, float(secs)) for site, secs in verified_times.items()]
+            return days
+
+        day = datetime.datetime.strptime(start_date, '%Y-%m-%d')
+        last_day = datetime.datetime.strptime(end_date, '%Y-%m-%d')
+        while day <= last_day:
+            date_str = day.strftime('%Y-%m-%d')
+            entries = list(self.iter_historical_entries(date_str))
+            if entries:
+                days[date_str] = entries
+            day += datetime.timedelta(days=1)
+        return days
+
+    def load_daily_summaries(self, start_date: str, end_date: str) -> Dict[str, Dict[str, float]]:
+        """Total tracked seconds per day for an inclusive range, plus per-category seconds where known
+
+        Binary backups answer this from their counter and bucket sections alone - no title is
+        decoded - so a 30 or 365 day scan stays cheap. Other days fall back to load_historical_data.
+        """
+        summaries: Dict[str, Dict[str, float]] = {}
+        day = datetime.datetime.strptime(start_date, '%Y-%m-%d')
+        last_day = datetime.datetime.strptime(end_date, '%Y-%m-%d')
+        while day <= last_day:
+            date_str = day.strftime('%Y-%m-%d')
+            day += datetime.timedelta(days=1)
+
+            binary_file = self._binary_backup_path(date_str)
+            if not self.store and os.path.exists(binary_file):
+                try:
+                    with BinaryDayFile(binary_file) as day_file:
+                        summary = {'total_time': day_file.total_seconds()}
+                        if day_file.has_buckets:
+                            summary.update(day_file.category_totals())
+                    summaries[date_str] = summary
+                    continue
+                except Exception as e:
+                    self.logger.warning(f"⚠️  Unreadable binary backup {binary_file}: {e}")
+
+            historical = self.load_historical_data(date_str)
+            if historical and historical.get('app_data'):
+                summaries[date_str] = {'total_time': float(sum(historical['app_data'].get('app_times', {}).values()))}
+        return summaries
+
+    def convert_dated_backups_to_binary(self, remove_json: bool = False) -> int:
+        """Rewrite JSON dated backups as binary day files; returns the number of days converted"""
+        converted = 0
+        for day in self._dated_backup_days():
+            app_file = os.path.join(self.dated_backup_dir, f"app_times_{day}.json")
+            bg_file = os.path.join(self.dated_backup_dir, f"background_video_{day}.json")
+            if not os.path.exists(app_file) and not os.path.exists(bg_file):
+                continue
+
+            app_data = self._load_json_file(app_file, 'app_times')
+            bg_data = self._load_json_file(bg_file, 'background_video')
+            try:
+                BinaryDayFile.write(
+                    self._binary_backup_path(day), day,
+                    {app: float(secs) for app, secs in app_data.get('app_times', {}).items()},
+                    {site: float(secs) for site, secs in bg_data.get('background_video_times', {}).items()},
+                    {site: float(secs) for site, secs in bg_data.get('verified_playing_times', {}).items()}
+                )
+            except Exception as e:
+                self.logger.warning(f"⚠️  Could not convert dated backup for {day}: {e}")
+                continue
+
+            converted += 1
+            if remove_json:
+                for json_file in (app_file, bg_file):
+                    if os.path.exists(json_file):
+                        os.remove(json_file)
+
+        if converted:
+            self.logger.info(f"🔄 Converted {converted} dated backups to binary day files")
+        return converted
+
+    def convert_binary_backups_to_json(self, remove_binary: bool = False) -> int:
+        """Write binary day files back out as the JSON dated-backup pair; returns the number of days"""
+        converted = 0
+        for binary_file in sorted(glob.glob(os.path.join(self.dated_backup_dir, "day_*.bin"))):
+            day = os.path.splitext(os.path.basename(binary_file))[0][len("day_"):]
+            try:
+                with BinaryDayFile(binary_file) as day_file:
+                    app_times = day_file.app_times()
+                    bg_video_times, verified_times = day_file.background_times()
+            except Exception as e:
+                self.logger.warning(f"⚠️  Could not read binary backup {binary_file}: {e}")
+                continue
+
+            self._save_json_dated_backup(day, app_times, bg_video_times, verified_times)
+
+            converted += 1
+            if remove_binary:
+                os.remove(binary_file)
+
+        if converted:
+            self.logger.info(f"🔄 Converted {converted} binary day files to JSON dated backups")
+        return converted
+
     def cleanup_old_dated_backups(self):
         """Clean up dated backup files older than configured days"""
+        if self.store:
+            cutoff_str = (datetime.datetime.now() - datetime.timedelta(days=self.config.DATED_BACKUP_DAYS_TO_KEEP)).strftime('%Y-%m-%d')
+            try:
+                removed = self.store.delete_days_before(cutoff_str)
+                if removed:
+                    self.logger.info(f"🧹 Removed {removed} app rows older than {cutoff_str} from SQLite")
+            except Exception as e:
+                self.logger.error(f"Error cleaning up SQLite history: {e}")
+            return
+
         if not self.config.ENABLE_DATED_BACKUPS:
             return
             
@@ -1058,14 +2512,16 @@ class CompleteEnhancedProductivityDataPersistence:
             cutoff_date = datetime.datetime.now() - datetime.timedelta(days=self.config.DATED_BACKUP_DAYS_TO_KEEP)
             cutoff_str = cutoff_date.strftime('%Y-%m-%d')
             
-            backup_files = glob.glob(os.path.join(self.dated_backup_dir, "*.json"))
+            # Includes the .tmp/.corrupted copies left by interrupted or damaged writes
+            backup_files = glob.glob(os.path.join(self.dated_backup_dir, "*"))
             cleaned_count = 0
             
             for backup_file in backup_files:
                 try:
                     filename = os.path.basename(backup_file)
-                    if '_' in filename:
-                        date_part = filename.split('_')[-1].replace('.json', '')
+                    date_match = re.search(r'\d{4}-\d{2}-\d{2}', filename)
+                    if date_match:
+                        date_part = date_match.group(0)
                         if date_part < cutoff_str:
                             os.remove(backup_file)
                             cleaned_count += 1
@@ -1120,44 +2576,536 @@ class CompleteEnhancedProductivityDataPersistence:
             return {'error': str(e)}
 
     def _save_json_file(self, filepath: str, data: Dict[str, Any]):
-        """Safely save data to JSON file with better error handling"""
+        """Atomically save data as a checksummed JSON snapshot
+
+        The file stays plain JSON: its last key, SNAPSHOT_KEY, holds the generation plus the
+        CRC32 and length of the bytes before it. The body is written to <file>.tmp and fsynced
+        before it replaces the file, so a crash leaves a complete old or new generation on disk,
+        never a torn one. The two live snapshot files also keep the previous generation as
+        <file>.prev for _load_json_file to fall back on.
+        """
         try:
             os.makedirs(os.path.dirname(filepath), exist_ok=True)
+
+            body = json.dumps(data, indent=2, ensure_ascii=False, default=str).encode('utf-8')
+            prefix = body[:-1].rstrip() + (b',' if data else b'')  # Reopen the object for one more key
+            # Claim the generation up front so a failed write never has its number reused
+            generation = self._generations[filepath] = self._next_generation(filepath)
+            trailer = (f'\n  "{self.SNAPSHOT_KEY}": {{"generation": {generation}, '
+                       f'"crc32": "{zlib.crc32(prefix):08x}", "length": {len(prefix)}}}\n}}\n').encode('ascii')
+
+            temp_path = filepath + '.tmp'
+            self._write_temp_file(temp_path, prefix + trailer)
+            self._commit_temp_file(temp_path, filepath)
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False, default=str)
-            
-            self.logger.debug(f"💾 Saved data to {filepath}")
+            self.logger.debug(f"💾 Saved data to {filepath} (generation {generation})")
             
         except Exception as e:
             self.logger.error(f"Error saving JSON file {filepath}: {e}")
-    
-    def _load_json_file(self, filepath: str) -> Dict[str, Any]:
-        """Safely load data from JSON file with better error handling"""
-        if not os.path.exists(filepath):
-            self.logger.debug(f"📂 File does not exist: {filepath}")
-            return {}
-        
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            self.logger.debug(f"📂 Loaded data from {filepath}")
-            return data
-            
-        except json.JSONDecodeError as e:
-            self.logger.error(f"JSON decode error in {filepath}: {e}")
-            backup_path = f"{filepath}.corrupted.{int(time.time())}"
+
+    def _next_generation(self, filepath: str) -> int:
+        if filepath not in self._generations:
+            self._generations[filepath] = max(
+                (generation for generation, _ in self._read_snapshot_candidates(filepath)), default=0)
+        return self._generations[filepath] + 1
+
+    def _write_temp_file(self, temp_path: str, payload: bytes):
+        PersistedSchema.write_temp_file(temp_path, payload)
+
+    def _commit_temp_file(self, temp_path: str, filepath: str):
+        """Move the new generation into place - the live snapshot files keep the current one as .prev"""
+        PersistedSchema.commit_temp_file(temp_path, filepath,
+                                         keep_previous=filepath in (self.app_times_file, self.background_video_file))
+
+    def _read_snapshot(self, path: str) -> Tuple[int, Dict[str, Any]]:
+        """(generation, data) for one snapshot file; raises ValueError if it is torn or corrupt
+
+        Files written before checksummed snapshots existed are plain JSON and count as generation 0.
+        """
+        with open(path, 'rb') as f:
+            raw = f.read()
+
+        if raw.startswith(self.SNAPSHOT_MAGIC.encode('ascii')):
+            header, _, body = raw.partition(b'\n')
+            try:
+                _, generation, crc, length = header.decode('ascii').split()
+                generation, crc, length = int(generation), int(crc, 16), int(length)
+            except ValueError:
+                raise ValueError("unreadable snapshot header")
+            if len(body) != length:
+                raise ValueError(f"torn write: {len(body)} of {length} bytes")
+            if zlib.crc32(body) != crc:
+                raise ValueError("checksum mismatch")
+            return generation, json.loads(body.decode('utf-8'))
+
+        data = json.loads(raw.decode('utf-8'))
+        snapshot = data.pop(self.SNAPSHOT_KEY, None) if isinstance(data, dict) else None
+        if snapshot is None:
+            return 0, data
+        prefix = raw[:raw.rfind(f'\n  "{self.SNAPSHOT_KEY}"'.encode('ascii'))]
+        try:
+            generation, crc, length = int(snapshot['generation']), int(snapshot['crc32'], 16), int(snapshot['length'])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("unreadable snapshot trailer")
+        if len(prefix) != length:
+            raise ValueError(f"torn write: {len(prefix)} of {length} bytes")
+        if zlib.crc32(prefix) != crc:
+            raise ValueError("checksum mismatch")
+        return generation, data
+
+    def _read_snapshot_candidates(self, filepath: str) -> List[Tuple[int, str]]:
+        """(generation, path) of every readable copy of a snapshot, newest first"""
+        candidates = []
+        for path in (filepath, filepath + '.tmp', filepath + '.prev'):
+            if not os.path.exists(path):
+                continue
+            try:
+                generation, _ = self._read_snapshot(path)
+                candidates.append((generation, path))
+            except Exception:
+                continue
+        return sorted(candidates, reverse=True)
+    
+    def _load_json_file(self, filepath: str, kind: Optional[str] = None) -> Dict[str, Any]:
+        """Load the newest valid generation of a snapshot
+
+        Looks at the file itself, a .tmp left by a crash between rename steps, and the .prev
+        generation. A torn or corrupt main file is moved aside to .corrupted.<ts>. With a
+        PersistedSchema `kind`, older payloads are upgraded and written back in place.
+        """
+        paths = [path for path in (filepath, filepath + '.tmp', filepath + '.prev') if os.path.exists(path)]
+        if not paths:
+            self.logger.debug(f"📂 File does not exist: {filepath}")
+            return {}
+
+        best: Optional[Tuple[int, str, Dict[str, Any]]] = None
+        main_file_corrupt = False
+        for path in paths:
+            try:
+                generation, data = self._read_snapshot(path)
+            except Exception as e:
+                self.logger.error(f"Unreadable snapshot {path}: {e}")
+                main_file_corrupt = main_file_corrupt or path == filepath
+                continue
+            if best is None or generation > best[0]:
+                best = (generation, path, data)
+
+        if main_file_corrupt:
+            backup_path = f"{filepath}.corrupted.{int(time.time())}"
             try:
                 os.rename(filepath, backup_path)
                 self.logger.info(f"🔄 Moved corrupted file to {backup_path}")
-            except:
+            except OSError:
                 pass
+
+        if best is None:
+            self.logger.error(f"No valid generation of {filepath} could be recovered")
             return {}
-        except Exception as e:
-            self.logger.error(f"Error loading JSON file {filepath}: {e}")
+
+        generation, path, data = best
+        self._generations[filepath] = max(self._generations.get(filepath, 0), generation)
+        if path != filepath:
+            self.logger.warning(f"🩹 Recovered {os.path.basename(filepath)} from generation {generation} ({path})")
+            if path == filepath + '.tmp':
+                # The crash hit between the two renames - finish the commit
+                try:
+                    self._commit_temp_file(path, filepath)
+                except OSError as e:
+                    self.logger.error(f"Could not move recovered snapshot into place: {e}")
+        else:
+            self.logger.debug(f"📂 Loaded data from {filepath} (generation {generation})")
+
+        if kind and data:
+            data = self._upgrade_loaded(filepath, kind, data)
+        return data
+
+    def _upgrade_loaded(self, filepath: str, kind: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Lazy migration: upgrade what was read and write the new version back in place"""
+        version = PersistedSchema.version_of(data)
+        try:
+            upgraded = PersistedSchema.upgrade(kind, data)
+        except ValueError as e:
+            self.logger.error(f"Cannot read {os.path.basename(filepath)}: {e}")
             return {}
 
+        if version < PersistedSchema.CURRENT_VERSIONS[kind]:
+            self._save_json_file(filepath, upgraded)
+            self.write_stats['schema_upgrades'] += 1
+            self.logger.info(f"🔄 Upgraded {os.path.basename(filepath)} from schema version {version}")
+        return upgraded
+
+
+class HistoryRollupIndex:
+    """Weekly and monthly aggregates folded from closed days
+
+    logs/rollups/week_YYYY-Www.json and month_YYYY-MM.json hold per-app, per-category,
+    background and top-title totals, so a period report reads one file instead of every
+    dated backup in the range. A rollup is rebuilt from the backups when it is missing,
+    the categorization rules changed, or a folded day's backup was rewritten since.
+    Days whose backups were already removed by cleanup stay in the rollup until a rebuild.
+    """
+
+    PERIODS = ("week", "month")
+    TITLE_CANDIDATES = 200  # Titles kept per rollup; the report lists the top ROLLUP_TOP_TITLES
+
+    def __init__(self, persistence: 'CompleteEnhancedProductivityDataPersistence'):
+        self.persistence = persistence
+        self.logger = logging.getLogger(__name__)
+        self.rollup_dir = os.path.join(persistence.config.LOG_DIR, "rollups")
+        os.makedirs(self.rollup_dir, exist_ok=True)
+        self.lock = threading.Lock()
+        self.stats = {'days_folded': 0, 'rebuilds': 0, 'hits': 0}
+
+    @staticmethod
+    def period_bounds(period: str, day: str) -> Tuple[str, str, str]:
+        """(key, first day, last day) of the ISO week or calendar month containing `day`"""
+        date = datetime.datetime.strptime(day, '%Y-%m-%d').date()
+        if period == "week":
+            year, week, weekday = date.isocalendar()
+            start = date - datetime.timedelta(days=weekday - 1)
+            return f"{year}-W{week:02d}", start.isoformat(), (start + datetime.timedelta(days=6)).isoformat()
+        if period == "month":
+            start = date.replace(day=1)
+            next_month = (start + datetime.timedelta(days=32)).replace(day=1)
+            return date.strftime('%Y-%m'), start.isoformat(), (next_month - datetime.timedelta(days=1)).isoformat()
+        raise ValueError(f"Unknown rollup period: {period}")
+
+    def rollup_path(self, period: str, key: str) -> str:
+        return os.path.join(self.rollup_dir, f"{period}_{key}.json")
+
+    def get(self, period: str, day: str) -> Dict[str, Any]:
+        """The rollup for the period containing `day`, covering every closed day with data
+
+        New closed days are folded in incrementally; a missing or stale rollup is rebuilt.
+        """
+        key, start, end = self.period_bounds(period, day)
+        path = self.rollup_path(period, key)
+        with self.lock:
+            rollup = self.persistence._load_json_file(path, 'rollup')
+            expected = {closed_day: self._day_fingerprint(closed_day) for closed_day in self._closed_days(start, end)}
+
+            stale_reason = self._stale_reason(rollup, expected)
+            if stale_reason:
+                self.logger.info(f"🔄 Rebuilding {period} rollup {key} ({stale_reason})")
+                rollup = self._empty_rollup(period, key, start, end)
+                self.stats['rebuilds'] += 1
+
+            missing = [closed_day for closed_day in sorted(expected) if closed_day not in rollup['days']]
+            # SQLite reads every missing day in one range query; file backups are streamed one day at a time
+            ranged = None
+            if missing and self.persistence.store:
+                ranged = self.persistence.load_date_range(missing[0], missing[-1])
+            for closed_day in missing:
+                entries = (ranged.get(closed_day, []) if ranged is not None
+                           else self.persistence.iter_historical_entries(closed_day))
+                self._fold(rollup, closed_day, entries, expected[closed_day])
+                self.stats['days_folded'] += 1
+
+            if missing or stale_reason:
+                rollup['built_at'] = time.time()
+                self.persistence._save_json_file(path, PersistedSchema.stamp('rollup', rollup))
+            else:
+                self.stats['hits'] += 1
+        return rollup
+
+    def get_with_live(self, period: str, day: str, app_times: Dict[str, float],
+                      bg_video_times: Dict[str, float], verified_times: Dict[str, float]) -> Dict[str, Any]:
+        """The period rollup plus the still-open day's counters (the result is not saved)"""
+        rollup = self.get(period, day)
+        combined = {name: dict(value) if isinstance(value, dict) else value for name, value in rollup.items()}
+        if day not in combined['days']:
+            entries = [('app', key, secs) for key, secs in app_times.items()]
+            entries += [('background', site, secs) for site, secs in bg_video_times.items()]
+            entries += [('verified', site, secs) for site, secs in verified_times.items()]
+            self._fold(combined, day, entries, None)
+        return combined
+
+    def close_day(self, day: str):
+        """Fold a finished day into its week and month (called on the first save of the next day)"""
+        for period in self.PERIODS:
+            try:
+                self.get(period, day)
+            except Exception as e:
+                self.logger.error(f"Error folding {day} into the {period} rollup: {e}")
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.stats)
+
+    def _empty_rollup(self, period: str, key: str, start: str, end: str) -> Dict[str, Any]:
+        return {
+            'period': period,
+            'key': key,
+            'start': start,
+            'end': end,
+            'rules': AppCategorizer.rules_fingerprint(),
+            'days': {},            # day -> backup fingerprint it was folded from
+            'day_totals': {},
+            'app_totals': {},      # cleaned base app name -> seconds
+            'category_totals': {category.value: 0.0 for category in Category},
+            'background_totals': {},
+            'verified_totals': {},
+            'title_totals': {},    # full tracked title -> seconds, pruned to TITLE_CANDIDATES
+            'built_at': time.time()
+        }
+
+    def _stale_reason(self, rollup: Dict[str, Any], expected: Dict[str, int]) -> Optional[str]:
+        if not rollup or 'days' not in rollup:
+            return "missing"
+        if rollup.get('rules') != AppCategorizer.rules_fingerprint():
+            return "categorization rules changed"
+        for day, fingerprint in expected.items():
+            if day in rollup['days'] and rollup['days'][day] != fingerprint:
+                return f"backup for {day} changed"
+        return None
+
+    def _closed_days(self, start: str, end: str) -> List[str]:
+        """Days before today inside [start, end] that have saved data"""
+        yesterday = (datetime.date.today() - datetime.timedelta(days=1)).isoformat()
+        last = min(end, yesterday)
+        if last < start:
+            return []
+        if self.persistence.store:
+            return self.persistence.store.days_with_data(start, last)
+        return [day for day in self.persistence._dated_backup_days() if start <= day <= last]
+
+    def _day_fingerprint(self, day: str) -> int:
+        """Newest mtime of the day's dated backups; SQLite days are never rewritten once closed"""
+        if self.persistence.store:
+            return 0
+        backup_dir = self.persistence.dated_backup_dir
+        paths = (self.persistence._gzip_backup_path(day), self.persistence._binary_backup_path(day),
+                 os.path.join(backup_dir, f"app_times_{day}.json"),
+                 os.path.join(backup_dir, f"background_video_{day}.json"))
+        return max((os.stat(path).st_mtime_ns for path in paths if os.path.exists(path)), default=0)
+
+    def _fold(self, rollup: Dict[str, Any], day: str, entries, fingerprint: Optional[int]):
+        """Add one day's (section, key, seconds) entries to the rollup totals"""
+        app_entries = []
+        for section, key, seconds in entries:
+            if section == 'app':
+                app_entries.append((key, seconds))
+            else:
+                totals = rollup['background_totals'] if section == 'background' else rollup['verified_totals']
+                totals[key] = totals.get(key, 0.0) + seconds
+
+        apps, titles, category_totals = rollup['app_totals'], rollup['title_totals'], rollup['category_totals']
+        categories = AppCategorizer.categorize_many(key for key, _ in app_entries)
+        day_total = 0.0
+        for key, seconds in app_entries:
+            day_total += seconds
+            app_name = AppNameCleaner.clean_app_base_name(key)
+            apps[app_name] = apps.get(app_name, 0.0) + seconds
+            titles[key] = titles.get(key, 0.0) + seconds
+            category = categories[key]
+            if category is not None:
+                category_totals[category.value] = category_totals.get(category.value, 0.0) + seconds
+
+        if len(titles) > self.TITLE_CANDIDATES:
+            rollup['title_totals'] = dict(sorted(titles.items(), key=lambda item: item[1], reverse=True)
+                                          [:self.TITLE_CANDIDATES])
+        rollup['days'][day] = fingerprint
+        rollup['day_totals'][day] = day_total
+
+
+class PersistenceWriter(threading.Thread):
+    """Writes TrackingSnapshots on its own thread so disk I/O never stalls the main loop
+
+    Snapshots carry absolute counter values, so when saves pile up behind a slow disk
+    only the newest queued snapshot of each day is written (oldest day first, so a day
+    sealed at midnight is never dropped). flush() blocks until everything submitted so
+    far is on disk; before start() (or after stop()) submit() writes inline.
+    """
+
+    SLOW_WRITE_SECONDS = 1.0
+
+    def __init__(self, persistence: CompleteEnhancedProductivityDataPersistence):
+        super().__init__(daemon=True, name="PersistenceWriter")
+        self.logger = logging.getLogger(__name__)
+        self.persistence = persistence
+        self._queue: queue.Queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            'submitted': 0,
+            'written': 0,
+            'coalesced': 0,
+            'errors': 0,
+            'max_queue_depth': 0,
+            'last_write_time': 0.0,
+            'max_write_time': 0.0,
+            'total_write_time': 0.0,
+        }
+
+    def submit(self, snapshot: TrackingSnapshot):
+        if not self.is_alive():
+            self._write(snapshot)
+            return
+        self._queue.put(snapshot)
+        with self._stats_lock:
+            self.stats['submitted'] += 1
+            self.stats['max_queue_depth'] = max(self.stats['max_queue_depth'], self._queue.qsize())
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """Block until every snapshot submitted before this call has been written"""
+        if not self.is_alive():
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        if not done.wait(timeout):
+            self.logger.warning(f"⚠️  Persistence flush did not finish within {timeout:.0f}s")
+            return False
+        return True
+
+    def stop(self, timeout: float = 30.0):
+        """Flush, then shut the thread down"""
+        if not self.is_alive():
+            return
+        self.flush(timeout)
+        self._queue.put(None)
+        self.join(timeout=5)
+
+    def run(self):
+        self.logger.info("PersistenceWriter thread starting...")
+        running = True
+        while running:
+            item = self._queue.get()
+            latest: Dict[str, TrackingSnapshot] = {}
+            waiters: List[threading.Event] = []
+
+            # Drain whatever queued up behind this item - only the newest snapshot per day matters
+            while True:
+                if item is None:
+                    running = False
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    if item.date in latest:
+                        with self._stats_lock:
+                            self.stats['coalesced'] += 1
+                    if not (item.date in latest and latest[item.date].sealed):
+                        latest[item.date] = item
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            for day in sorted(latest):
+                self._write(latest[day])
+            for waiter in waiters:
+                waiter.set()
+
+    def _write(self, snapshot: TrackingSnapshot):
+        start = time.perf_counter()
+        try:
+            self.persistence.write_snapshot(snapshot)
+        except Exception as e:
+            with self._stats_lock:
+                self.stats['errors'] += 1
+            self.logger.error(f"Error in persistence writer: {e}")
+        elapsed = time.perf_counter() - start
+
+        with self._stats_lock:
+            self.stats['written'] += 1
+            self.stats['last_write_time'] = elapsed
+            self.stats['max_write_time'] = max(self.stats['max_write_time'], elapsed)
+            self.stats['total_write_time'] += elapsed
+
+        if elapsed >= self.SLOW_WRITE_SECONDS:
+            self.logger.warning(f"🐢 Saving tracking data took {elapsed:.1f}s "
+                                f"(snapshot taken {time.time() - snapshot.taken_at:.1f}s ago)")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        written = stats['written']
+        return {
+            'queue_depth': self._queue.qsize(),
+            'max_queue_depth': stats['max_queue_depth'],
+            'submitted': stats['submitted'],
+            'written': written,
+            'coalesced': stats['coalesced'],
+            'errors': stats['errors'],
+            'last_write_ms': round(stats['last_write_time'] * 1000, 1),
+            'avg_write_ms': round(stats['total_write_time'] / written * 1000, 1) if written else 0.0,
+            'max_write_ms': round(stats['max_write_time'] * 1000, 1),
+        }
+
+
+class DayRolloverManager(threading.Thread):
+    """Seals the trackers' counters at local midnight so a session running for days never mixes them
+
+    The next boundary is recomputed from the local calendar after every seal, so DST days
+    (23 or 25 hours long) come out right, and waits are capped so a clock change or a
+    sleep/resume is noticed within MAX_WAIT_SECONDS. At the boundary the in-progress
+    focus segment and background sessions are split, the closed day goes to the
+    PersistenceWriter as a sealed snapshot (its dated backup), and the trackers carry on
+    with empty counters.
+    """
+
+    MAX_WAIT_SECONDS = 60.0
+
+    def __init__(self, tracker: Optional['ForegroundTracker'], bg_tracker: Optional['BackgroundVideoTracker'],
+                 persistence_writer: PersistenceWriter):
+        super().__init__(daemon=True, name="DayRolloverManager")
+        self.logger = logging.getLogger(__name__)
+        self.tracker = tracker
+        self.bg_tracker = bg_tracker
+        self.persistence_writer = persistence_writer
+        self.shutdown_event = threading.Event()
+        self.rollovers = 0
+        self.last_sealed_day: Optional[str] = None
+
+    @staticmethod
+    def next_boundary(now: float) -> Tuple[str, float]:
+        """(local date of `now`, epoch seconds of the following local midnight)"""
+        today = datetime.datetime.fromtimestamp(now).date()
+        midnight = datetime.datetime.combine(today + datetime.timedelta(days=1), datetime.time.min)
+        return today.isoformat(), midnight.timestamp()  # Naive local time - mktime applies the DST offset
+
+    def run(self):
+        self.logger.info("DayRolloverManager thread starting...")
+        day, boundary = self.next_boundary(time.time())
+        while not self.shutdown_event.is_set():
+            now = time.time()
+            if now < boundary:
+                if datetime.datetime.fromtimestamp(now).date().isoformat() < day:
+                    day, boundary = self.next_boundary(now)  # Clock was set back past midnight
+                self.shutdown_event.wait(min(boundary - now, self.MAX_WAIT_SECONDS))
+                continue
+
+            next_day = datetime.datetime.fromtimestamp(now).date().isoformat()
+            try:
+                self.seal(day, boundary, next_day)
+            except Exception as e:
+                self.logger.error(f"Error sealing {day}: {e}")
+                self.logger.error(f"Full traceback: {traceback.format_exc()}")
+            day, boundary = self.next_boundary(now)
+
+    def seal(self, day: str, boundary: float, next_day: str):
+        """Split the trackers at `boundary` and queue `day`'s final counters for writing"""
+        app_times, timeline = self.tracker.seal_day(boundary, next_day) if self.tracker else ({}, None)
+        bg_video_times, verified_times = self.bg_tracker.seal_day(boundary, next_day) if self.bg_tracker else ({}, {})
+
+        self.persistence_writer.submit(TrackingSnapshot(
+            date=day,
+            taken_at=time.time(),
+            app_times=app_times,
+            bg_video_times=bg_video_times,
+            verified_times=verified_times,
+            has_background=self.bg_tracker is not None,
+            timeline=timeline,
+            sealed=True
+        ))
+        self.rollovers += 1
+        self.last_sealed_day = day
+        self.logger.info(f"🌙 Sealed {day}: {len(app_times)} apps, {sum(app_times.values()):.0f}s - "
+                         f"tracking continues as {next_day}")
+
+    def stop(self):
+        self.shutdown_event.set()
+        if self.is_alive():
+            self.join(timeout=5)
+
 
 # DEBUG FUNCTION to check persistence files
 def debug_persistence_files():
@@ -1204,6 +3152,85 @@ def debug_persistence_files():
 # Uncomment to debug persistence files:
 # debug_persistence_files()
 
+def test_snapshot_crash_recovery() -> bool:
+    """Fault-injection check for atomic snapshot writes: simulates torn writes and crashes mid-save"""
+    print("🧪 TESTING SNAPSHOT CRASH RECOVERY")
+    print("=" * 50)
+
+    class SimulatedCrash(Exception):
+        pass
+
+    persistence = CompleteEnhancedProductivityDataPersistence(
+        CompleteEnhancedConfig(LOG_DIR=tempfile.mkdtemp(prefix="am_crash_"), ENABLE_DATED_BACKUPS=False))
+    path = persistence.app_times_file
+
+    def fresh_load() -> Dict[str, Any]:
+        # A new instance has no in-memory generation state, like a restart after the crash
+        return CompleteEnhancedProductivityDataPersistence(persistence.config)._load_json_file(path)
+
+    def torn_temp_write(temp_path: str, payload: bytes):
+        with open(temp_path, 'wb') as f:
+            f.write(payload[:len(payload) // 2])
+        raise SimulatedCrash("power lost while writing the temp file")
+
+    def crash_between_renames(temp_path: str, filepath: str):
+        os.replace(filepath, filepath + '.prev')
+        raise SimulatedCrash("power lost between the two renames")
+
+    def corrupt_main_file(mode: str):
+        with open(path, 'rb') as f:
+            raw = f.read()
+        if mode == 'truncate':
+            raw = raw[:len(raw) - 20]
+        else:
+            # Flip the low bit of the stored digit - still valid JSON, so only the checksum can catch it
+            index = raw.index(b'"value": ') + len(b'"value": ')
+            raw = raw[:index] + bytes([raw[index] ^ 0x01]) + raw[index + 1:]
+        with open(path, 'wb') as f:
+            f.write(raw)
+
+    results = []
+
+    def check(name: str, expected_value: int):
+        loaded = fresh_load().get('value')
+        passed = loaded == expected_value
+        results.append(passed)
+        print(f"   {'✅' if passed else '❌'} {name}: loaded value {loaded} (expected {expected_value})")
+
+    persistence._save_json_file(path, {'value': 1})
+    persistence._save_json_file(path, {'value': 2})
+    check("Clean writes", 2)
+
+    persistence._write_temp_file = torn_temp_write
+    persistence._save_json_file(path, {'value': 3})
+    del persistence._write_temp_file
+    check("Torn temp file", 2)
+
+    persistence._commit_temp_file = crash_between_renames
+    persistence._save_json_file(path, {'value': 4})
+    del persistence._commit_temp_file
+    check("Crash between renames", 4)
+
+    persistence._save_json_file(path, {'value': 5})
+    corrupt_main_file('truncate')
+    check("Truncated snapshot", 4)
+
+    persistence._save_json_file(path, {'value': 6})
+    persistence._save_json_file(path, {'value': 7})
+    corrupt_main_file('bitflip')
+    check("Checksum mismatch", 6)
+
+    for leftover in glob.glob(path + '*'):
+        os.remove(leftover)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'value': 8}, f)
+    check("Legacy plain JSON", 8)
+
+    print("=" * 50)
+    print(f"{'✅' if all(results) else '❌'} {sum(results)}/{len(results)} crash scenarios recovered")
+    return all(results)
+
+
 class WMIConnectionState(Enum):
     DISCONNECTED = "disconnected"
     CONNECTING = "connecting"
@@ -1818,17 +3845,370 @@ class SessionTracker:
             'shortest_session': min([s.duration_seconds for s in completed_sessions], default=0)
         }
 
+class DateIndexedLog:
+    """Byte offsets where each date starts in an append-only log and its rotated segments
+
+    update() scans only the bytes appended since its last call. A line's date comes from
+    its prefix - "[YYYY-mm-dd ...", "=== Activity Log: YYYY-mm-dd ..." or an event's "ts" -
+    and lines without one (activity block details) belong to the date before them. A date
+    is only added when it is later than the last one indexed, so offsets always increase.
+    rotate() renames the live file to a segment and keeps that segment's date spans, so
+    ranges_for() can still find a date that was split across files. Everything is kept in
+    a <log>.idx sidecar.
+    """
+
+    DATE_PREFIX = re.compile(rb'^(?:\[|=== Activity Log: |\{"type":"[a-z_]+","ts":")(\d{4}-\d{2}-\d{2})', re.MULTILINE)
+    HEAD_BYTES = 256  # The file start is fingerprinted so a replaced log is re-indexed
+    SAVE_EVERY_BYTES = 1024 * 1024  # Persist at least this often so a restart rescans little
+    READ_CHUNK = 1024 * 1024
+
+    _instances: Dict[str, 'DateIndexedLog'] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, log_path: str):
+        self.logger = logging.getLogger(__name__)
+        self.log_path = log_path
+        self.index_path = f"{log_path}.idx"
+        self.lock = threading.RLock()
+        self.offsets: Dict[str, int] = {}  # date -> first byte in the live file, in file order
+        self.carry_date: Optional[str] = None  # Date of the undated lines a live file starts with after a rotation
+        self.last_date: Optional[str] = None
+        self.indexed_size = 0  # Always at a line boundary
+        self.head: Optional[Tuple[int, int]] = None  # (length, crc32) of the first bytes when indexed
+        self.live_id = 0  # Segment id the live file gets when it is rotated
+        self.segments: List[Dict[str, Any]] = []  # Rotated files, oldest first: {'id', 'path', 'spans'}
+        self.generation = 0  # Bumped whenever indexed lines are forgotten, so tail readers start over
+        self._saved_size = 0
+        self.stats = {'bytes_scanned': 0, 'rebuilds': 0, 'rotations': 0, 'segments_compressed': 0}
+        self._load()
+
+    @classmethod
+    def for_path(cls, log_path: str) -> 'DateIndexedLog':
+        """Shared index per log file"""
+        with cls._instances_lock:
+            index = cls._instances.get(log_path)
+            if index is None:
+                index = cls._instances[log_path] = cls(log_path)
+            return index
+
+    def _load(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.offsets = {day: int(offset) for day, offset in data['offsets']}
+            self.carry_date = data.get('carry')
+            self.last_date = max(self.offsets) if self.offsets else self.carry_date
+            self.indexed_size = self._saved_size = int(data['size'])
+            self.head = tuple(data['head']) if data.get('head') else None
+            self.live_id = int(data.get('live_id', 0))
+            self.segments = [segment for segment in data.get('segments', []) if os.path.exists(segment['path'])]
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.logger.debug(f"Ignoring unreadable log index {self.index_path}: {e}")
+            self._reset()
+
+    def _save(self):
+        try:
+            temp_path = f"{self.index_path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'size': self.indexed_size, 'head': self.head, 'offsets': list(self.offsets.items()),
+                           'carry': self.carry_date, 'live_id': self.live_id, 'segments': self.segments},
+                          f, separators=(',', ':'))
+            os.replace(temp_path, self.index_path)
+            self._saved_size = self.indexed_size
+        except OSError as e:
+            self.logger.debug(f"Could not save log index {self.index_path}: {e}")
+
+    def _reset(self):
+        """Forget the live file's lines (it was replaced or truncated); rotated segments are kept"""
+        self._start_live_file(None)
+        self.last_date = max((day for segment in self.segments for day in segment['spans']), default=None)
+        self.generation += 1
+
+    def _start_live_file(self, carry_date: Optional[str]):
+        self.offsets = {}
+        self.carry_date = carry_date
+        self.indexed_size = self._saved_size = 0
+        self.head = None
+
+    def _read_head(self, f) -> Tuple[int, int]:
+        f.seek(0)
+        head = f.read(self.HEAD_BYTES)
+        return len(head), zlib.crc32(head)
+
+    def update(self) -> int:
+        """Index the complete lines appended since the last call; returns the indexed size"""
+        with self.lock:
+            try:
+                size = os.path.getsize(self.log_path)
+            except OSError:
+                size = 0
+            if size < self.indexed_size:
+                self._reset()
+                self.stats['rebuilds'] += 1
+            if size == self.indexed_size:
+                return self.indexed_size
+
+            dates_before = len(self.offsets)
+            with open(self.log_path, 'rb') as f:
+                if self.head:
+                    f.seek(0)
+                    if zlib.crc32(f.read(self.head[0])) != self.head[1]:
+                        self._reset()
+                        self.stats['rebuilds'] += 1
+                self._scan(f)
+                if not self.head or self.head[0] < self.HEAD_BYTES:
+                    self.head = self._read_head(f)
+
+            if len(self.offsets) != dates_before or self.indexed_size - self._saved_size >= self.SAVE_EVERY_BYTES:
+                self._save()
+            return self.indexed_size
+
+    def _scan(self, f):
+        base = self.indexed_size  # File offset of buffer[0]
+        buffer = b""
+        f.seek(base)
+        while True:
+            chunk = f.read(self.READ_CHUNK)
+            if not chunk:
+                break
+            buffer += chunk
+            cut = buffer.rfind(b'\n') + 1
+            if not cut:
+                continue  # A line longer than one chunk - keep reading
+            for match in self.DATE_PREFIX.finditer(buffer, 0, cut):
+                day = match.group(1).decode('ascii')
+                if self.last_date is None or day > self.last_date:
+                    self.offsets[day] = base + match.start()
+                    self.last_date = day
+            self.stats['bytes_scanned'] += cut
+            base += cut
+            buffer = buffer[cut:]
+        self.indexed_size = base
+
+    def _live_spans(self) -> Dict[str, Tuple[int, int]]:
+        """date -> [start, end) in the live file, for dates that have lines in it"""
+        points = list(self.offsets.items())
+        spans = {}
+        first = points[0][1] if points else self.indexed_size
+        if self.carry_date and first > 0:
+            spans[self.carry_date] = (0, first)
+        for position, (day, start) in enumerate(points):
+            end = points[position + 1][1] if position + 1 < len(points) else self.indexed_size
+            if end > start:
+                spans[day] = (start, end)
+        return spans
+
+    def ranges_for(self, day: str) -> List[Tuple[int, str, int, int]]:
+        """(segment id, path, start, end) of every part of the log holding the date's lines, oldest first"""
+        with self.lock:
+            ranges = [(segment['id'], segment['path'], *segment['spans'][day]) for segment in self.segments
+                      if day in segment['spans'] and os.path.exists(segment['path'])]
+            span = self._live_spans().get(day)
+            if span:
+                ranges.append((self.live_id, self.log_path, *span))
+            return ranges
+
+    def rotation_due(self, max_bytes: int, today: Optional[str] = None) -> Optional[str]:
+        """Why the live file should be rotated now - "size", "new day" (it holds an earlier date) - or None"""
+        with self.lock:
+            self.update()
+            if self.indexed_size == 0:
+                return None
+            if self.indexed_size >= max_bytes:
+                return "size"
+            if today and min(self._live_spans(), default=today) < today:
+                return "new day"
+            return None
+
+    def rotate(self) -> Optional[str]:
+        """Rename the live file to a timestamped segment and start indexing a new one; returns the segment path"""
+        with self.lock:
+            self.update()  # Writers append whole lines, so every byte is indexed now
+            if self.indexed_size == 0:
+                return None
+            segment_path = f"{self.log_path}.{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.old"
+            suffix = 1
+            while os.path.exists(segment_path) or os.path.exists(f"{segment_path}.gz"):
+                segment_path = f"{self.log_path}.{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}_{suffix}.old"
+                suffix += 1
+            os.rename(self.log_path, segment_path)
+
+            self.segments = [segment for segment in self.segments if os.path.exists(segment['path'])]
+            self.segments.append({'id': self.live_id, 'path': segment_path,
+                                  'spans': {day: list(span) for day, span in self._live_spans().items()}})
+            self.live_id += 1
+            self._start_live_file(self.last_date)
+            self.stats['rotations'] += 1
+            self._save()
+            return segment_path
+
+    def compress_segment(self, segment_path: str):
+        """gzip a rotated segment next to itself, repoint the index at it and remove the original"""
+        compressed_path = f"{segment_path}.gz"
+        temp_path = f"{compressed_path}.tmp"
+        with open(segment_path, 'rb') as src, gzip.open(temp_path, 'wb') as dst:
+            while True:
+                chunk = src.read(self.READ_CHUNK)
+                if not chunk:
+                    break
+                dst.write(chunk)
+        os.replace(temp_path, compressed_path)
+        with self.lock:
+            for segment in self.segments:
+                if segment['path'] == segment_path:
+                    segment['path'] = compressed_path
+            self.stats['segments_compressed'] += 1
+            self._save()
+        os.remove(segment_path)  # Tail readers that still held the old path look the range up again
+
+    def uncompressed_segments(self) -> List[str]:
+        with self.lock:
+            return [segment['path'] for segment in self.segments
+                    if not segment['path'].endswith('.gz') and os.path.exists(segment['path'])]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return dict(self.stats, dates=len(self.offsets), indexed_bytes=self.indexed_size, segments=len(self.segments))
+
+class LogTailReader:
+    """Reads one date's lines of a DateIndexedLog incrementally and keeps what `parse` returned
+
+    Each read() continues from where the previous one stopped in every segment holding the
+    date, so a report rendered every minute only reads the lines appended since the last one,
+    and a rotation does not make it read anything twice. Asking for another date, or the index
+    forgetting lines because the log was replaced, starts again from the date's first offset.
+    """
+
+    def __init__(self, log_path: str, parse: Callable[[str], Optional[Any]]):
+        self.index = DateIndexedLog.for_path(log_path)
+        self.parse = parse
+        self.lock = threading.Lock()
+        self.date: Optional[str] = None
+        self.generation = -1
+        self.positions: Dict[int, int] = {}  # Segment id -> bytes read up to
+        self.items: List[Any] = []
+        self.stats = {'reads': 0, 'bytes_read': 0}
+
+    def read(self, day: str) -> List[Any]:
+        with self.lock:
+            self.index.update()
+            self.stats['reads'] += 1
+            if day != self.date or self.index.generation != self.generation:
+                self.date, self.generation, self.positions, self.items = day, self.index.generation, {}, []
+
+            for _ in range(2):
+                try:
+                    for segment_id, path, start, end in self.index.ranges_for(day):
+                        position = max(self.positions.get(segment_id, start), start)
+                        if end > position:
+                            self._read_range(path, position, end)
+                            self.positions[segment_id] = end
+                    break
+                except FileNotFoundError:
+                    continue  # The segment was compressed meanwhile - look its path up again
+            return list(self.items)
+
+    def _read_range(self, path: str, start: int, end: int):
+        with (gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')) as f:
+            f.seek(start)
+            data = f.read(end - start)
+        self.stats['bytes_read'] += len(data)
+        for line in data.decode('utf-8', errors='replace').splitlines():
+            item = self.parse(line)
+            if item is not None:
+                self.items.append(item)
+
+class BoundedQueueHandler(QueueHandler):
+    """QueueHandler with a bounded queue and a drop policy, for use with BoundedQueueListener
+
+    Records stay in-process, so prepare() leaves formatting (and the exception traceback)
+    to the listener thread - the logging call only pays for one queue put.
+    Drop policies when the queue is full: "drop_new" discards the incoming record,
+    "drop_oldest" evicts the oldest queued record, "block" waits up to BLOCK_TIMEOUT
+    seconds for room and then discards the incoming record. Warnings and errors always
+    evict the oldest record rather than being discarded themselves.
+    """
+
+    DROP_POLICIES = ("drop_new", "drop_oldest", "block")
+    BLOCK_TIMEOUT = 1.0
+
+    def __init__(self, maxsize: int = 10000, drop_policy: str = "drop_new"):
+        super().__init__(queue.Queue(maxsize=maxsize))
+        self.drop_policy = drop_policy if drop_policy in self.DROP_POLICIES else "drop_new"
+        self._stats_lock = threading.Lock()
+        self.stats = {'queued': 0, 'dropped': 0, 'max_queue_depth': 0}
+        self.dropped_by_level: Dict[str, int] = {}
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        dropped: List[logging.LogRecord] = []
+        queued = True
+        try:
+            if self.drop_policy == "block":
+                self.queue.put(record, timeout=self.BLOCK_TIMEOUT)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            queued = False
+            if self.drop_policy == "drop_oldest" or record.levelno >= logging.WARNING:
+                try:
+                    dropped.append(self.queue.get_nowait())
+                    self.queue.put_nowait(record)
+                    queued = True
+                except (queue.Empty, queue.Full):
+                    pass
+            if not queued:
+                dropped.append(record)
+
+        with self._stats_lock:
+            if queued:
+                self.stats['queued'] += 1
+                self.stats['max_queue_depth'] = max(self.stats['max_queue_depth'], self.queue.qsize())
+            for lost in dropped:
+                self.stats['dropped'] += 1
+                self.dropped_by_level[lost.levelname] = self.dropped_by_level.get(lost.levelname, 0) + 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return dict(self.stats, queue_depth=self.queue.qsize(), drop_policy=self.drop_policy,
+                        dropped_by_level=dict(self.dropped_by_level))
+
+class BoundedQueueListener(QueueListener):
+    """QueueListener whose stop sentinel waits for room instead of failing on a full queue"""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
 class CompleteEnhancedActivityLogger:
+    _log_listener: Optional[BoundedQueueListener] = None  # One listener per process, replaced on re-setup
+    _atexit_registered = False  # stop_log_listener is registered with atexit once, not on every setup
+
     def __init__(self, config: CompleteEnhancedConfig):
         self.config = config
         self.log_buffer = []
-        self.buffer_lock = threading.Lock()
+        self.event_buffer: List[str] = []  # Serialized ActivityEvents for config.ACTIVITY_EVENTS_LOG
+        self.buffer_lock = threading.Lock()  # Only guards appends and the buffer swap - never held during I/O
+        self.flush_lock = threading.Lock()  # One flush at a time, so batches reach the files in order
+        self.flush_wanted = threading.Event()  # Set once LOG_FLUSH_MAX_LINES are waiting (see ActivityLogFlusher)
+        self.flush_stats = {'flushes': 0, 'size_triggered': 0, 'lines_written': 0, 'write_errors': 0,
+                            'buffer_high_water': 0, 'last_flush_ms': 0.0, 'max_flush_ms': 0.0, 'total_flush_ms': 0.0}
         self.login_logout_events = []
         
         # Sent reports tracking
         self.sent_reports_file = os.path.join(config.LOG_DIR, "sent_reports.json")
+
+        # With the SQLite backend, session events and the report ledger live in the database
+        self.store: Optional[SQLiteTrackingStore] = (
+            SQLiteTrackingStore.for_path(config.SQLITE_DB_FILE) if config.PERSISTENCE_BACKEND == "sqlite" else None)
+        self._pending_session_events: List[Tuple[float, str]] = []
         
         self._setup_enhanced_logging()
+        if self.store and self.store.is_new:
+            self._import_sent_reports_into_store()
         self._cleanup_old_files()
         self._add_startup_separator()
 
@@ -1853,28 +4233,90 @@ class CompleteEnhancedActivityLogger:
         
         debug_handler.setFormatter(formatter)
         console_handler.setFormatter(formatter)
+
+        handlers: List[logging.Handler] = [debug_handler, console_handler]
+        self.log_queue_handler: Optional[BoundedQueueHandler] = None
+        CompleteEnhancedActivityLogger.stop_log_listener()
+        if self.config.LOGGING_MODE == "queue":
+            # Callers only enqueue; formatting and console/file I/O happen on the listener thread
+            self.log_queue_handler = BoundedQueueHandler(self.config.LOG_QUEUE_SIZE, self.config.LOG_QUEUE_DROP_POLICY)
+            listener = BoundedQueueListener(self.log_queue_handler.queue, *handlers, respect_handler_level=True)
+            listener.start()
+            CompleteEnhancedActivityLogger._log_listener = listener
+            if not CompleteEnhancedActivityLogger._atexit_registered:
+                atexit.register(CompleteEnhancedActivityLogger.stop_log_listener)
+                CompleteEnhancedActivityLogger._atexit_registered = True
+            handlers = [self.log_queue_handler]
         
         logging.basicConfig(
             level=logging.INFO,
-            handlers=[debug_handler, console_handler],
+            handlers=handlers,
             force=True
         )
         
         self.logger = logging.getLogger(__name__)
         self._setup_activity_log_rotation()
 
+    @classmethod
+    def stop_log_listener(cls):
+        """Drain the log queue into the real handlers and stop the listener thread"""
+        listener, cls._log_listener = cls._log_listener, None
+        if listener is not None:
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
+
     def _setup_activity_log_rotation(self):
-        """Setup rotation for the activity log file"""
-        try:
-            if os.path.exists(self.config.ACTIVITY_LOG):
-                size_mb = os.path.getsize(self.config.ACTIVITY_LOG) / (1024 * 1024)
-                if size_mb > self.config.MAX_ACTIVITY_LOG_SIZE_MB:
-                    timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-                    archive_name = f"{self.config.ACTIVITY_LOG}.{timestamp}.old"
-                    os.rename(self.config.ACTIVITY_LOG, archive_name)
-                    self.logger.info(f"📦 Archived large activity log: {archive_name}")
-        except Exception as e:
-            self.logger.debug(f"Activity log rotation check failed: {e}")
+        """Index the activity log and its event stream, rotate them if already due and finish interrupted compressions"""
+        # Per-date byte offsets for readers of the logs, kept across rotated segments
+        self.log_indexes = [DateIndexedLog.for_path(self.config.ACTIVITY_LOG)]
+        if self.config.ENABLE_EVENT_LOG:
+            self.log_indexes.append(DateIndexedLog.for_path(self.config.ACTIVITY_EVENTS_LOG))
+        self._compressor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+        if self.config.COMPRESS_ROTATED_LOGS:
+            for log_index in self.log_indexes:
+                for segment_path in log_index.uncompressed_segments():
+                    self._compress_segment_later(log_index, segment_path)
+        with self.flush_lock:
+            self.rotate_logs_if_due()
+
+    def rotate_logs_if_due(self):
+        """Roll each log over to a segment once it reaches MAX_ACTIVITY_LOG_SIZE_MB or holds an earlier day
+
+        Called with flush_lock held, so no buffered batch or activity block is half-written.
+        """
+        today = datetime.date.today().isoformat() if self.config.ROTATE_ACTIVITY_LOG_DAILY else None
+        max_bytes = self.config.MAX_ACTIVITY_LOG_SIZE_MB * 1024 * 1024
+        rotated = False
+        for log_index in self.log_indexes:
+            try:
+                reason = log_index.rotation_due(max_bytes, today)
+                if not reason:
+                    continue
+                segment_path = log_index.rotate()
+                if segment_path:
+                    rotated = True
+                    self.logger.info(f"📦 Rotated {os.path.basename(log_index.log_path)} ({reason}): {os.path.basename(segment_path)}")
+                    if self.config.COMPRESS_ROTATED_LOGS:
+                        self._compress_segment_later(log_index, segment_path)
+            except OSError as e:
+                self.logger.debug(f"Activity log rotation failed for {log_index.log_path}: {e}")
+        if rotated:
+            self._cleanup_old_files()
+
+    def _compress_segment_later(self, log_index: DateIndexedLog, segment_path: str):
+        if self._compressor is None:
+            self._compressor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="LogCompressor")
+
+        def compress():
+            try:
+                log_index.compress_segment(segment_path)
+                self.logger.debug(f"🗜️ Compressed {os.path.basename(segment_path)}")
+            except OSError as e:
+                self.logger.warning(f"Could not compress {segment_path}: {e}")
+
+        self._compressor.submit(compress)
 
     def _add_startup_separator(self):
         """Add a clear separator when script starts"""
@@ -1905,12 +4347,15 @@ class CompleteEnhancedActivityLogger:
                 # Archived log files
                 os.path.join(self.config.LOG_DIR, "*.old"),
                 os.path.join(self.config.LOG_DIR, "startup_debug.log.*"),
-                os.path.join(self.config.LOG_DIR, "monitor_output.log.*")
+                os.path.join(self.config.LOG_DIR, "monitor_output.log.*"),
+                os.path.join(self.config.LOG_DIR, "monitor_events.jsonl.*")
             ]
             
             cleaned_count = 0
             for pattern in cleanup_patterns:
                 for filepath in glob.glob(pattern):
+                    if filepath.endswith('.idx'):
+                        continue  # Live DateIndexedLog sidecar, not an archive
                     try:
                         file_time = os.path.getmtime(filepath)
                         if file_time < cutoff_timestamp:
@@ -1931,6 +4376,14 @@ class CompleteEnhancedActivityLogger:
     # Sent Reports Tracking Methods
     def mark_report_sent(self, date: str, report_type: str = "daily"):
         """Mark a report as successfully sent"""
+        if self.store:
+            try:
+                self.store.mark_report_sent(date, report_type)
+                self.logger.info(f"📝 Marked {report_type} report for {date} as sent")
+            except Exception as e:
+                self.logger.error(f"Error marking report as sent: {e}")
+            return
+
         try:
             sent_reports = self._load_sent_reports()
             
@@ -1951,8 +4404,7 @@ class CompleteEnhancedActivityLogger:
                 if date >= cutoff_str
             }
             
-            with open(self.sent_reports_file, 'w', encoding='utf-8') as f:
-                json.dump(sent_reports, f, indent=2)
+            PersistedSchema.write_plain(self.sent_reports_file, 'sent_reports', {'reports': sent_reports})
             
             self.logger.info(f"📝 Marked {report_type} report for {date} as sent")
             
@@ -1962,18 +4414,34 @@ class CompleteEnhancedActivityLogger:
     def was_report_sent(self, date: str, report_type: str = "daily") -> bool:
         """Check if a report was already sent for a specific date"""
         try:
+            if self.store:
+                return self.store.was_report_sent(date, report_type)
             sent_reports = self._load_sent_reports()
             return date in sent_reports and report_type in sent_reports[date]
         except Exception as e:
             self.logger.debug(f"Error checking sent reports: {e}")
             return False
 
+    def _import_sent_reports_into_store(self):
+        """Carry sent_reports.json into a new database so missed-report recovery does not re-send"""
+        entries = []
+        for date, reports in self._load_sent_reports().items():
+            for report_type, entry in reports.items():
+                sent_at = entry.get('timestamp') if isinstance(entry, dict) else None
+                entries.append((date, report_type, float(sent_at or time.time())))
+        if not entries:
+            return
+        try:
+            self.store.import_sent_reports(entries)
+            self.logger.info(f"📥 Imported {len(entries)} sent-report entries into {self.store.db_path}")
+        except Exception as e:
+            self.logger.warning(f"⚠️  Could not import {self.sent_reports_file}: {e}")
+
     def _load_sent_reports(self) -> dict:
-        """Load the sent reports tracking file"""
+        """Load the sent reports tracking file ({date: {report_type: entry}})"""
         try:
-            if os.path.exists(self.sent_reports_file):
-                with open(self.sent_reports_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+            ledger, _ = PersistedSchema.read_plain(self.sent_reports_file, 'sent_reports')
+            return ledger.get('reports', {})
         except Exception as e:
             self.logger.debug(f"Error loading sent reports: {e}")
         return {}
@@ -2004,32 +4472,149 @@ class CompleteEnhancedActivityLogger:
     def debug_log(self, message: str):
         self.logger.info(message)
 
-    def buffer_log_entry(self, entry: str):
+    def buffer_log_entry(self, entry: str, event: Optional[ActivityEvent] = None):
+        """Queue a human log line and, with the event log on, its typed event (a MESSAGE if none is given)"""
+        now = datetime.datetime.now()
         with self.buffer_lock:
             clean_entry = AppNameCleaner.clean_all_exe_from_text(entry)
-            self.log_buffer.append(f"[{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {clean_entry}")
+            self.log_buffer.append(f"[{now.strftime('%Y-%m-%d %H:%M:%S')}] {clean_entry}")
+            self._buffer_event_locked(event or ActivityEvent(ActivityEventType.MESSAGE), now, clean_entry)
+            self._note_buffered_locked()
 
-    def buffer_login_logout_event(self, event: str):
-        timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    def buffer_event(self, event: ActivityEvent):
+        """Queue a typed event that has no line of its own in monitor_output.log"""
+        with self.buffer_lock:
+            self._buffer_event_locked(event, datetime.datetime.now())
+            self._note_buffered_locked()
+
+    def _buffer_event_locked(self, event: ActivityEvent, now: datetime.datetime, text: Optional[str] = None):
+        if not self.config.ENABLE_EVENT_LOG:
+            return
+        event.ts = event.ts or now.isoformat(timespec='milliseconds')
+        if text is not None and event.text is None:
+            event.text = text
+        self.event_buffer.append(event.to_json())
+
+    def _note_buffered_locked(self):
+        depth = max(len(self.log_buffer), len(self.event_buffer))
+        if depth > self.flush_stats['buffer_high_water']:
+            self.flush_stats['buffer_high_water'] = depth
+        if depth >= self.config.LOG_FLUSH_MAX_LINES and not self.flush_wanted.is_set():
+            self.flush_stats['size_triggered'] += 1
+            self.flush_wanted.set()
+
+    def buffer_login_logout_event(self, event: str, kind: str = "other"):
+        """Queue a session line; `kind` is one of ActivityEvent.SESSION_KINDS for events the session parsers read"""
+        now = datetime.datetime.now()
+        timestamp = now.strftime('%Y-%m-%d %H:%M:%S')
         with self.buffer_lock:
             clean_event = AppNameCleaner.clean_all_exe_from_text(event)
             formatted_event = f"[{timestamp}] {clean_event}"
             self.log_buffer.append(formatted_event)
             self.login_logout_events.append(formatted_event)
+            self._buffer_event_locked(ActivityEvent(ActivityEventType.SESSION, kind=kind), now, clean_event)
+            if self.store:
+                self._pending_session_events.append((time.time(), clean_event))
+            self._note_buffered_locked()
 
     def get_recent_login_logout_events(self) -> List[str]:
         with self.buffer_lock:
             return self.login_logout_events.copy()
 
     def flush_buffer(self):
-        with self.buffer_lock:
-            if self.log_buffer:
+        """Write everything buffered so far
+
+        The buffers are swapped for empty ones under buffer_lock, so a tracker calling
+        buffer_log_entry never waits for the file writes; a batch that fails to write is
+        put back in front of anything buffered since.
+        """
+        with self.flush_lock:
+            self.rotate_logs_if_due()
+            with self.buffer_lock:
+                lines, self.log_buffer = self.log_buffer, []
+                events, self.event_buffer = self.event_buffer, []
+                session_events, self._pending_session_events = self._pending_session_events, []
+
+            started = time.perf_counter()
+            if lines:
                 try:
                     with open(self.config.ACTIVITY_LOG, "a", encoding="utf-8") as f:
-                        f.write("\n".join(self.log_buffer) + "\n")
-                    self.log_buffer.clear()
+                        f.write("\n".join(lines) + "\n")
                 except IOError as e:
                     self.logger.error(f"Failed to write to activity log: {e}")
+                    self._requeue('log_buffer', lines)
+
+            if events:
+                try:
+                    with open(self.config.ACTIVITY_EVENTS_LOG, "a", encoding="utf-8") as f:
+                        f.write("\n".join(events) + "\n")
+                except IOError as e:
+                    self.logger.error(f"Failed to write to activity event log: {e}")
+                    self._requeue('event_buffer', events)
+
+            # Index what was appended here and by ActivityReporter since the last flush
+            for log_index in self.log_indexes:
+                try:
+                    log_index.update()
+                except OSError as e:
+                    self.logger.debug(f"Log index update failed for {log_index.log_path}: {e}")
+
+            if session_events:
+                try:
+                    self.store.append_session_events(session_events)
+                except Exception as e:
+                    self.logger.error(f"Failed to write session events to SQLite: {e}")
+                    self._requeue('_pending_session_events', session_events)
+
+            if lines or events or session_events:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                stats = self.flush_stats
+                stats['flushes'] += 1
+                stats['lines_written'] += len(lines)
+                stats['last_flush_ms'] = round(elapsed_ms, 3)
+                stats['max_flush_ms'] = round(max(stats['max_flush_ms'], elapsed_ms), 3)
+                stats['total_flush_ms'] += elapsed_ms
+
+    def _requeue(self, buffer_name: str, batch: list):
+        with self.buffer_lock:
+            getattr(self, buffer_name)[:0] = batch
+            self.flush_stats['write_errors'] += 1
+
+    def get_buffer_stats(self) -> Dict[str, Any]:
+        with self.buffer_lock:
+            stats = dict(self.flush_stats, buffered_lines=len(self.log_buffer), buffered_events=len(self.event_buffer))
+        stats['avg_flush_ms'] = round(stats.pop('total_flush_ms') / stats['flushes'], 3) if stats['flushes'] else 0.0
+        return stats
+
+class ActivityLogFlusher(threading.Thread):
+    """Flushes CompleteEnhancedActivityLogger every LOG_FLUSH_INTERVAL seconds, or as soon as
+    LOG_FLUSH_MAX_LINES are waiting, so tracker threads only ever append to the buffers"""
+
+    def __init__(self, activity_logger: CompleteEnhancedActivityLogger):
+        super().__init__(daemon=True, name="ActivityLogFlusher")
+        self.logger = logging.getLogger(__name__)
+        self.activity_logger = activity_logger
+        self.interval = activity_logger.config.LOG_FLUSH_INTERVAL
+        self.shutdown_event = threading.Event()
+
+    def run(self):
+        self.logger.info("ActivityLogFlusher thread starting...")
+        flush_wanted = self.activity_logger.flush_wanted
+        while not self.shutdown_event.is_set():
+            flush_wanted.wait(self.interval)
+            flush_wanted.clear()
+            try:
+                self.activity_logger.flush_buffer()
+            except Exception as e:
+                self.logger.error(f"Error flushing activity log: {e}")
+
+    def stop(self):
+        """Stop the thread and write whatever is still buffered"""
+        self.shutdown_event.set()
+        self.activity_logger.flush_wanted.set()
+        if self.is_alive():
+            self.join(timeout=5)
+        self.activity_logger.flush_buffer()
 
 class ConfigManager:
     def __init__(self, config_path: str):
@@ -2102,6 +4687,119 @@ class EnhancedConfigManager(ConfigManager):
         logger.info(f"   To email: {status['to_email'] or 'Not configured'}")
 
 
+class KeywordMatcher:
+    """Matches a fixed keyword list against text in a single regex pass
+
+    The keywords are compiled once into one trie-shaped alternation, so shared prefixes
+    are only walked once instead of re-scanning the text for every keyword. Matching is
+    case-sensitive, exactly like the `keyword in text` scans it replaces - callers lower-case
+    the text first.
+    """
+
+    def __init__(self, keywords):
+        self.keywords: List[str] = list(dict.fromkeys(keyword for keyword in keywords if keyword))
+        self._order = {keyword: index for index, keyword in enumerate(self.keywords)}
+        # Keywords that are prefixes of a longer keyword match at the same position as it
+        self._prefixes = {keyword: [other for other in self.keywords if other != keyword and keyword.startswith(other)]
+                          for keyword in self.keywords}
+
+        if self.keywords:
+            pattern = self._build_trie_pattern(self.keywords)
+            self._search_re = re.compile(pattern)
+            self._scan_re = re.compile(f"(?=({pattern}))")
+        else:
+            self._search_re = self._scan_re = None
+
+    @staticmethod
+    def _build_trie_pattern(keywords: List[str]) -> str:
+        trie: Dict[str, Any] = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[''] = True
+
+        def emit(node) -> str:
+            branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char != '']
+            if not branches:
+                return ''
+            body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+            # Optional greedy tail - the longest keyword at a position wins
+            return f'(?:{body})?' if '' in node else body
+
+        return emit(trie)
+
+    def matches_any(self, text: str) -> bool:
+        return bool(self._search_re and text and self._search_re.search(text))
+
+    def search(self, text: str) -> Optional[str]:
+        """Leftmost (then longest) keyword in text"""
+        if not self._search_re or not text:
+            return None
+        match = self._search_re.search(text)
+        return match.group(0) if match else None
+
+    def find_all(self, text: str) -> List[Tuple[int, str]]:
+        """Every (position, keyword) occurrence, overlapping matches included"""
+        if not self._scan_re or not text:
+            return []
+        # The plain search is much cheaper than the overlapping scan - use it to skip ahead
+        first = self._search_re.search(text)
+        if first is None:
+            return []
+        matches = []
+        for match in self._scan_re.finditer(text, first.start()):
+            keyword = match.group(1)
+            position = match.start()
+            matches.append((position, keyword))
+            matches.extend((position, prefix) for prefix in self._prefixes[keyword])
+        return matches
+
+    def matched_keywords(self, text: str) -> List[str]:
+        """Distinct keywords found in text, in keyword-list order"""
+        found = {keyword for _, keyword in self.find_all(text)}
+        return sorted(found, key=self._order.__getitem__)
+
+    def first_in_order(self, text: str) -> Optional[str]:
+        """First keyword in list order that occurs in text - the `for kw in list: if kw in text` idiom"""
+        found = {keyword for _, keyword in self.find_all(text)}
+        return min(found, key=self._order.__getitem__) if found else None
+
+def benchmark_keyword_matcher(iterations: int = 20000):
+    """Compare KeywordMatcher against the list scans it replaced on typical window titles"""
+    titles = [
+        "google chrome - lofi hip hop radio - youtube - google chrome",
+        "microsoft word - quarterly report.docx",
+        "mozilla firefox - pull request #42 · github - mozilla firefox",
+        "slack - #general - acme corp",
+        "google chrome - oldschool runescape wiki - google chrome",
+        "explorer.exe - downloads",
+    ]
+    keywords = (AppCategorizer.UNPRODUCTIVE_KEYWORDS + AppCategorizer.PRODUCTIVE_KEYWORDS +
+                AppCategorizer.UNPRODUCTIVE_INDICATORS + AppCategorizer.PRODUCTIVE_INDICATORS)
+    matcher = KeywordMatcher(keywords)
+
+    print("🧪 KEYWORD MATCHER BENCHMARK")
+    print("=" * 60)
+    print(f"   {len(matcher.keywords)} keywords, {len(titles)} titles, {iterations:,} iterations")
+
+    cases = [
+        ("any()", lambda title: any(keyword in title for keyword in keywords), matcher.matches_any),
+        ("all matches", lambda title: [keyword for keyword in keywords if keyword in title], matcher.matched_keywords),
+    ]
+    results = {}
+    for case_name, list_scan, compiled in cases:
+        timings = {}
+        for label, func in (("list scan", list_scan), ("matcher", compiled)):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                for title in titles:
+                    func(title)
+            timings[label] = (time.perf_counter() - start) / (iterations * len(titles)) * 1e6
+        results[case_name] = timings
+        print(f"   {case_name:<12} list scan {timings['list scan']:.2f}µs | matcher {timings['matcher']:.2f}µs per title")
+    return results
+
 class AppCategorizer:
     PRODUCTIVE_KEYWORDS = [
         'word', 'excel', 'powerpoint', 'onenote', 'outlook',
@@ -2146,8 +4844,163 @@ class AppCategorizer:
         'searchprotocolhost.exe', 'searchfilterhost.exe'
     ]
 
+    GAMING_INDICATORS = [
+        'runescape', 'osrs', 'oldschool runescape', 'jagex',
+        'world of warcraft', 'wow', 'league of legends', 'valorant',
+        'fortnite', 'minecraft', 'steam', 'epic games'
+    ]
+
+    PRODUCTIVE_INDICATORS = [
+        # Work platforms
+        'microsoft teams', 'slack', 'zoom', 'google workspace',
+        'office 365', 'sharepoint', 'onedrive',
+
+        # Development
+        'github', 'gitlab', 'stack overflow', 'stackoverflow',
+        'visual studio', 'documentation', 'developer',
+
+        # Professional services
+        'linkedin', 'salesforce', 'jira', 'confluence',
+
+        # Email/Calendar
+        'gmail', 'outlook', 'calendar', 'email'
+    ]
+
+    UNPRODUCTIVE_INDICATORS = [
+        # Social Media (exact matches)
+        'facebook', 'instagram', 'twitter', 'tiktok',
+        'snapchat', 'reddit', 'pinterest',
+
+        # Video Entertainment
+        'youtube', 'netflix', 'hulu', 'disney+', 'twitch',
+
+        # Gaming
+        'steam', 'epic games', 'gaming', 'game',
+        'runescape', 'oldschool runescape', 'osrs',
+
+        # ADDED: Shopping indicators
+        'amazon.com', 'amazon shopping', 'buy now', 'add to cart',
+        'ebay', 'etsy', 'walmart', 'target', 'best buy',
+        'price', 'shipping', 'reviews', 'product details',
+
+        # Entertainment News
+        'entertainment', 'celebrity', 'gossip', 'memes'
+    ]
+
+    # ENHANCED: Amazon-specific patterns
+    AMAZON_PATTERNS = [
+        '/dp/', '/gp/product', 'amazon.com',
+        'add to cart', 'buy now', 'prime delivery',
+        'customer reviews', 'product details'
+    ]
+
+    BROWSER_INDICATORS = [
+        'mozilla firefox', 'google chrome', 'microsoft edge',
+        'safari', 'opera', 'brave'
+    ]
+
+    # Exclude empty tabs and browser-only windows
+    EMPTY_TAB_PATTERNS = [
+        'new tab', 'about:blank', 'chrome://newtab',
+        'edge://newtab', 'about:newtab'
+    ]
+
+    # Compiled KeywordMatcher per keyword list, rebuilt when the list object changes
+    _matchers: Dict[str, Tuple[int, int, KeywordMatcher]] = {}
+
+    @classmethod
+    def _matcher(cls, list_name: str) -> KeywordMatcher:
+        keywords = getattr(cls, list_name)
+        cached = cls._matchers.get(list_name)
+        if cached is None or cached[0] != id(keywords) or cached[1] != len(keywords):
+            cached = (id(keywords), len(keywords), KeywordMatcher(keywords))
+            cls._matchers[list_name] = cached
+        return cached[2]
+
+    # Categorization cache - keyed by (title, RULES_VERSION) so a rule change never serves stale results
+    CACHE_MAX_SIZE = 4096
+    RULES_VERSION = 0
+    _category_cache: "OrderedDict[Tuple[str, int], Optional[Category]]" = OrderedDict()
+    _cache_lock = threading.Lock()
+    _cache_hits = 0
+    _cache_misses = 0
+
     @classmethod
     def categorize_app(cls, name: str) -> Optional[Category]:
+        """Cached categorization - repeated titles are a single dictionary hit"""
+        if not name:
+            return None
+
+        cache_key = (name, cls.RULES_VERSION)
+        with cls._cache_lock:
+            if cache_key in cls._category_cache:
+                cls._category_cache.move_to_end(cache_key)
+                cls._cache_hits += 1
+                return cls._category_cache[cache_key]
+            cls._cache_misses += 1
+
+        category = cls._categorize_uncached(name)
+
+        with cls._cache_lock:
+            if cache_key[1] == cls.RULES_VERSION:
+                cls._category_cache[cache_key] = category
+                if len(cls._category_cache) > cls.CACHE_MAX_SIZE:
+                    cls._category_cache.popitem(last=False)
+        return category
+
+    @classmethod
+    def categorize_many(cls, names) -> Dict[str, Optional[Category]]:
+        """Categorize a batch of titles; a title that fails to categorize is reported as UNCATEGORIZED"""
+        results = {}
+        for name in names:
+            try:
+                results[name] = cls.categorize_app(name)
+            except Exception as e:
+                logging.getLogger(__name__).warning(f"Error categorizing app '{name}': {e}")
+                results[name] = Category.UNCATEGORIZED
+        return results
+
+    @classmethod
+    def update_rules(cls, productive_keywords: Optional[List[str]] = None,
+                     unproductive_keywords: Optional[List[str]] = None,
+                     system_processes: Optional[List[str]] = None):
+        """Replace keyword lists and invalidate every cached categorization"""
+        if productive_keywords is not None:
+            cls.PRODUCTIVE_KEYWORDS = list(productive_keywords)
+        if unproductive_keywords is not None:
+            cls.UNPRODUCTIVE_KEYWORDS = list(unproductive_keywords)
+        if system_processes is not None:
+            cls.SYSTEM_PROCESSES = list(system_processes)
+        cls.invalidate_cache()
+
+    @classmethod
+    def invalidate_cache(cls):
+        with cls._cache_lock:
+            cls.RULES_VERSION += 1
+            cls._category_cache.clear()
+            cls._matchers.clear()
+
+    @classmethod
+    def rules_fingerprint(cls) -> str:
+        """Content hash of the keyword lists - unlike RULES_VERSION it is stable across restarts"""
+        rules = json.dumps([cls.PRODUCTIVE_KEYWORDS, cls.UNPRODUCTIVE_KEYWORDS, cls.SYSTEM_PROCESSES])
+        return f"{zlib.crc32(rules.encode('utf-8')):08x}"
+
+    @classmethod
+    def get_cache_stats(cls) -> Dict[str, Any]:
+        with cls._cache_lock:
+            lookups = cls._cache_hits + cls._cache_misses
+            return {
+                'entries': len(cls._category_cache),
+                'max_size': cls.CACHE_MAX_SIZE,
+                'rules_version': cls.RULES_VERSION,
+                'hits': cls._cache_hits,
+                'misses': cls._cache_misses,
+                'hit_rate': round(cls._cache_hits / lookups, 3) if lookups else 0.0
+            }
+
+    @classmethod
+    def _categorize_uncached(cls, name: str) -> Optional[Category]:
         """ENHANCED: Better categorization with shopping site detection"""
         if not name:
             return None
@@ -2156,7 +5009,7 @@ class AppCategorizer:
 
         # Check if it's a system process first
         exe_name = name_lower.split(' - ')[0].strip() if ' - ' in name_lower else name_lower
-        if any(sys_proc in exe_name for sys_proc in cls.SYSTEM_PROCESSES):
+        if cls._matcher('SYSTEM_PROCESSES').matches_any(exe_name):
             return None
 
         # Check if it's a browser with website
@@ -2168,13 +5021,7 @@ class AppCategorizer:
                 return Category.UNPRODUCTIVE
             
             # Gaming detection
-            gaming_indicators = [
-                'runescape', 'osrs', 'oldschool runescape', 'jagex',
-                'world of warcraft', 'wow', 'league of legends', 'valorant',
-                'fortnite', 'minecraft', 'steam', 'epic games'
-            ]
-            
-            if any(indicator in page_content.lower() for indicator in gaming_indicators):
+            if cls._matcher('GAMING_INDICATORS').matches_any(page_content.lower()):
                 return Category.UNPRODUCTIVE
             
             # General categorization
@@ -2186,13 +5033,11 @@ class AppCategorizer:
                 return Category.UNCATEGORIZED
 
         # For non-browser apps
-        for keyword in cls.PRODUCTIVE_KEYWORDS:
-            if keyword in name_lower:
-                return Category.PRODUCTIVE
+        if cls._matcher('PRODUCTIVE_KEYWORDS').matches_any(name_lower):
+            return Category.PRODUCTIVE
         
-        for keyword in cls.UNPRODUCTIVE_KEYWORDS:
-            if keyword in name_lower:
-                return Category.UNPRODUCTIVE
+        if cls._matcher('UNPRODUCTIVE_KEYWORDS').matches_any(name_lower):
+            return Category.UNPRODUCTIVE
             
         return None
 
@@ -2205,7 +5050,7 @@ class AppCategorizer:
         app_lower = app_name.lower()
         exe_name = app_lower.split(' - ')[0].strip() if ' - ' in app_lower else app_lower
         
-        return any(sys_proc in exe_name for sys_proc in cls.SYSTEM_PROCESSES)
+        return cls._matcher('SYSTEM_PROCESSES').matches_any(exe_name)
     
     @classmethod
     def _extract_page_content_from_browser(cls, full_title: str) -> str:
@@ -2241,25 +5086,7 @@ class AppCategorizer:
         if not page_content:
             return False
             
-        content_lower = page_content.lower()
-        
-        productive_indicators = [
-            # Work platforms
-            'microsoft teams', 'slack', 'zoom', 'google workspace',
-            'office 365', 'sharepoint', 'onedrive',
-            
-            # Development
-            'github', 'gitlab', 'stack overflow', 'stackoverflow',
-            'visual studio', 'documentation', 'developer',
-            
-            # Professional services
-            'linkedin', 'salesforce', 'jira', 'confluence',
-            
-            # Email/Calendar
-            'gmail', 'outlook', 'calendar', 'email'
-        ]
-        
-        return any(indicator in content_lower for indicator in productive_indicators)
+        return cls._matcher('PRODUCTIVE_INDICATORS').matches_any(page_content.lower())
 
     @classmethod  
     def _is_clearly_unproductive(cls, page_content: str) -> bool:
@@ -2269,38 +5096,10 @@ class AppCategorizer:
             
         content_lower = page_content.lower()
         
-        unproductive_indicators = [
-            # Social Media (exact matches)
-            'facebook', 'instagram', 'twitter', 'tiktok', 
-            'snapchat', 'reddit', 'pinterest',
-            
-            # Video Entertainment  
-            'youtube', 'netflix', 'hulu', 'disney+', 'twitch',
-            
-            # Gaming
-            'steam', 'epic games', 'gaming', 'game',
-            'runescape', 'oldschool runescape', 'osrs',
-            
-            # ADDED: Shopping indicators
-            'amazon.com', 'amazon shopping', 'buy now', 'add to cart',
-            'ebay', 'etsy', 'walmart', 'target', 'best buy',
-            'price', 'shipping', 'reviews', 'product details',
-            
-            # Entertainment News
-            'entertainment', 'celebrity', 'gossip', 'memes'
-        ]
-        
-        # ENHANCED: Check for Amazon-specific patterns
-        amazon_patterns = [
-            '/dp/', '/gp/product', 'amazon.com',
-            'add to cart', 'buy now', 'prime delivery',
-            'customer reviews', 'product details'
-        ]
-        
-        if any(pattern in content_lower for pattern in amazon_patterns):
+        if cls._matcher('AMAZON_PATTERNS').matches_any(content_lower):
             return True
         
-        return any(indicator in content_lower for indicator in unproductive_indicators)
+        return cls._matcher('UNPRODUCTIVE_INDICATORS').matches_any(content_lower)
 
 
     @classmethod
@@ -2309,24 +5108,11 @@ class AppCategorizer:
         if not app_title:
             return False
             
-        browser_indicators = [
-            'mozilla firefox', 'google chrome', 'microsoft edge',
-            'safari', 'opera', 'brave'
-        ]
-        
         title_lower = app_title.lower()
-        has_browser = any(indicator in title_lower for indicator in browser_indicators)
-        
-        if not has_browser:
+        if not cls._matcher('BROWSER_INDICATORS').matches_any(title_lower):
             return False
         
-        # Exclude empty tabs and browser-only windows
-        exclude_patterns = [
-            'new tab', 'about:blank', 'chrome://newtab',
-            'edge://newtab', 'about:newtab'
-        ]
-        
-        if any(pattern in title_lower for pattern in exclude_patterns):
+        if cls._matcher('EMPTY_TAB_PATTERNS').matches_any(title_lower):
             return False
         
         # Must have actual content (indicated by " - " separator)
@@ -2370,6 +5156,388 @@ class AudioDetector:
 
         return audio_processes
 
+@dataclass(frozen=True)
+class ProcessInfo:
+    pid: int
+    create_time: float
+    name: str  # Raw process name, e.g. "chrome.exe"
+    exe: Optional[str]
+    is_browser: bool
+    clean_name: str  # AppNameCleaner display name, e.g. "Google Chrome"
+
+    @property
+    def key(self) -> Tuple[int, float]:
+        """Identity of the process - a (pid, create_time) pair survives PID reuse"""
+        return (self.pid, self.create_time)
+
+class ProcessInfoCache:
+    """Shared PID -> process metadata cache validated against process create time
+
+    Window enumerators look the same handful of processes up every second. Entries are
+    re-validated with create_time() every revalidate_interval seconds (a reused PID gets a
+    new create time) and swept when the PID disappears from the process list.
+
+    AccessDenied (protected or elevated processes) is remembered for negative_ttl seconds under
+    (pid, create_time) - (pid, None) when the create time itself could not be read - so it is
+    not retried on every enumeration. NoSuchProcess is never cached: Windows reuses PIDs quickly
+    and a new process must not inherit the old one's failure.
+    """
+
+    _shared: Optional['ProcessInfoCache'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, revalidate_interval: float = 30.0, sweep_interval: float = 5.0, negative_ttl: float = 10.0):
+        self.logger = logging.getLogger(__name__)
+        self.revalidate_interval = revalidate_interval
+        self.sweep_interval = sweep_interval
+        self.negative_ttl = negative_ttl
+
+        self._entries: Dict[int, ProcessInfo] = {}
+        self._validated_at: Dict[int, float] = {}
+        self._failures: Dict[Tuple[int, Optional[float]], Tuple[float, Exception]] = {}  # key -> (failed at, error)
+        self._last_sweep = 0.0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.negative_hits = 0
+
+    @classmethod
+    def shared(cls) -> 'ProcessInfoCache':
+        """Process-wide instance shared by SystemMonitor, BackgroundVideoTracker and event sources"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def get(self, pid: int) -> ProcessInfo:
+        """Return metadata for pid. Raises psutil.NoSuchProcess / psutil.AccessDenied like psutil.Process"""
+        now = time.time()
+        with self._lock:
+            if now - self._last_sweep >= self.sweep_interval:
+                self._sweep_exited_processes(now)
+
+            info = self._entries.get(pid)
+            if info is not None and now - self._validated_at[pid] < self.revalidate_interval:
+                self.hits += 1
+                return info
+            self._raise_cached_failure((pid, None), now)
+
+        # Slow path - open the process outside the lock
+        try:
+            proc = psutil.Process(pid)
+            create_time = proc.create_time()
+        except psutil.AccessDenied as e:
+            self._remember_failure((pid, None), now, e)
+            raise
+
+        with self._lock:
+            info = self._entries.get(pid)
+            if info is not None and info.create_time == create_time:
+                self._validated_at[pid] = now
+                self.hits += 1
+                return info
+            self._raise_cached_failure((pid, create_time), now)
+
+        try:
+            name = proc.name()
+        except psutil.AccessDenied as e:
+            self._remember_failure((pid, create_time), now, e)
+            raise
+        try:
+            exe = proc.exe()
+        except (psutil.AccessDenied, psutil.NoSuchProcess, OSError):
+            exe = None
+
+        info = ProcessInfo(
+            pid=pid,
+            create_time=create_time,
+            name=name,
+            exe=exe,
+            is_browser=name.lower() in SystemMonitor.BROWSER_PROCESSES,
+            clean_name=AppNameCleaner.clean_app_name(name)
+        )
+
+        with self._lock:
+            if pid in self._entries:
+                # Same PID, different create time - the PID was reused
+                self.evictions += 1
+            self._entries[pid] = info
+            self._validated_at[pid] = now
+            self.misses += 1
+
+        return info
+
+    def _raise_cached_failure(self, key: Tuple[int, Optional[float]], now: float):
+        """Re-raise a recent failure for key (caller holds the lock)"""
+        failure = self._failures.get(key)
+        if failure is None:
+            return
+        failed_at, error = failure
+        if now - failed_at >= self.negative_ttl:
+            del self._failures[key]
+            return
+        self.negative_hits += 1
+        raise error.with_traceback(None)
+
+    def _remember_failure(self, key: Tuple[int, Optional[float]], now: float, error: Exception):
+        with self._lock:
+            self._failures[key] = (now, error)
+
+    def _sweep_exited_processes(self, now: float):
+        """Evict entries whose process has exited and expired failures (caller holds the lock)"""
+        self._last_sweep = now
+        for key in [key for key, (failed_at, _) in self._failures.items() if now - failed_at >= self.negative_ttl]:
+            del self._failures[key]
+        if not self._entries:
+            return
+        try:
+            live_pids = set(psutil.pids())
+        except Exception as e:
+            self.logger.debug(f"Process sweep failed: {e}")
+            return
+
+        for pid in [pid for pid in self._entries if pid not in live_pids]:
+            del self._entries[pid]
+            self._validated_at.pop(pid, None)
+            self.evictions += 1
+
+    def invalidate(self, pid: Optional[int] = None):
+        """Drop one pid, or everything when pid is None"""
+        with self._lock:
+            if pid is None:
+                self._entries.clear()
+                self._validated_at.clear()
+                self._failures.clear()
+            else:
+                self._entries.pop(pid, None)
+                self._validated_at.pop(pid, None)
+                for key in [key for key in self._failures if key[0] == pid]:
+                    del self._failures[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'failures': len(self._failures),
+                'negative_hits': self.negative_hits,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+@dataclass(frozen=True)
+class ForegroundSample:
+    """One immutable reading of the foreground window, shared by every consumer within a tick"""
+    timestamp: float
+    hwnd: int
+    pid: int
+    process_name: Optional[str]  # Raw process name, None if the process could not be opened
+    title: str
+    method: str  # Which detection method succeeded ("method1".."method3", "event", "none")
+    key: str  # "App - Window title" key used by app_times
+
+@dataclass(frozen=True)
+class WindowInfo:
+    hwnd: int
+    pid: int
+    title: str
+    process_name: Optional[str]  # Lower-cased raw name, None when the process could not be opened
+    is_browser: bool
+    is_foreground: bool
+
+@dataclass(frozen=True)
+class WindowSnapshot:
+    """One immutable enumeration of the visible top-level windows"""
+    version: int
+    timestamp: float
+    foreground_hwnd: int
+    windows: Tuple[WindowInfo, ...]
+
+    def find(self, hwnd: int) -> Optional[WindowInfo]:
+        for window in self.windows:
+            if window.hwnd == hwnd:
+                return window
+        return None
+
+    def browser_windows(self) -> List[WindowInfo]:
+        return [window for window in self.windows if window.is_browser]
+
+class WindowSnapshotService:
+    """Enumerates top-level windows once per tick and publishes versioned snapshots
+
+    Consumers read latest()/get_snapshot() or block in wait_for_next() instead of
+    calling EnumWindows themselves, so every consumer sees the same windows within a tick.
+    When the thread is not running get_snapshot() enumerates on demand. With on_demand set
+    (event-driven foreground tracking) the thread only enumerates after request_refresh();
+    other enumerations happen when a consumer's get_snapshot(max_age) finds the latest too old.
+    The service owns its thread, so the shared instance can be started again after stop().
+    """
+
+    _shared: Optional['WindowSnapshotService'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, interval: float = 1.0, process_cache: Optional[ProcessInfoCache] = None,
+                 on_demand: bool = False):
+        self.logger = logging.getLogger(__name__)
+        self.interval = interval
+        self.on_demand = on_demand
+        self.process_cache = process_cache or ProcessInfoCache.shared()
+
+        self._latest: Optional[WindowSnapshot] = None
+        self._version = 0
+        self._condition = threading.Condition()
+        self._enum_lock = threading.Lock()  # Only one enumeration at a time
+        self._thread: Optional[threading.Thread] = None
+        self._refresh_wanted = threading.Event()
+        self.shutdown_event = threading.Event()
+
+        self.enumerations = 0
+        self.total_enum_time = 0.0
+
+    @classmethod
+    def shared(cls) -> 'WindowSnapshotService':
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def start(self):
+        if self.is_alive():
+            return
+        self.shutdown_event.clear()
+        self._thread = threading.Thread(target=self.run, name="WindowSnapshotService", daemon=True)
+        self._thread.start()
+
+    def is_alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def publishing(self) -> bool:
+        """True while the thread publishes a snapshot every interval for wait_for_next() followers"""
+        return self.is_alive() and not self.on_demand
+
+    def run(self):
+        self.logger.info(f"WindowSnapshotService thread starting ({'on demand' if self.on_demand else 'polling'})...")
+        while not self.shutdown_event.is_set():
+            if self.on_demand:
+                self._refresh_wanted.wait()
+                self._refresh_wanted.clear()
+                if self.shutdown_event.is_set():
+                    break
+            try:
+                self.refresh()
+            except Exception as e:
+                self.logger.error(f"Error refreshing window snapshot: {e}")
+            if not self.on_demand:
+                self.shutdown_event.wait(self.interval)
+
+    def request_refresh(self):
+        """Ask the thread for a new snapshot (e.g. after a foreground change event)"""
+        self._refresh_wanted.set()
+
+    def stop(self):
+        self.shutdown_event.set()
+        self._refresh_wanted.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def latest(self) -> Optional[WindowSnapshot]:
+        with self._condition:
+            return self._latest
+
+    def get_snapshot(self, max_age: Optional[float] = None) -> WindowSnapshot:
+        """Latest snapshot if it is younger than max_age (default: one interval), otherwise a fresh one"""
+        max_age = self.interval if max_age is None else max_age
+        snapshot = self.latest()
+        if snapshot is not None and time.time() - snapshot.timestamp <= max_age:
+            return snapshot
+        return self.refresh(max_age=max_age)
+
+    def wait_for_next(self, after_version: int, timeout: Optional[float] = None) -> Optional[WindowSnapshot]:
+        """Block until a snapshot newer than after_version is published. None on timeout or shutdown"""
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._version > after_version or self.shutdown_event.is_set(),
+                timeout=timeout
+            )
+            if self._version > after_version:
+                return self._latest
+            return None
+
+    def refresh(self, max_age: Optional[float] = None) -> WindowSnapshot:
+        """Enumerate now and publish the result
+
+        With max_age set, a caller that waited on another thread's enumeration reuses its result.
+        """
+        with self._enum_lock:
+            if max_age is not None:
+                snapshot = self.latest()
+                if snapshot is not None and time.time() - snapshot.timestamp <= max_age:
+                    return snapshot
+
+            start = time.perf_counter()
+            foreground_hwnd, windows = self._enumerate_windows()
+            self.enumerations += 1
+            self.total_enum_time += time.perf_counter() - start
+
+            with self._condition:
+                self._version += 1
+                snapshot = WindowSnapshot(self._version, time.time(), foreground_hwnd, tuple(windows))
+                self._latest = snapshot
+                self._condition.notify_all()
+
+        return snapshot
+
+    def _enumerate_windows(self) -> Tuple[int, List[WindowInfo]]:
+        windows = []
+        foreground_hwnd = win32gui.GetForegroundWindow()
+
+        def enum_window_callback(hwnd, results):
+            if not win32gui.IsWindowVisible(hwnd):
+                return True
+
+            title = win32gui.GetWindowText(hwnd)
+            # Untitled windows are only interesting when they own the foreground
+            if not title.strip() and hwnd != foreground_hwnd:
+                return True
+
+            _, pid = win32process.GetWindowThreadProcessId(hwnd)
+            if pid <= 0:
+                return True
+
+            try:
+                info = self.process_cache.get(pid)
+                process_name, is_browser = info.name.lower(), info.is_browser
+            except (psutil.AccessDenied, psutil.NoSuchProcess) as e:
+                self.logger.debug(f"Error processing window {hwnd}: {e}")
+                process_name, is_browser = None, False
+
+            results.append(WindowInfo(hwnd, pid, title, process_name, is_browser, hwnd == foreground_hwnd))
+            return True
+
+        try:
+            win32gui.EnumWindows(enum_window_callback, windows)
+        except Exception as e:
+            self.logger.error(f"Error enumerating windows: {e}")
+
+        return foreground_hwnd, windows
+
+    def get_stats(self) -> Dict[str, Any]:
+        snapshot = self.latest()
+        return {
+            'version': snapshot.version if snapshot else 0,
+            'windows': len(snapshot.windows) if snapshot else 0,
+            'enumerations': self.enumerations,
+            'avg_enum_ms': round(self.total_enum_time / self.enumerations * 1000, 3) if self.enumerations else 0.0
+        }
+
 class SystemMonitor:
     VIDEO_STREAMING_SITES = [
         'youtube', 'youtu.be', 'netflix', 'hulu', 'disney', 'twitch', 'vimeo',
@@ -2377,24 +5545,33 @@ class SystemMonitor:
         'crunchyroll', 'funimation', 'amazon prime', 'paramount', 'peacock',
         'hbo max', 'apple tv', 'spotify', 'soundcloud', 'pandora'
     ]
+    VIDEO_SITE_MATCHER = KeywordMatcher(VIDEO_STREAMING_SITES)
 
     BROWSER_PROCESSES = [
         'chrome.exe', 'firefox.exe', 'msedge.exe', 'opera.exe',
         'brave.exe', 'vivaldi.exe', 'safari.exe', 'iexplore.exe'
     ]
 
-    def __init__(self):
+    def __init__(self, process_cache: Optional[ProcessInfoCache] = None,
+                 snapshot_service: Optional[WindowSnapshotService] = None):
         self.logger = logging.getLogger(__name__)
         self.debug_counter = 0
         self.last_successful_app = None
         self.permission_issues_logged = False
+        self.process_cache = process_cache or ProcessInfoCache.shared()
+        self.snapshot_service = snapshot_service or WindowSnapshotService.shared()
+
+    @staticmethod
+    def format_app_key(process_name: Optional[str], title: str, fallback: str = "Protected Process") -> str:
+        """Build the "App - Window title" key used by app_times from raw process/window data"""
+        clean_name = AppNameCleaner.clean_app_name(process_name) if process_name else fallback
+        return f"{clean_name} - {title}" if title else clean_name
 
     def get_foreground_process_name(self) -> Optional[str]:
         try:
             hwnd = win32gui.GetForegroundWindow()
             _, pid = win32process.GetWindowThreadProcessId(hwnd)
-            proc = psutil.Process(pid)
-            return proc.name().lower()
+            return self.process_cache.get(pid).name.lower()
         except (psutil.AccessDenied, psutil.NoSuchProcess, win32gui.error) as e:
             self.logger.debug(f"Error getting foreground process: {e}")
             return None
@@ -2410,8 +5587,7 @@ class SystemMonitor:
                 self.logger.debug(f"Invalid PID received: {pid}")
                 return "Unknown"
 
-            proc = psutil.Process(pid)
-            name = proc.name()
+            name = self.process_cache.get(pid).name
             title = win32gui.GetWindowText(hwnd)
             return f"{name} - {title}"
         except (psutil.AccessDenied, psutil.NoSuchProcess, win32gui.error, ValueError) as e:
@@ -2420,145 +5596,135 @@ class SystemMonitor:
 
     def get_clean_foreground_app_with_title(self) -> str:
         """Enhanced version with debugging and fallback methods"""
+        return self.sample_foreground().key
+
+    def sample_foreground(self) -> ForegroundSample:
+        """Take one immutable sample of the foreground window, trying each fallback method in turn"""
         self.debug_counter += 1
-        
-        # Try multiple methods to get foreground app info
-        result = self._try_get_foreground_app_method1()
-        if result != "Unknown":
-            if self.debug_counter % 100 == 0:  # Log success every 100 iterations
-                self.logger.info(f"✅ Successfully tracking app: {result[:50]}...")
-            self.last_successful_app = result
-            return result
-        
-        # Method 2: Try with different approach
-        result = self._try_get_foreground_app_method2()
-        if result != "Unknown":
-            if self.debug_counter % 100 == 0:
-                self.logger.info(f"✅ Method 2 success: {result[:50]}...")
-            self.last_successful_app = result
-            return result
-        
-        # Method 3: Try basic window enumeration
-        result = self._try_get_foreground_app_method3()
-        if result != "Unknown":
-            if self.debug_counter % 100 == 0:
-                self.logger.info(f"✅ Method 3 success: {result[:50]}...")
-            self.last_successful_app = result
-            return result
-        
+
+        for method_name, method, success_message in (
+            ("method1", self._try_get_foreground_app_method1, "✅ Successfully tracking app"),
+            ("method2", self._try_get_foreground_app_method2, "✅ Method 2 success"),
+            ("method3", self._try_get_foreground_app_method3, "✅ Method 3 success"),
+        ):
+            sample = method()
+            if sample is not None:
+                if self.debug_counter % 100 == 0:  # Log success every 100 iterations
+                    self.logger.info(f"{success_message}: {sample.key[:50]}...")
+                self.last_successful_app = sample.key
+                return sample
+
         # Log detailed debug info every 50 iterations if still failing
         if self.debug_counter % 50 == 0:
             self._log_detailed_debug_info()
-        
-        return "Unknown"
 
-    def _try_get_foreground_app_method1(self) -> str:
+        return ForegroundSample(timestamp=time.time(), hwnd=0, pid=0, process_name=None,
+                                title="", method="none", key="Unknown")
+
+    def _try_get_foreground_app_method1(self) -> Optional[ForegroundSample]:
         """Original method with enhanced error handling"""
         try:
             hwnd = win32gui.GetForegroundWindow()
             if not hwnd:
                 self.logger.debug("Method 1: No foreground window handle")
-                return "Unknown"
+                return None
 
             _, pid = win32process.GetWindowThreadProcessId(hwnd)
             if pid <= 0:
                 self.logger.debug(f"Method 1: Invalid PID: {pid}")
-                return "Unknown"
+                return None
 
+            title = win32gui.GetWindowText(hwnd)
             try:
-                proc = psutil.Process(pid)
-                name = proc.name()
-                title = win32gui.GetWindowText(hwnd)
-                
+                name = self.process_cache.get(pid).name
+
                 # Clean the app name before combining
-                clean_name = AppNameCleaner.clean_app_name(name)
-                result = f"{clean_name} - {title}" if title else clean_name
-                
+                result = self.format_app_key(name, title)
+
                 if result and result != " - ":
-                    return result
-                    
+                    return ForegroundSample(time.time(), hwnd, pid, name, title, "method1", result)
+
             except psutil.AccessDenied:
-                # Try to get at least the window title
-                title = win32gui.GetWindowText(hwnd)
-                if title:
-                    return f"Protected Process - {title}"
-                return "Protected Process"
+                # Fall back to at least the window title
+                result = f"Protected Process - {title}" if title else "Protected Process"
+                return ForegroundSample(time.time(), hwnd, pid, None, title, "method1", result)
             except psutil.NoSuchProcess:
-                title = win32gui.GetWindowText(hwnd)
-                if title:
-                    return f"Terminated Process - {title}"
-                return "Terminated Process"
-                
+                result = f"Terminated Process - {title}" if title else "Terminated Process"
+                return ForegroundSample(time.time(), hwnd, pid, None, title, "method1", result)
+
         except Exception as e:
             self.logger.debug(f"Method 1 failed: {e}")
-        
-        return "Unknown"
 
-    def _try_get_foreground_app_method2(self) -> str:
+        return None
+
+    def _try_get_foreground_app_method2(self) -> Optional[ForegroundSample]:
         """Alternative method using different Windows APIs"""
         try:
             # Get the foreground window
             hwnd = win32gui.GetForegroundWindow()
             if not hwnd:
-                return "Unknown"
-            
+                return None
+
             # Get window title first (this usually works even when process access fails)
             title = win32gui.GetWindowText(hwnd)
-            
+
             # Get window class name as backup identifier
             class_name = win32gui.GetClassName(hwnd)
-            
+
             # Try to get process name
+            pid = 0
             try:
                 _, pid = win32process.GetWindowThreadProcessId(hwnd)
                 if pid > 0:
-                    proc = psutil.Process(pid)
-                    process_name = AppNameCleaner.clean_app_name(proc.name())
-                    
-                    if title:
-                        return f"{process_name} - {title}"
-                    else:
-                        return process_name
+                    info = self.process_cache.get(pid)
+                    name = info.name
+                    process_name = info.clean_name
+                    result = f"{process_name} - {title}" if title else process_name
+                    return ForegroundSample(time.time(), hwnd, pid, name, title, "method2", result)
             except:
                 # If process access fails, use title and class name
                 if title:
-                    return f"Unknown Process - {title}"
+                    return ForegroundSample(time.time(), hwnd, pid, None, title, "method2",
+                                            f"Unknown Process - {title}")
                 elif class_name:
-                    return f"Window Class: {class_name}"
-                    
+                    return ForegroundSample(time.time(), hwnd, pid, None, title, "method2",
+                                            f"Window Class: {class_name}")
+
         except Exception as e:
             self.logger.debug(f"Method 2 failed: {e}")
-        
-        return "Unknown"
 
-    def _try_get_foreground_app_method3(self) -> str:
-        """Fallback method using window enumeration"""
+        return None
+
+    def _try_get_foreground_app_method3(self) -> Optional[ForegroundSample]:
+        """Fallback method using the shared window snapshot"""
         try:
             current_foreground = win32gui.GetForegroundWindow()
             if not current_foreground:
-                return "Unknown"
-            
-            def window_callback(hwnd, results):
-                if hwnd == current_foreground and win32gui.IsWindowVisible(hwnd):
-                    title = win32gui.GetWindowText(hwnd)
-                    class_name = win32gui.GetClassName(hwnd)
-                    
-                    if title:
-                        results.append(f"Active Window - {title}")
-                    elif class_name:
-                        results.append(f"Window: {class_name}")
-                return True
-            
-            results = []
-            win32gui.EnumWindows(window_callback, results)
-            
-            if results:
-                return results[0]
-                
+                return None
+
+            window = self.snapshot_service.get_snapshot().find(current_foreground)
+            if window is None:
+                # Foreground changed since the last snapshot - check the window directly
+                if not win32gui.IsWindowVisible(current_foreground):
+                    return None
+                title = win32gui.GetWindowText(current_foreground)
+            else:
+                title = window.title
+
+            if title:
+                result = f"Active Window - {title}"
+            else:
+                class_name = win32gui.GetClassName(current_foreground)
+                if not class_name:
+                    return None
+                result = f"Window: {class_name}"
+
+            return ForegroundSample(time.time(), current_foreground, 0, None, title, "method3", result)
+
         except Exception as e:
             self.logger.debug(f"Method 3 failed: {e}")
-        
-        return "Unknown"
+
+        return None
 
     def _log_detailed_debug_info(self):
         """Log detailed debugging information"""
@@ -2691,55 +5857,25 @@ class SystemMonitor:
         
         return test_results
 
-    def get_all_browser_windows(self) -> List[Dict[str, str]]:
-        browser_windows = []
-        foreground_hwnd = win32gui.GetForegroundWindow()
-
-        def enum_window_callback(hwnd, windows):
-            if not win32gui.IsWindowVisible(hwnd):
-                return True
-
-            title = win32gui.GetWindowText(hwnd)
-            if not title.strip():
-                return True
-
-            _, pid = win32process.GetWindowThreadProcessId(hwnd)
-            if pid <= 0:
-                return True
-
-            try:
-                proc = psutil.Process(pid)
-                process_name = proc.name().lower()
-                if process_name in self.BROWSER_PROCESSES:
-                    windows.append({
-                        'hwnd': hwnd,
-                        'process_name': process_name,
-                        'title': title,
-                        'is_foreground': hwnd == foreground_hwnd,
-                        'pid': pid
-                    })
-            except (psutil.AccessDenied, psutil.NoSuchProcess, win32gui.error) as e:
-                self.logger.debug(f"Error processing window {hwnd}: {e}")
-
-            return True
-
-        try:
-            win32gui.EnumWindows(enum_window_callback, browser_windows)
-        except Exception as e:
-            self.logger.error(f"Error enumerating windows: {e}")
-
-        return browser_windows
-
-    def detect_background_video_activity(self) -> List[Dict[str, str]]:
-        browser_windows = self.get_all_browser_windows()
+    def get_all_browser_windows(self, snapshot: Optional[WindowSnapshot] = None) -> List[Dict[str, str]]:
+        snapshot = snapshot or self.snapshot_service.get_snapshot()
+        return [{
+            'hwnd': window.hwnd,
+            'process_name': window.process_name,
+            'title': window.title,
+            'is_foreground': window.is_foreground,
+            'pid': window.pid
+        } for window in snapshot.browser_windows() if window.title.strip()]
+
+    def detect_background_video_activity(self, snapshot: Optional[WindowSnapshot] = None) -> List[Dict[str, str]]:
+        browser_windows = self.get_all_browser_windows(snapshot)
         background_video_windows = []
 
         for window in browser_windows:
             if window['is_foreground']:
                 continue
 
-            title_lower = window['title'].lower()
-            detected_sites = [site for site in self.VIDEO_STREAMING_SITES if site in title_lower]
+            detected_sites = self.VIDEO_SITE_MATCHER.matched_keywords(window['title'].lower())
 
             if detected_sites:
                 background_video_windows.append({
@@ -2792,29 +5928,35 @@ def test_system_monitor():
 class BackgroundVideoTracker(threading.Thread):
     """Simplified background video tracker with audio detection only"""
 
+    ON_DEMAND_MAX_AGE_TICKS = 5  # Oldest on-demand window snapshot reused, in SLEEP_INTERVALs
+
     VIDEO_STREAMING_SITES = [
         'youtube', 'youtu.be', 'netflix', 'hulu', 'disney', 'twitch', 'vimeo',
         'tiktok', 'instagram', 'facebook', 'twitter', 'dailymotion', 'vevo',
         'crunchyroll', 'funimation', 'amazon prime', 'paramount', 'peacock',
         'hbo max', 'apple tv', 'spotify', 'soundcloud', 'pandora'
     ]
+    VIDEO_SITE_MATCHER = KeywordMatcher(VIDEO_STREAMING_SITES)
 
     BROWSER_PROCESSES = [
         'chrome.exe', 'firefox.exe', 'msedge.exe', 'opera.exe',
         'brave.exe', 'vivaldi.exe', 'safari.exe', 'iexplore.exe'
     ]
 
-    def __init__(self, config, activity_logger):
+    def __init__(self, config, activity_logger, snapshot_service: Optional[WindowSnapshotService] = None):
         super().__init__(daemon=True)
         self.config = config
         self.activity_logger = activity_logger
         self.logger = logging.getLogger(__name__)
         self.audio_detector = AudioDetector()
+        self.snapshot_service = snapshot_service or WindowSnapshotService.shared()
 
         # Track background video sessions
         self.active_background_videos: Dict[str, Dict] = {}
         self.background_video_times: Dict[str, float] = {}
         self.verified_playing_times: Dict[str, float] = {}
+        self.change_version = 0  # Bumped whenever the counters above change
+        self.day = datetime.datetime.now().strftime('%Y-%m-%d')  # Day the counters belong to; moved on by seal_day()
         self.lock = threading.Lock()
         self.shutdown_event = threading.Event()
 
@@ -2829,18 +5971,36 @@ class BackgroundVideoTracker(threading.Thread):
 
     def run(self):
         self.logger.info("BackgroundVideoTracker thread starting...")
+        last_version = 0
 
         while not self.shutdown_event.is_set():
             try:
-                self._update_background_video_tracking()
-                self.shutdown_event.wait(self.config.SLEEP_INTERVAL)
+                publishing = self.snapshot_service.publishing
+                if publishing:
+                    # Follow the shared enumeration instead of running our own
+                    snapshot = self.snapshot_service.wait_for_next(last_version, timeout=self.config.SLEEP_INTERVAL * 2)
+                    if snapshot is None:
+                        continue
+                elif self.snapshot_service.is_alive():
+                    # On demand (event mode): snapshots follow foreground changes via request_refresh(),
+                    # so only enumerate here once the latest one is ON_DEMAND_MAX_AGE_TICKS old
+                    snapshot = self.snapshot_service.get_snapshot(
+                        max_age=self.config.SLEEP_INTERVAL * self.ON_DEMAND_MAX_AGE_TICKS)
+                else:
+                    snapshot = self.snapshot_service.refresh()
+
+                last_version = snapshot.version
+                self._update_background_video_tracking(snapshot)
+
+                if not publishing:
+                    self.shutdown_event.wait(self.config.SLEEP_INTERVAL)
             except Exception as e:
                 self.logger.error(f"Error in background video tracking: {e}")
                 self.shutdown_event.wait(5)
 
-    def _update_background_video_tracking(self):
+    def _update_background_video_tracking(self, snapshot: Optional[WindowSnapshot] = None):
         """Update background video tracking with audio verification"""
-        current_background_videos = self._get_current_background_videos()
+        current_background_videos = self._get_current_background_videos(snapshot)
         audio_playing_processes = self.audio_detector.get_audio_playing_processes()
         now = time.time()
 
@@ -2873,7 +6033,9 @@ class BackgroundVideoTracker(threading.Thread):
                     status = "playing (audio)" if is_playing_audio else "paused/silent"
                     clean_browser_name = AppNameCleaner.clean_app_name(video_info['process_name'])
                     self.activity_logger.buffer_log_entry(
-                        f"Background video detected: {site_name} ({clean_browser_name}) - {status}"
+                        f"Background video detected: {site_name} ({clean_browser_name}) - {status}",
+                        ActivityEvent(ActivityEventType.BACKGROUND_VIDEO_DETECTED, app=clean_browser_name,
+                                      site=site_name, playing=is_playing_audio)
                     )
                 else:
                     # Update existing background video
@@ -2884,23 +6046,15 @@ class BackgroundVideoTracker(threading.Thread):
                     # Log state changes
                     old_playing = session.get('is_playing', False)
                     if old_playing != is_playing_audio:
+                        state_event = ActivityEvent(ActivityEventType.BACKGROUND_VIDEO_STATE,
+                                                    site=site_name, playing=is_playing_audio)
                         if is_playing_audio:
-                            self.activity_logger.buffer_log_entry(f"{site_name} started playing (audio detected)")
+                            self.activity_logger.buffer_log_entry(f"{site_name} started playing (audio detected)", state_event)
                         else:
-                            self.activity_logger.buffer_log_entry(f"{site_name} stopped playing")
+                            self.activity_logger.buffer_log_entry(f"{site_name} stopped playing", state_event)
 
                     session['is_playing'] = is_playing_audio
-
-                    # Always track total background time
-                    if site_name not in self.background_video_times:
-                        self.background_video_times[site_name] = 0.0
-                    self.background_video_times[site_name] += elapsed
-
-                    # Track verified playing time (with audio)
-                    if is_playing_audio:
-                        if site_name not in self.verified_playing_times:
-                            self.verified_playing_times[site_name] = 0.0
-                        self.verified_playing_times[site_name] += elapsed
+                    self._accumulate(site_name, elapsed, is_playing_audio)
 
             # Handle stopped background videos
             stopped_videos = set(self.active_background_videos.keys()) - current_window_ids
@@ -2914,47 +6068,22 @@ class BackgroundVideoTracker(threading.Thread):
                     log_parts.append(f"Playing: {int(verified_time)}s")
 
                 self.activity_logger.buffer_log_entry(
-                    f"Background video stopped: {session['site']} ({', '.join(log_parts)})"
+                    f"Background video stopped: {session['site']} ({', '.join(log_parts)})",
+                    ActivityEvent(ActivityEventType.BACKGROUND_VIDEO_STOPPED, site=session['site'],
+                                  duration=int(total_duration), verified=int(verified_time))
                 )
                 del self.active_background_videos[window_id]
 
-    def _get_current_background_videos(self) -> List[Dict]:
+    def _get_current_background_videos(self, snapshot: Optional[WindowSnapshot] = None) -> List[Dict]:
         """Get currently active background videos with PID info"""
-        browser_windows = []
-        foreground_hwnd = win32gui.GetForegroundWindow()
-
-        def enum_window_callback(hwnd, windows):
-            if not win32gui.IsWindowVisible(hwnd):
-                return True
-
-            title = win32gui.GetWindowText(hwnd)
-            if not title.strip():
-                return True
-
-            _, pid = win32process.GetWindowThreadProcessId(hwnd)
-            if pid <= 0:
-                return True
-
-            try:
-                proc = psutil.Process(pid)
-                process_name = proc.name().lower()
-                if process_name in self.BROWSER_PROCESSES:
-                    windows.append({
-                        'hwnd': hwnd,
-                        'process_name': process_name,
-                        'title': title,
-                        'is_foreground': hwnd == foreground_hwnd,
-                        'pid': pid
-                    })
-            except (psutil.AccessDenied, psutil.NoSuchProcess) as e:
-                self.logger.debug(f"Error processing window {hwnd}: {e}")
-
-            return True
-
-        try:
-            win32gui.EnumWindows(enum_window_callback, browser_windows)
-        except Exception as e:
-            self.logger.error(f"Error enumerating windows: {e}")
+        snapshot = snapshot or self.snapshot_service.get_snapshot(max_age=self.config.SLEEP_INTERVAL)
+        browser_windows = [{
+            'hwnd': window.hwnd,
+            'process_name': window.process_name,
+            'title': window.title,
+            'is_foreground': window.is_foreground,
+            'pid': window.pid
+        } for window in snapshot.browser_windows() if window.title.strip()]
 
         # Filter for background video windows
         background_video_windows = []
@@ -2962,8 +6091,7 @@ class BackgroundVideoTracker(threading.Thread):
             if window['is_foreground']:
                 continue
 
-            title_lower = window['title'].lower()
-            detected_sites = [site for site in self.VIDEO_STREAMING_SITES if site in title_lower]
+            detected_sites = self.VIDEO_SITE_MATCHER.matched_keywords(window['title'].lower())
 
             if detected_sites:
                 background_video_windows.append({
@@ -3013,18 +6141,35 @@ class BackgroundVideoTracker(threading.Thread):
                 site_name = session['site']
                 elapsed = now - session['last_update']
                 session['last_update'] = now
+                self._accumulate(site_name, elapsed, session.get('is_playing', False))
+
+            return {site: int(seconds) for site, seconds in self.background_video_times.items()}
 
-                if site_name not in self.background_video_times:
-                    self.background_video_times[site_name] = 0.0
-                self.background_video_times[site_name] += elapsed
+    def _accumulate(self, site_name: str, elapsed: float, is_playing: bool):
+        """Add elapsed time to the site's background (and, with audio, verified) total - caller holds self.lock"""
+        if elapsed <= 0:
+            return
+        self.background_video_times[site_name] = self.background_video_times.get(site_name, 0.0) + elapsed
+        if is_playing:
+            self.verified_playing_times[site_name] = self.verified_playing_times.get(site_name, 0.0) + elapsed
+        self.change_version += 1
 
-                # Update verified playing time if currently playing
-                if session.get('is_playing', False):
-                    if site_name not in self.verified_playing_times:
-                        self.verified_playing_times[site_name] = 0.0
-                    self.verified_playing_times[site_name] += elapsed
+    def seal_day(self, boundary: float, next_day: str) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """Close the current day at `boundary`; returns its (background, verified) seconds
 
-            return {site: int(seconds) for site, seconds in self.background_video_times.items()}
+        Open sessions are charged up to the boundary and keep running into the new day.
+        """
+        with self.lock:
+            for session in self.active_background_videos.values():
+                if session['last_update'] < boundary:
+                    self._accumulate(session['site'], boundary - session['last_update'], session.get('is_playing', False))
+                    session['last_update'] = boundary
+
+            sealed = (self.background_video_times, self.verified_playing_times)
+            self.background_video_times, self.verified_playing_times = {}, {}
+            self.day = next_day
+            self.change_version += 1
+        return sealed
 
     def get_verified_playing_times(self) -> Dict[str, int]:
         """Get times when videos were actually playing (with audio)"""
@@ -3051,19 +6196,643 @@ class BackgroundVideoTracker(threading.Thread):
             for session in self.active_background_videos.values():
                 total_duration = now - session['start_time']
                 self.activity_logger.buffer_log_entry(
-                    f"Background video stopped (shutdown): {session['site']} (Duration: {int(total_duration)}s)"
+                    f"Background video stopped (shutdown): {session['site']} (Duration: {int(total_duration)}s)",
+                    ActivityEvent(ActivityEventType.BACKGROUND_VIDEO_STOPPED, site=session['site'],
+                                  duration=int(total_duration), kind="shutdown")
                 )
 
+class TitleCanonicalizer:
+    """Strips volatile parts of window titles so "(3) Inbox" and "(4) Inbox" share one key
+
+    Rules are compiled once and applied in order; results are cached per raw title.
+    Extra (regex, replacement) rules from the config run after the defaults.
+    """
+
+    DURATION = r'(?:\d+h\s?\d+m(?:\s?\d+s)?|\d+m\s?\d+s)'  # "1h 20m", "12m 30s"
+
+    DEFAULT_RULES = [
+        ('notification_counter', r'^\s*[\(\[]\d+\+?[\)\]]\s*', ''),  # "(3) Inbox", "[12] Slack"
+        ('unread_counter', r'(?i)\s*[\(\[]\d+\+?\s*(?:unread|new|notifications?)[\)\]]', ''),
+        ('dirty_marker_prefix', r'^\s*[*●•]\s*', ''),  # "*Untitled - Notepad", "● main.py - VS Code"
+        ('dirty_marker_suffix', r'(\.\w{1,5})\*(?=\s*(?:[-–—|]|$))', r'\1'),  # "report.txt* - Editor", not "5* - Reviews"
+        ('media_progress', r'\b\d{1,2}(?::\d{2}){1,2}\s*/\s*\d{1,2}(?::\d{2}){1,2}\b', ''),  # "1:23 / 4:56"
+        # Only a timer after a separator or in brackets at the very end - "John 3:16" and "10:30 AM" are content
+        ('trailing_timer', r'\s*(?:[-–—|·]\s*\d{1,2}:\d{2}(?::\d{2})?|[\(\[]\d{1,2}:\d{2}(?::\d{2})?[\)\]])\s*$', ''),
+        # "Focus - 1h 20m", "Call (12m 30s)" - like trailing_timer, "Learn SQL in 1h 20m" is content
+        ('elapsed_duration', r'\s*(?:[-–—|·]\s*' + DURATION + r'|[\(\[]' + DURATION + r'[\)\]])\s*$', ''),
+        # "[45%] setup.exe", "Uploading - 45%" - a bare "Save 50%" is left alone
+        ('percent_progress', r'^\s*[\(\[]\d{1,3}%[\)\]]\s*|\s*(?:[-–—|·:]\s*\d{1,3}%|[\(\[]\d{1,3}%[\)\]])\s*$', ''),
+    ]
+
+    CLEANUP_RULES = [
+        (r'[\(\[]\s*[\)\]]', ''),  # Brackets emptied by the rules above
+        (r'\s+([-–—|])(?:\s+[-–—|])+\s+', r' \1 '),  # "Song -  - YouTube" -> "Song - YouTube"
+        (r'\s{2,}', ' '),
+        (r'^[\s\-–—|·:]+|[\s\-–—|·:]+$', ''),
+    ]
+
+    def __init__(self, extra_rules: Optional[List[Tuple[str, str]]] = None, max_cache_size: int = 10000):
+        self.logger = logging.getLogger(__name__)
+        self.max_cache_size = max_cache_size
+        self.rules: List[Tuple[str, Any, str]] = []
+
+        for name, pattern, replacement in self.DEFAULT_RULES:
+            self.rules.append((name, re.compile(pattern), replacement))
+        for index, (pattern, replacement) in enumerate(extra_rules or []):
+            try:
+                self.rules.append((f"custom_{index}", re.compile(pattern), replacement))
+            except re.error as e:
+                self.logger.error(f"Invalid title canonicalization rule {pattern!r}: {e}")
+
+        self.cleanup_rules = [(re.compile(pattern), replacement) for pattern, replacement in self.CLEANUP_RULES]
+
+        self._cache: Dict[str, str] = {}
+        self._raw_titles_per_canonical: Dict[str, int] = {}
+        self.rule_hits: Dict[str, int] = {name: 0 for name, _, _ in self.rules}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._lock = threading.Lock()
+
+    def canonicalize(self, title: str) -> str:
+        if not title:
+            return title
+
+        canonical = self._cache.get(title)
+        if canonical is not None:
+            self.cache_hits += 1
+            return canonical
+
+        canonical = title
+        for name, pattern, replacement in self.rules:
+            canonical, count = pattern.subn(replacement, canonical)
+            if count:
+                self.rule_hits[name] += 1
+        for pattern, replacement in self.cleanup_rules:
+            canonical = pattern.sub(replacement, canonical)
+
+        if not canonical:
+            canonical = title  # Never collapse a title to nothing
+
+        with self._lock:
+            if len(self._cache) >= self.max_cache_size:
+                self._cache.clear()
+            if len(self._raw_titles_per_canonical) >= self.max_cache_size:
+                self._raw_titles_per_canonical.clear()
+            self._cache[title] = canonical
+            self._raw_titles_per_canonical[canonical] = self._raw_titles_per_canonical.get(canonical, 0) + 1
+            self.cache_misses += 1
+
+        return canonical
+
+    def canonicalize_sample(self, sample: ForegroundSample) -> ForegroundSample:
+        """Return the sample with its title, and the title part of its key, canonicalized"""
+        canonical = self.canonicalize(sample.title)
+        if canonical == sample.title:
+            return sample
+
+        key = sample.key
+        if sample.title and key.endswith(sample.title):
+            key = key[:len(key) - len(sample.title)] + canonical
+        return dataclasses.replace(sample, title=canonical, key=key)
+
+    def reset_day(self):
+        """Forget the day's titles at rollover so the cache and variant counts only cover the current day"""
+        with self._lock:
+            self._cache.clear()
+            self._raw_titles_per_canonical.clear()
+
+    def get_stats(self, top: int = 10) -> Dict[str, Any]:
+        """Cache counters plus the canonical titles that absorbed the most raw variants"""
+        with self._lock:
+            collapsed = sorted(((canonical, count) for canonical, count in self._raw_titles_per_canonical.items()
+                                if count > 1), key=lambda item: item[1], reverse=True)
+            lookups = self.cache_hits + self.cache_misses
+            return {
+                'raw_titles': sum(self._raw_titles_per_canonical.values()),
+                'canonical_titles': len(self._raw_titles_per_canonical),
+                'cache_hit_rate': round(self.cache_hits / lookups, 3) if lookups else 0.0,
+                'rule_hits': dict(self.rule_hits),
+                'top_collapsed': collapsed[:top]
+            }
+
+def test_title_canonicalization() -> bool:
+    """Volatile title parts are stripped; titles that merely contain times, durations or stars are not"""
+    print("🧪 TESTING TITLE CANONICALIZATION")
+    print("=" * 50)
+
+    canonicalizer = TitleCanonicalizer()
+    cases = [
+        ("(3) Inbox - Gmail", "Inbox - Gmail"),
+        ("● main.py - VS Code", "main.py - VS Code"),
+        ("report.txt* - Notepad", "report.txt - Notepad"),
+        ("Song 1:23 / 4:56 - YouTube", "Song - YouTube"),
+        ("Pomodoro - 24:13", "Pomodoro"),
+        ("Focus - 1h 20m", "Focus"),
+        ("Call (12m 30s)", "Call"),
+        ("[45%] setup.exe", "setup.exe"),
+        ("Uploading - 45%", "Uploading"),
+        ("(1) Learn SQL in 1h 20m - YouTube", "Learn SQL in 1h 20m - YouTube"),
+    ]
+    # Content that must stay unchanged
+    cases += [(title, title) for title in (
+        "John 3:16 - Bible", "Meeting at 10:30 AM", "Learn SQL in 1h 20m", "Top 10 2h 30m movies",
+        "Meeting notes 10m 30s review - Word", "Rating: 5* - Reviews", "Save 50% on shoes")]
+
+    results = []
+    for title, expected in cases:
+        canonical = canonicalizer.canonicalize(title)
+        results.append(canonical == expected)
+        print(f"{'✅' if canonical == expected else '❌'} {title!r} -> {canonical!r}")
+
+    print("=" * 50)
+    print(f"{'✅' if all(results) else '❌'} {sum(results)}/{len(results)} titles canonicalized as expected")
+    return all(results)
+
+@dataclass(frozen=True)
+class ForegroundChangeEvent:
+    """A single push notification that the foreground window (or its title) changed"""
+    timestamp: float
+    hwnd: int
+    pid: int
+    process_name: Optional[str]  # Raw process name, None if the process could not be opened
+    title: str
+    kind: str = "focus"  # "focus" or "title"
+
+    def to_sample(self) -> ForegroundSample:
+        """Convert the event into the sample consumed by ForegroundTracker's pipeline"""
+        return ForegroundSample(
+            timestamp=self.timestamp,
+            hwnd=self.hwnd,
+            pid=self.pid,
+            process_name=self.process_name,
+            title=self.title,
+            method="event",
+            key=SystemMonitor.format_app_key(self.process_name, self.title)
+        )
+
+class ForegroundChangeSource:
+    """Base class for pluggable foreground change sources used by ForegroundTracker"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._callback = None
+
+    def start(self, callback) -> bool:
+        """Start delivering events to callback(event). Returns False if the source is unusable"""
+        self._callback = callback
+        return True
+
+    def stop(self):
+        self._callback = None
+
+    def _emit(self, event: ForegroundChangeEvent):
+        callback = self._callback
+        if callback:
+            callback(event)
+
+    def describe_window(self, hwnd: int, timestamp: float, kind: str = "focus") -> ForegroundChangeEvent:
+        """Resolve process name and title for a window handle"""
+        title = win32gui.GetWindowText(hwnd) if hwnd else ""
+        pid = 0
+        process_name = None
+        try:
+            _, pid = win32process.GetWindowThreadProcessId(hwnd)
+            if pid > 0:
+                process_name = ProcessInfoCache.shared().get(pid).name
+        except (psutil.AccessDenied, psutil.NoSuchProcess, win32gui.error, ValueError) as e:
+            self.logger.debug(f"Could not resolve process for window {hwnd}: {e}")
+
+        return ForegroundChangeEvent(
+            timestamp=timestamp,
+            hwnd=hwnd,
+            pid=pid,
+            process_name=process_name,
+            title=title,
+            kind=kind
+        )
+
+class WinEventForegroundSource(ForegroundChangeSource):
+    """Push-based foreground source built on SetWinEventHook (Windows only)"""
+
+    EVENT_SYSTEM_FOREGROUND = 0x0003
+    EVENT_OBJECT_NAMECHANGE = 0x800C
+    WINEVENT_OUTOFCONTEXT = 0x0000
+    WINEVENT_SKIPOWNPROCESS = 0x0002
+    OBJID_WINDOW = 0
+    CHILDID_SELF = 0
+    WM_QUIT = 0x0012
+
+    def __init__(self):
+        super().__init__()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_id: Optional[int] = None
+        self._hooks = []
+        self._hook_proc = None  # Keep a reference so ctypes does not free the callback
+        self._ready = threading.Event()
+        self._started = False
+
+    def start(self, callback) -> bool:
+        self._callback = callback
+        self._thread = threading.Thread(target=self._message_loop, name="WinEventHook", daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+        return self._started
+
+    def stop(self):
+        if self._thread_id:
+            try:
+                import ctypes
+                ctypes.windll.user32.PostThreadMessageW(self._thread_id, self.WM_QUIT, 0, 0)
+            except Exception as e:
+                self.logger.debug(f"Error stopping WinEvent message loop: {e}")
+        if self._thread:
+            self._thread.join(timeout=2)
+        super().stop()
+
+    def _message_loop(self):
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            user32 = ctypes.windll.user32
+            kernel32 = ctypes.windll.kernel32
+
+            WinEventProc = ctypes.WINFUNCTYPE(
+                None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+                wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD
+            )
+            user32.SetWinEventHook.restype = wintypes.HANDLE
+            user32.SetWinEventHook.argtypes = [
+                wintypes.DWORD, wintypes.DWORD, wintypes.HMODULE, WinEventProc,
+                wintypes.DWORD, wintypes.DWORD, wintypes.DWORD
+            ]
+            self._kernel32 = kernel32
+            self._hook_proc = WinEventProc(self._on_win_event)
+
+            flags = self.WINEVENT_OUTOFCONTEXT | self.WINEVENT_SKIPOWNPROCESS
+            for event_type in (self.EVENT_SYSTEM_FOREGROUND, self.EVENT_OBJECT_NAMECHANGE):
+                hook = user32.SetWinEventHook(event_type, event_type, None, self._hook_proc, 0, 0, flags)
+                if hook:
+                    self._hooks.append(hook)
+
+            self._thread_id = kernel32.GetCurrentThreadId()
+            self._started = len(self._hooks) == 2
+        except Exception as e:
+            self.logger.warning(f"SetWinEventHook unavailable: {e}")
+            self._started = False
+        finally:
+            self._ready.set()
+
+        if not self._started:
+            return
+
+        self.logger.info("🪝 Foreground change hooks installed (event-driven tracking)")
+
+        # Report the window that already has focus so the first segment starts now
+        self._emit(self.describe_window(win32gui.GetForegroundWindow(), time.time()))
+
+        msg = wintypes.MSG()
+        while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+            user32.TranslateMessage(ctypes.byref(msg))
+            user32.DispatchMessageW(ctypes.byref(msg))
+
+        for hook in self._hooks:
+            user32.UnhookWinEvent(hook)
+        self._hooks = []
+
+    def _on_win_event(self, hook, event_type, hwnd, id_object, id_child, event_thread, event_time_ms):
+        try:
+            if event_type == self.EVENT_OBJECT_NAMECHANGE:
+                # Only title changes of the focused top-level window matter
+                if id_object != self.OBJID_WINDOW or id_child != self.CHILDID_SELF:
+                    return
+                if hwnd != win32gui.GetForegroundWindow():
+                    return
+                kind = "title"
+            else:
+                kind = "focus"
+
+            # dwmsEventTime is GetTickCount() based - convert it to wall clock time
+            age_ms = (self._kernel32.GetTickCount() - event_time_ms) & 0xFFFFFFFF
+            timestamp = time.time() - (age_ms / 1000.0 if age_ms < 60000 else 0)
+
+            self._emit(self.describe_window(hwnd, timestamp, kind))
+        except Exception as e:
+            self.logger.debug(f"Error handling WinEvent: {e}")
+
+class ScriptedForegroundSource(ForegroundChangeSource):
+    """In-memory foreground source that replays scripted events (usable on any platform)"""
+
+    def __init__(self, events: Optional[List[ForegroundChangeEvent]] = None):
+        super().__init__()
+        self._pending: List[ForegroundChangeEvent] = list(events or [])
+
+    def start(self, callback) -> bool:
+        super().start(callback)
+        pending, self._pending = self._pending, []
+        for event in pending:
+            self._emit(event)
+        return True
+
+    def push(self, event: ForegroundChangeEvent):
+        """Deliver an event now, or queue it until the source is started"""
+        if self._callback:
+            self._emit(event)
+        else:
+            self._pending.append(event)
+
+    def push_focus(self, process_name: Optional[str], title: str, timestamp: Optional[float] = None,
+                   kind: str = "focus", hwnd: int = 0, pid: int = 0):
+        """Convenience wrapper for scripting a focus or title change"""
+        self.push(ForegroundChangeEvent(
+            timestamp=timestamp if timestamp is not None else time.time(),
+            hwnd=hwnd,
+            pid=pid,
+            process_name=process_name,
+            title=title,
+            kind=kind
+        ))
+
+class KeyTable:
+    """Interns "App - title" keys to small integer ids so each string is stored once
+
+    Ids are dense and never reused, which lets counters live in arrays indexed by id.
+    """
+
+    def __init__(self):
+        self._keys: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key) -> bool:
+        return key in self._ids
+
+    def intern(self, key: str) -> int:
+        key_id = self._ids.get(key)
+        if key_id is None:
+            with self._lock:
+                key_id = self._ids.get(key)
+                if key_id is None:
+                    key_id = len(self._keys)
+                    self._keys.append(key)
+                    self._ids[key] = key_id
+        return key_id
+
+    def lookup(self, key: str) -> Optional[int]:
+        return self._ids.get(key)
+
+    def key_for(self, key_id: int) -> str:
+        return self._keys[key_id]
+
+class KeyedCounters(MutableMapping):
+    """Per-key counters stored in an array indexed by KeyTable id
+
+    Behaves like the Dict[str, float] it replaces, so callers that use app_times as a
+    dict keep working; hot paths use add()/items_by_id() and never touch strings.
+    """
+
+    def __init__(self, key_table: Optional[KeyTable] = None, typecode: str = 'd'):
+        self.key_table = key_table if key_table is not None else KeyTable()
+        self._values = array.array(typecode)
+        self._present = array.array('b')
+        self._count = 0
+
+    def _ensure_capacity(self, key_id: int):
+        missing = key_id + 1 - len(self._values)
+        if missing > 0:
+            self._values.extend([0] * missing)
+            self._present.extend([0] * missing)
+
+    def add_id(self, key_id: int, amount: float):
+        self._ensure_capacity(key_id)
+        if not self._present[key_id]:
+            self._present[key_id] = 1
+            self._count += 1
+        self._values[key_id] += amount
+
+    def add(self, key: str, amount: float):
+        self.add_id(self.key_table.intern(key), amount)
+
+    def get_id(self, key_id: int, default=None):
+        if key_id < len(self._present) and self._present[key_id]:
+            return self._values[key_id]
+        return default
+
+    def set_id(self, key_id: int, value: float):
+        self._ensure_capacity(key_id)
+        if not self._present[key_id]:
+            self._present[key_id] = 1
+            self._count += 1
+        self._values[key_id] = value
+
+    def items_by_id(self) -> Iterator[Tuple[int, float]]:
+        present, values = self._present, self._values
+        for key_id in range(len(present)):
+            if present[key_id]:
+                yield key_id, values[key_id]
+
+    def __getitem__(self, key: str):
+        key_id = self.key_table.lookup(key)
+        value = None if key_id is None else self.get_id(key_id)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: float):
+        self.set_id(self.key_table.intern(key), value)
+
+    def __delitem__(self, key: str):
+        key_id = self.key_table.lookup(key)
+        if key_id is None or self.get_id(key_id) is None:
+            raise KeyError(key)
+        self._present[key_id] = 0
+        self._values[key_id] = 0
+        self._count -= 1
+
+    def __iter__(self) -> Iterator[str]:
+        for key_id, _ in self.items_by_id():
+            yield self.key_table.key_for(key_id)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def clear(self):
+        del self._values[:]
+        del self._present[:]
+        self._count = 0
+
+    def memory_bytes(self) -> int:
+        return self._values.itemsize * len(self._values) + len(self._present)
+
+def benchmark_key_table_memory(sizes=(10_000, 100_000, 1_000_000)):
+    """Compare string-keyed dicts with KeyTable + KeyedCounters for app_times/last_logged_times"""
+    import gc
+    import tracemalloc
+
+    def measure(build):
+        gc.collect()
+        tracemalloc.start()
+        holder = build()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del holder
+        return current
+
+    print("🧪 KEY TABLE MEMORY BENCHMARK")
+    print("=" * 60)
+    results = []
+    for size in sizes:
+        def build_titles():
+            return [f"Google Chrome - Ticket #{i} - Project board - Google Chrome" for i in range(size)]
+
+        def build_dicts():
+            titles = build_titles()
+            app_times = {title: float(i) for i, title in enumerate(titles)}
+            last_logged = {title: int(i) for i, title in enumerate(titles)}
+            snapshot = {app: round(secs) for app, secs in app_times.items()}  # get_app_times() copy
+            return app_times, last_logged, snapshot
+
+        def build_key_table():
+            table = KeyTable()
+            app_times = KeyedCounters(table)
+            last_logged = KeyedCounters(table, 'q')
+            for i, title in enumerate(build_titles()):
+                key_id = table.intern(title)
+                app_times.add_id(key_id, float(i))
+                last_logged.set_id(key_id, i)
+            return table, app_times, last_logged
+
+        dict_bytes = measure(build_dicts)
+        table_bytes = measure(build_key_table)
+        results.append({'titles': size, 'dict_bytes': dict_bytes, 'key_table_bytes': table_bytes})
+        print(f"   {size:>9,} titles: dicts {dict_bytes / 1024 / 1024:8.1f} MB | "
+              f"KeyTable {table_bytes / 1024 / 1024:8.1f} MB ({table_bytes / dict_bytes:.0%})")
+    return results
+
+class ActivityTimeline:
+    """Append-only store of focus segments (start, end, key, category)
+
+    Segments live in array-typed columns - about 21 bytes each - instead of one Python
+    object per segment, so a full workday stays in the low hundreds of KB. Keys are
+    interned once in a KeyTable (shared with the tracker's counters). Segments are appended in time order, which
+    lets range queries bisect on the start column.
+    """
+
+    CATEGORY_CODES = {None: -1, Category.PRODUCTIVE: 0, Category.UNPRODUCTIVE: 1, Category.UNCATEGORIZED: 2}
+    CATEGORY_BY_CODE = {code: category for category, code in CATEGORY_CODES.items()}
+
+    def __init__(self, key_table: Optional[KeyTable] = None):
+        self.starts = array.array('d')
+        self.ends = array.array('d')
+        self.key_ids = array.array('I')
+        self.categories = array.array('b')
+
+        self.key_table = key_table if key_table is not None else KeyTable()
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def append(self, start: float, end: float, key: str, category: Optional[Category] = None):
+        """Record one focus segment. A segment that continues the previous one for the same key is merged"""
+        if end <= start:
+            return
+
+        with self.lock:
+            key_id = self.key_table.intern(key)
+            code = self.CATEGORY_CODES.get(category, -1)
+
+            if self.starts:
+                if start < self.ends[-1]:
+                    # Never overlap the previous segment - the timeline must stay ordered
+                    start = self.ends[-1]
+                    if end <= start:
+                        return
+                if self.key_ids[-1] == key_id and self.categories[-1] == code and start - self.ends[-1] < 1e-6:
+                    self.ends[-1] = end
+                    return
+
+            self.starts.append(start)
+            self.ends.append(end)
+            self.key_ids.append(key_id)
+            self.categories.append(code)
+
+    def iter_segments(self, start: Optional[float] = None,
+                      end: Optional[float] = None) -> Iterator[Tuple[float, float, str, Optional[Category]]]:
+        """Stream segments overlapping [start, end), clipped to the range"""
+        with self.lock:
+            count = len(self.starts)
+            # The segment before the first start >= range start may still overlap it
+            first = 0 if start is None else max(0, bisect.bisect_right(self.starts, start) - 1)
+            last = count if end is None else bisect.bisect_left(self.starts, end)
+
+        for index in range(first, last):
+            seg_start, seg_end = self.starts[index], self.ends[index]
+            if start is not None:
+                if seg_end <= start:
+                    continue
+                seg_start = max(seg_start, start)
+            if end is not None:
+                seg_end = min(seg_end, end)
+            yield (seg_start, seg_end, self.key_table.key_for(self.key_ids[index]),
+                   self.CATEGORY_BY_CODE[self.categories[index]])
+
+    def query(self, start: Optional[float] = None,
+              end: Optional[float] = None) -> List[Tuple[float, float, str, Optional[Category]]]:
+        return list(self.iter_segments(start, end))
+
+    def totals_by_key(self, start: Optional[float] = None, end: Optional[float] = None) -> Dict[str, float]:
+        """Seconds per key - the same numbers ForegroundTracker.app_times accumulates"""
+        totals: Dict[str, float] = {}
+        for seg_start, seg_end, key, _ in self.iter_segments(start, end):
+            totals[key] = totals.get(key, 0.0) + (seg_end - seg_start)
+        return totals
+
+    def hourly_rollup(self, start: Optional[float] = None,
+                      end: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """Seconds per category for every local clock hour, e.g. {"2024-01-15 14:00": {"Productive": 1800.0}}"""
+        rollup: Dict[str, Dict[str, float]] = {}
+        for seg_start, seg_end, _, category in self.iter_segments(start, end):
+            category_name = category.value if category else "Unknown"
+            cursor = seg_start
+            while cursor < seg_end:
+                hour_start = datetime.datetime.fromtimestamp(cursor).replace(minute=0, second=0, microsecond=0)
+                hour_end = (hour_start + datetime.timedelta(hours=1)).timestamp()
+                piece_end = min(seg_end, hour_end)
+
+                bucket = rollup.setdefault(hour_start.strftime("%Y-%m-%d %H:00"), {})
+                bucket[category_name] = bucket.get(category_name, 0.0) + (piece_end - cursor)
+                cursor = piece_end
+        return rollup
+
+    def clear(self):
+        with self.lock:
+            for column in (self.starts, self.ends, self.key_ids, self.categories):
+                del column[:]
+
+    def memory_bytes(self) -> int:
+        """Footprint of the segment columns (keys are owned by the KeyTable)"""
+        return sum(column.itemsize * len(column) for column in (self.starts, self.ends, self.key_ids, self.categories))
+
 class ForegroundTracker(threading.Thread):
-    def __init__(self, config: CompleteEnhancedConfig, activity_logger: CompleteEnhancedActivityLogger):
+    def __init__(self, config: CompleteEnhancedConfig, activity_logger: CompleteEnhancedActivityLogger,
+                 change_source: Optional[ForegroundChangeSource] = None):
         super().__init__(daemon=True)
         self.config = config
         self.activity_logger = activity_logger
         self.system_monitor = SystemMonitor()
         self.logger = logging.getLogger(__name__)
 
-        self.app_times: Dict[str, float] = {}
+        self.key_table = KeyTable()
+        self.app_times = KeyedCounters(self.key_table)
+        self.timeline = ActivityTimeline(self.key_table)
+        self.change_version = 0  # Bumped whenever app_times changes
+        self.day = datetime.datetime.now().strftime('%Y-%m-%d')  # Day the counters belong to; moved on by seal_day()
         self.current_key: Optional[str] = None
+        self.current_category: Optional[Category] = None
         self.current_start = time.time()
         self.lock = threading.Lock()
         self.shutdown_event = threading.Event()
@@ -3071,20 +6840,76 @@ class ForegroundTracker(threading.Thread):
         self.last_unproductive_title: Optional[str] = None
         self.unproductive_start_time: Optional[float] = None
 
+        # Event-driven mode: change events are queued by the source and consumed on this thread
+        self.change_source = change_source
+        self.event_driven = False
+        self.min_segment_seconds = 1.0  # Polling can't resolve switches shorter than one interval
+        self.canonicalizer = (TitleCanonicalizer(config.TITLE_CANONICAL_EXTRA_RULES)
+                              if config.TITLE_CANONICALIZATION else None)
+        self._event_queue: "queue.Queue[Optional[ForegroundChangeEvent]]" = queue.Queue()
+
+        # Every tick produces exactly one ForegroundSample which is fanned out to these consumers
+        self.samples_processed = 0
+        self.stage_timings: Dict[str, Dict[str, float]] = {}
+        self._sample_consumers: List[Tuple[str, Any]] = [
+            ("unproductive", lambda sample: self._handle_unproductive_tracking(sample.key, sample.timestamp)),
+            ("app_times", lambda sample: self._update_app_times(sample.key, sample.timestamp)),
+            ("debug_log", self._log_sample),
+        ]
+
     def run(self):
         self.logger.info("ForegroundTracker thread starting...")
-        iteration = 0
 
+        if self.change_source is None and self.config.FOREGROUND_TRACKING_MODE == "event":
+            self.change_source = WinEventForegroundSource()
+
+        if self.change_source and self.change_source.start(self._event_queue.put):
+            self.event_driven = True
+            self.min_segment_seconds = 0.0
+            self.logger.info(f"ForegroundTracker running event-driven ({type(self.change_source).__name__})")
+            self._run_event_driven()
+        else:
+            if self.change_source:
+                self.logger.warning("Foreground change source failed to start - falling back to polling")
+                self.change_source = None
+            self._run_polling()
+
+    def _run_event_driven(self):
+        """Consume timestamped focus/title events; re-sample occasionally in case an event was missed"""
         while not self.shutdown_event.is_set():
             try:
-                iteration += 1
-                active_key = self.system_monitor.get_clean_foreground_app_with_title()
+                try:
+                    event = self._event_queue.get(timeout=self.config.EVENT_RESYNC_INTERVAL)
+                except queue.Empty:
+                    self._resync_from_poll()
+                    continue
+
+                if event is None:  # Wake-up sentinel from stop()
+                    continue
 
-                if iteration % 10 == 0:
-                    self.logger.info(f"Tracking iteration #{iteration}, current app: {active_key}")
-                    with self.lock:
-                        self.logger.info(f"Total tracked apps so far: {len(self.app_times)}")
+                self._apply_foreground_event(event)
+            except Exception as e:
+                self.logger.error(f"Error in event-driven tracking loop: {e}")
+                self.shutdown_event.wait(5)
 
+    def _apply_foreground_event(self, event: ForegroundChangeEvent):
+        """Charge time up to the exact event timestamp and switch to the new window"""
+        self.system_monitor.snapshot_service.request_refresh()
+        sample = self._canonicalize(event.to_sample())
+        if sample.timestamp < self.current_start:
+            sample = dataclasses.replace(sample, timestamp=self.current_start)
+        self._process_sample(sample)
+
+    def _resync_from_poll(self):
+        """Safety net for event mode: take one sample and apply it if it disagrees with the current key"""
+        sample = self._take_sample()
+        if sample.key != self.current_key and sample.key != "Unknown":
+            self.logger.debug(f"Event resync corrected foreground app: {sample.key[:50]}")
+            self._process_sample(sample)
+
+    def _run_polling(self):
+        while not self.shutdown_event.is_set():
+            try:
                 self._track_current_app()
                 self.shutdown_event.wait(self.config.SLEEP_INTERVAL)
             except Exception as e:
@@ -3092,11 +6917,68 @@ class ForegroundTracker(threading.Thread):
                 self.shutdown_event.wait(5)
 
     def _track_current_app(self):
-        active_key = self.system_monitor.get_clean_foreground_app_with_title()
-        now = time.time()
-
-        self._handle_unproductive_tracking(active_key, now)
-        self._update_app_times(active_key, now)
+        self._process_sample(self._take_sample())
+
+    def _take_sample(self) -> ForegroundSample:
+        started = time.perf_counter()
+        sample = self.system_monitor.sample_foreground()
+        self._record_stage_timing("sample", time.perf_counter() - started)
+        return self._canonicalize(sample)
+
+    def _canonicalize(self, sample: ForegroundSample) -> ForegroundSample:
+        """Collapse volatile title parts before the sample reaches any consumer"""
+        if self.canonicalizer is None:
+            return sample
+        started = time.perf_counter()
+        sample = self.canonicalizer.canonicalize_sample(sample)
+        self._record_stage_timing("canonicalize", time.perf_counter() - started)
+        return sample
+
+    def _process_sample(self, sample: ForegroundSample):
+        """Hand one sample to every consumer, timing each stage"""
+        self.samples_processed += 1
+        for stage_name, consumer in self._sample_consumers:
+            started = time.perf_counter()
+            try:
+                consumer(sample)
+            except Exception as e:
+                self.logger.error(f"Error in sample consumer '{stage_name}': {e}")
+            self._record_stage_timing(stage_name, time.perf_counter() - started)
+
+    def add_sample_consumer(self, stage_name: str, consumer):
+        """Register an extra consumer that receives every ForegroundSample"""
+        self._sample_consumers.append((stage_name, consumer))
+
+    def _record_stage_timing(self, stage_name: str, elapsed: float):
+        stats = self.stage_timings.get(stage_name)
+        if stats is None:
+            stats = self.stage_timings[stage_name] = {'count': 0, 'total_seconds': 0.0, 'max_seconds': 0.0}
+        stats['count'] += 1
+        stats['total_seconds'] += elapsed
+        if elapsed > stats['max_seconds']:
+            stats['max_seconds'] = elapsed
+
+    def get_stage_timings(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage counters: calls, total/max seconds and average milliseconds"""
+        timings = {}
+        for stage_name, stats in list(self.stage_timings.items()):
+            stats = dict(stats)
+            stats['avg_ms'] = (stats['total_seconds'] / stats['count'] * 1000) if stats['count'] else 0.0
+            timings[stage_name] = stats
+        return timings
+
+    def _log_sample(self, sample: ForegroundSample):
+        log_every = 100 if self.event_driven else 10
+        if self.samples_processed % log_every == 0:
+            self.logger.info(f"Tracking sample #{self.samples_processed} ({sample.method}), current app: {sample.key}")
+            with self.lock:
+                self.logger.info(f"Total tracked apps so far: {len(self.app_times)}")
+            self.logger.debug(f"Process cache: {ProcessInfoCache.shared().get_stats()}")
+            self.logger.debug(f"Categorization cache: {AppCategorizer.get_cache_stats()}")
+            if self.canonicalizer:
+                stats = self.canonicalizer.get_stats(top=3)
+                self.logger.debug(f"Title canonicalization: {stats['raw_titles']} raw -> "
+                                  f"{stats['canonical_titles']} canonical, top: {stats['top_collapsed']}")
 
     def _handle_unproductive_tracking(self, active_key: str, now: float):
         category = AppCategorizer.categorize_app(active_key)
@@ -3107,14 +6989,19 @@ class ForegroundTracker(threading.Thread):
             self.unproductive_start_time = now
             # Clean the app name before logging
             clean_name = AppNameCleaner.clean_app_base_name(active_key)
-            self.activity_logger.buffer_log_entry(f"Unproductive tab opened: {clean_name}")
+            self.activity_logger.buffer_log_entry(
+                f"Unproductive tab opened: {clean_name}",
+                ActivityEvent(ActivityEventType.UNPRODUCTIVE_OPENED, app=clean_name, category=Category.UNPRODUCTIVE.value)
+            )
 
         elif not is_unproductive and self.last_unproductive_title:
             duration = now - self.unproductive_start_time if self.unproductive_start_time else 0
             # Clean the app name before logging
             clean_name = AppNameCleaner.clean_app_base_name(self.last_unproductive_title)
             self.activity_logger.buffer_log_entry(
-                f"Unproductive tab closed: {clean_name} (Open for {int(duration)}s)"
+                f"Unproductive tab closed: {clean_name} (Open for {int(duration)}s)",
+                ActivityEvent(ActivityEventType.UNPRODUCTIVE_CLOSED, app=clean_name,
+                              category=Category.UNPRODUCTIVE.value, duration=int(duration))
             )
             self.last_unproductive_title = None
             self.unproductive_start_time = None
@@ -3137,48 +7024,141 @@ class ForegroundTracker(threading.Thread):
                 # Save time for previous app if it was valid
                 if self.current_key and not AppCategorizer.is_system_process(self.current_key):
                     elapsed = now - self.current_start
-                    # Only track if the elapsed time is meaningful (at least 1 second)
-                    if elapsed >= 1.0:
-                        self.app_times[self.current_key] = self.app_times.get(self.current_key, 0) + elapsed
+                    # Only track if the elapsed time is meaningful (at least 1 second when polling)
+                    if elapsed > 0 and elapsed >= self.min_segment_seconds:
+                        self._charge_segment(self.current_key, self.current_start, now)
 
                 self.current_key = active_key
+                self.current_category = AppCategorizer.categorize_app(active_key)
                 self.current_start = now
 
+    def _charge_segment(self, key: str, start: float, end: float):
+        """Add one finished segment to app_times and the timeline (caller holds self.lock)"""
+        self.app_times.add(key, end - start)
+        self.timeline.append(start, end, key, self.current_category)
+        self.change_version += 1
+
     def stop(self):
         self.shutdown_event.set()
+        self._event_queue.put(None)
+        if self.change_source:
+            self.change_source.stop()
         self.join(timeout=5)
 
         now = time.time()
         with self.lock:
             if self.current_key:
-                elapsed = now - self.current_start
-                self.app_times[self.current_key] = self.app_times.get(self.current_key, 0) + elapsed
+                self._charge_segment(self.current_key, self.current_start, max(now, self.current_start))
 
         if self.last_unproductive_title and self.unproductive_start_time:
             duration = now - self.unproductive_start_time
             # Clean the app name before logging
             clean_name = AppNameCleaner.clean_app_base_name(self.last_unproductive_title)
             self.activity_logger.buffer_log_entry(
-                f"Unproductive tab closed: {clean_name} (Open for {int(duration)}s)"
+                f"Unproductive tab closed: {clean_name} (Open for {int(duration)}s)",
+                ActivityEvent(ActivityEventType.UNPRODUCTIVE_CLOSED, app=clean_name,
+                              category=Category.UNPRODUCTIVE.value, duration=int(duration))
             )
 
     def get_app_times(self) -> Dict[str, float]:
         with self.lock:
             return {app: round(secs) for app, secs in self.app_times.items()}
 
+    def get_day_and_app_times(self) -> Tuple[str, Dict[str, float]]:
+        """get_app_times() together with the day it belongs to, read under one lock"""
+        with self.lock:
+            return self.day, {app: round(secs) for app, secs in self.app_times.items()}
+
+    def seal_day(self, boundary: float, next_day: str) -> Tuple[Dict[str, float], 'ActivityTimeline']:
+        """Close the current day at `boundary`; returns its app times and focus segments
+
+        The segment in progress is split at the boundary: the part before midnight is charged
+        to the sealed day and the rest keeps running. Anything already charged past the
+        boundary moves to the new day. The counters, timeline and key table are replaced, so
+        titles that were only seen on the sealed day are released.
+        """
+        with self.lock:
+            if self.current_key and self.current_start < boundary:
+                if not AppCategorizer.is_system_process(self.current_key):
+                    self._charge_segment(self.current_key, self.current_start, boundary)
+                self.current_start = boundary
+
+            old_timeline = self.timeline
+            carried = old_timeline.totals_by_key(start=boundary)
+            sealed_times = {}
+            for app, secs in self.app_times.items():
+                remaining = secs - carried.get(app, 0.0)
+                if remaining > 0:
+                    sealed_times[app] = round(remaining)
+
+            sealed_timeline = ActivityTimeline(self.key_table)
+            for segment in old_timeline.iter_segments(end=boundary):
+                sealed_timeline.append(*segment)
+
+            self.key_table = KeyTable()
+            self.app_times = KeyedCounters(self.key_table)
+            self.timeline = ActivityTimeline(self.key_table)
+            for segment in old_timeline.iter_segments(start=boundary):
+                self.timeline.append(*segment)
+            for app, secs in carried.items():
+                self.app_times.add(app, secs)
+
+            self.day = next_day
+            self.change_version += 1
+        if self.canonicalizer:
+            self.canonicalizer.reset_day()
+        return sealed_times, sealed_timeline
+
+    def get_key_table_and_app_times_by_id(self) -> Tuple[KeyTable, Dict[int, int]]:
+        """(KeyTable, rounded seconds keyed by its ids) read under one lock - no strings are materialised
+
+        seal_day() swaps in a new KeyTable, so ids are only meaningful with the table they came from.
+        """
+        with self.lock:
+            return self.key_table, {key_id: round(secs) for key_id, secs in self.app_times.items_by_id()}
+
+    def get_timeline(self, start: Optional[float] = None,
+                     end: Optional[float] = None) -> List[Tuple[float, float, str, Optional[Category]]]:
+        """Focus segments between start and end, including the segment still in progress"""
+        segments = self.timeline.query(start, end)
+        with self.lock:
+            if self.current_key:
+                seg_start, seg_end = self.current_start, time.time()
+                if start is not None:
+                    seg_start = max(seg_start, start)
+                if end is not None:
+                    seg_end = min(seg_end, end)
+                if seg_end > seg_start:
+                    segments.append((seg_start, seg_end, self.current_key, self.current_category))
+        return segments
+
 class ActivityReporter:
     def __init__(self, config: CompleteEnhancedConfig, activity_logger: CompleteEnhancedActivityLogger):
         self.config = config
         self.activity_logger = activity_logger
-        self.last_logged_times: Dict[str, int] = {}
+        self.last_logged_times: Optional[KeyedCounters] = None  # Bound to the tracker's KeyTable on first use
         self.logger = logging.getLogger(__name__)
+        self.system_monitor = SystemMonitor()
+        self._logged_version: Optional[int] = None  # tracker.change_version at the last diff
+        self.passes_skipped = 0
 
     def log_activity(self, tracker: ForegroundTracker):
         self.logger.info("=== STARTING log_activity ===")
         try:
-            app_times = tracker.get_app_times()
+            version = tracker.change_version
+            if version == self._logged_version and self.last_logged_times is not None \
+                    and self.last_logged_times.key_table is tracker.key_table:
+                self.passes_skipped += 1
+                self.logger.info("No counter changed since the last pass, skipping categorization")
+                self._check_background_video_activity()
+                return
+
+            key_table, app_times = tracker.get_key_table_and_app_times_by_id()
             self.logger.info(f"Got app_times: {len(app_times)} items")
 
+            if self.last_logged_times is None or self.last_logged_times.key_table is not key_table:
+                self.last_logged_times = KeyedCounters(key_table, 'q')
+
             categorized = self._categorize_app_times(app_times)
             self.logger.info("=== FINISHED _categorize_app_times ===")
 
@@ -3190,6 +7170,7 @@ class ActivityReporter:
                 self._write_activity_logs(categorized)
             else:
                 self.logger.info("No new activity detected, skipping log write")
+            self._logged_version = version
 
             self._check_background_video_activity()
             self.logger.info("=== FINISHED log_activity ===")
@@ -3198,7 +7179,7 @@ class ActivityReporter:
             self.logger.error(f"Error in log_activity: {e}")
             self.logger.error(f"Full traceback: {traceback.format_exc()}")
 
-    def _categorize_app_times(self, app_times: Dict[str, float]) -> Dict[Category, Dict[str, List[Tuple[str, int]]]]:
+    def _categorize_app_times(self, app_times: Dict[int, int]) -> Dict[Category, Dict[str, List[Tuple[str, int, int]]]]:
         categorized = {
             Category.PRODUCTIVE: {},
             Category.UNPRODUCTIVE: {},
@@ -3207,14 +7188,17 @@ class ActivityReporter:
 
         self.logger.info(f"Processing {len(app_times)} apps for categorization")
 
-        for app, secs in app_times.items():
+        key_table = self.last_logged_times.key_table
+        for key_id, secs in app_times.items():
             secs = int(secs)
             if secs == 0:
                 continue
 
-            prev_secs = self.last_logged_times.get(app, -1)
+            prev_secs = self.last_logged_times.get_id(key_id, -1)
 
             if secs > prev_secs:
+                # Only keys that are about to be written get turned back into strings
+                app = key_table.key_for(key_id)
                 category = AppCategorizer.categorize_app(app)
 
                 if category is None:
@@ -3227,20 +7211,21 @@ class ActivityReporter:
                 if base not in categorized[category]:
                     categorized[category][base] = []
 
-                categorized[category][base].append((title, secs))
-                self.last_logged_times[app] = secs
+                categorized[category][base].append((title, secs, key_id))
+                self.last_logged_times.set_id(key_id, secs)
 
         return categorized
 
-    def _has_new_activity(self, categorized: Dict[Category, Dict[str, List[Tuple[str, int]]]]) -> bool:
+    def _has_new_activity(self, categorized: Dict[Category, Dict[str, List[Tuple[str, int, int]]]]) -> bool:
         return any(categorized[category] for category in categorized)
 
-    def _write_activity_logs(self, categorized: Dict[Category, Dict[str, List[Tuple[str, int]]]]):
+    def _write_activity_logs(self, categorized: Dict[Category, Dict[str, List[Tuple[str, int, int]]]]):
         now = datetime.datetime.now()
         log_time = now.strftime("%Y-%m-%d %H:%M")
 
         try:
-            with open(self.config.ACTIVITY_LOG, "a", encoding="utf-8") as log:
+            # flush_lock keeps a log rotation from happening while the block is half-written
+            with self.activity_logger.flush_lock, open(self.config.ACTIVITY_LOG, "a", encoding="utf-8") as log:
                 header = f"=== Activity Log: {log_time} ===\n"
                 log.write(header)
 
@@ -3260,7 +7245,7 @@ class ActivityReporter:
         except IOError as e:
             self.logger.error(f"Error writing activity logs: {e}")
 
-    def _write_category_section(self, log, category: Category, apps: Dict[str, List[Tuple[str, int]]], totals: Dict[Category, int]):
+    def _write_category_section(self, log, category: Category, apps: Dict[str, List[Tuple[str, int, int]]], totals: Dict[Category, int]):
         if not apps:
             return
         
@@ -3275,10 +7260,13 @@ class ActivityReporter:
             app_line = f"{base} - Total Time: {total_app_time} seconds\n"
             log.write(app_line)
 
-            for title, sec in sorted(windows, key=lambda x: -x[1]):
+            for title, sec, key_id in sorted(windows, key=lambda x: -x[1]):
                 warn = " WARNING" if sec >= self.config.UNPRODUCTIVE_WARNING_THRESHOLD and category == Category.UNPRODUCTIVE else ""
                 detail_line = f"    * {title} ({sec}s){warn}\n"
                 log.write(detail_line)
+                self.activity_logger.buffer_event(ActivityEvent(
+                    ActivityEventType.ACTIVITY, app=base, title=title, key_id=key_id,
+                    category=category.value, duration=sec))
 
     def _generate_summary_footer(self, totals: Dict[Category, int]) -> str:
         return f"""Summary:
@@ -3290,8 +7278,7 @@ Uncategorized: {totals[Category.UNCATEGORIZED]}s
 """
 
     def _check_background_video_activity(self):
-        system_monitor = SystemMonitor()
-        background_videos = system_monitor.detect_background_video_activity()
+        background_videos = self.system_monitor.detect_background_video_activity()
 
         if background_videos:
             for video_window in background_videos:
@@ -3299,7 +7286,9 @@ Uncategorized: {totals[Category.UNCATEGORIZED]}s
                 message = (f"Background video detected: {video_window['process_name']} - "
                           f"{video_window['title']} (Sites: {sites_detected})")
 
-                self.activity_logger.buffer_log_entry(message)
+                self.activity_logger.buffer_log_entry(message, ActivityEvent(
+                    ActivityEventType.BACKGROUND_VIDEO_DETECTED, app=AppNameCleaner.clean_app_name(video_window['process_name']),
+                    title=video_window['title'], site=sites_detected))
                 self.logger.info(message)
 
 
@@ -4035,8 +8024,7 @@ class HybridOutlookManager:
     def _update_email_timestamp(self):
         """Update the last email timestamp"""
         try:
-            with open(self.config.EMAIL_TRACK_FILE, "w") as f:
-                f.write(str(time.time()))
+            PersistedSchema.write_plain(self.config.EMAIL_TRACK_FILE, 'email_timestamp', {'last_sent': time.time()})
         except IOError as e:
             self.logger.error(f"Failed to update email timestamp: {e}")
 
@@ -4044,8 +8032,8 @@ class HybridOutlookManager:
         """Get the timestamp of the last sent email"""
         if os.path.exists(self.config.EMAIL_TRACK_FILE):
             try:
-                with open(self.config.EMAIL_TRACK_FILE, "r") as f:
-                    return float(f.read().strip())
+                timestamp, _ = PersistedSchema.read_plain(self.config.EMAIL_TRACK_FILE, 'email_timestamp')
+                return float(timestamp.get('last_sent', 0.0))
             except (IOError, ValueError) as e:
                 self.logger.warning(f"Error reading email timestamp: {e}")
         return 0.0
@@ -4283,12 +8271,56 @@ def comprehensive_outlook_test(self) -> bool:
     return success
 
 class ProfessionalReportGenerator:
+    # Enhanced website patterns
+    WEBSITE_PATTERNS = {
+        # Shopping
+        'ebay': ['ebay.com', 'ebay '],
+        'etsy': ['etsy.com', 'etsy '],
+        'walmart': ['walmart.com', 'walmart '],
+        'target': ['target.com', 'target '],
+        'best_buy': ['best buy', 'bestbuy.com'],
+
+        # Social Media
+        'youtube': ['youtube', 'youtu.be'],
+        'facebook': ['facebook', 'fb.com'],
+        'instagram': ['instagram'],
+        'twitter': ['twitter', 'x.com'],
+        'linkedin': ['linkedin'],
+        'reddit': ['reddit'],
+        'tiktok': ['tiktok'],
+
+        # Entertainment
+        'netflix': ['netflix'],
+        'hulu': ['hulu'],
+        'disney+': ['disney', 'disneyplus'],
+        'twitch': ['twitch'],
+        'spotify': ['spotify'],
+
+        # Gaming
+        'runescape': ['runescape', 'osrs', 'oldschool runescape'],
+        'steam': ['steam'],
+
+        # Productive
+        'google': ['google search', 'google.com'],
+        'gmail': ['gmail', 'mail.google'],
+        'github': ['github'],
+        'stackoverflow': ['stackoverflow', 'stack overflow'],
+    }
+    WEBSITE_BY_PATTERN = {pattern: website for website, patterns in WEBSITE_PATTERNS.items() for pattern in patterns}
+    WEBSITE_MATCHER = KeywordMatcher(WEBSITE_BY_PATTERN)
+
+    BROWSER_ENTRY_MATCHER = KeywordMatcher([
+        'chrome.exe', 'firefox.exe', 'msedge.exe', 'safari.exe',
+        'mozilla firefox', 'google chrome', 'microsoft edge'
+    ])
+
     def __init__(self, config, target_productivity=70):
         self.config = config
         self.target_productivity = target_productivity
         self.logger = logging.getLogger(__name__)
         self.session_tracker = SessionTracker()
         self.system_info_collector = SystemInfoCollector()
+        self._session_tails: Dict[str, LogTailReader] = {}  # Log path -> reader of one date's session lines
 
         self.video_impact_levels = {
             'high': ['youtube', 'netflix', 'hulu', 'disney', 'twitch', 'tiktok', 'facebook', 'instagram'],
@@ -4404,6 +8436,86 @@ Please check the logs for more details.
 ================================================================================
 """
 
+    def generate_period_report(self, rollup: Dict[str, Any],
+                               daily_summaries: Optional[Dict[str, Dict[str, float]]] = None) -> str:
+        """Weekly/monthly summary built from a HistoryRollupIndex rollup - no day files are read
+
+        daily_summaries (from load_daily_summaries) adds a per-day productive/unproductive split
+        for the days whose binary backups recorded minute buckets.
+        """
+        daily_summaries = daily_summaries or {}
+        period_name = "WEEKLY" if rollup.get('period') == "week" else "MONTHLY"
+        categories = rollup.get('category_totals', {})
+        productive_time = categories.get(Category.PRODUCTIVE.value, 0.0)
+        unproductive_time = categories.get(Category.UNPRODUCTIVE.value, 0.0)
+        uncategorized_time = categories.get(Category.UNCATEGORIZED.value, 0.0)
+        background_totals = rollup.get('background_totals', {})
+        verified_totals = rollup.get('verified_totals', {})
+        day_totals = rollup.get('day_totals', {})
+
+        scored_time = productive_time + unproductive_time
+        if scored_time:
+            score = round(productive_time / scored_time * 100)
+            score_display = f"{score}% (target {self.target_productivity}%)"
+        else:
+            score_display = "N/A (no categorized activity)"
+
+        start = datetime.datetime.strptime(rollup['start'], '%Y-%m-%d').strftime('%B %d, %Y')
+        end = datetime.datetime.strptime(rollup['end'], '%Y-%m-%d').strftime('%B %d, %Y')
+        sections = [f"""
+{'=' * 80}
+                    {period_name} PRODUCTIVITY REPORT ({rollup['key']})
+{'=' * 80}
+
+📅 Period:                  {start} - {end}
+📆 Days with activity:      {sum(1 for seconds in day_totals.values() if seconds > 0)}
+📈 Productivity Score:      {score_display}
+
+⏱️  TIME ALLOCATION:
+   Productive:              {self._format_duration(int(productive_time))}
+   Unproductive:            {self._format_duration(int(unproductive_time))}
+   Uncategorized:           {self._format_duration(int(uncategorized_time))}
+   Background Video:        {self._format_duration(int(sum(background_totals.values())))}"""]
+
+        if day_totals:
+            section = f"\n\n📆 DAILY TOTALS\n{'─' * 50}"
+            for day in sorted(day_totals):
+                day_name = datetime.datetime.strptime(day, '%Y-%m-%d').strftime('%a %b %d')
+                section += f"\n   {day_name:<30} {self._format_duration(int(day_totals[day])):>10}"
+                summary = daily_summaries.get(day, {})
+                if Category.PRODUCTIVE.value in summary:
+                    section += (f"  ({self._format_duration(int(summary[Category.PRODUCTIVE.value]))} productive, "
+                                f"{self._format_duration(int(summary.get(Category.UNPRODUCTIVE.value, 0)))} unproductive)")
+            sections.append(section)
+
+        app_totals = rollup.get('app_totals', {})
+        if app_totals:
+            section = f"\n\n💻 TOP APPLICATIONS\n{'─' * 50}"
+            for i, (app_name, seconds) in enumerate(sorted(app_totals.items(), key=lambda x: x[1], reverse=True)[:10], 1):
+                section += f"\n   {i}. {app_name:<30} {self._format_duration(int(seconds)):>10}"
+            sections.append(section)
+
+        title_totals = rollup.get('title_totals', {})
+        if title_totals:
+            section = f"\n\n🏷️  TOP TITLES\n{'─' * 50}"
+            top_titles = sorted(title_totals.items(), key=lambda x: x[1], reverse=True)[:self.config.ROLLUP_TOP_TITLES]
+            for i, (title, seconds) in enumerate(top_titles, 1):
+                display_title = AppNameCleaner.clean_all_exe_from_text(title)
+                display_title = display_title if len(display_title) <= 50 else display_title[:47] + "..."
+                section += f"\n   {i:>2}. {display_title:<50} {self._format_duration(int(seconds)):>10}"
+            sections.append(section)
+
+        if background_totals:
+            section = f"\n\n📺 BACKGROUND VIDEO\n{'─' * 50}"
+            for site, seconds in sorted(background_totals.items(), key=lambda x: x[1], reverse=True):
+                playing = verified_totals.get(site, 0)
+                playing_text = f", {self._format_duration(int(playing))} playing" if playing else ""
+                section += f"\n   {site:<25} {self._format_duration(int(seconds)):>8}{playing_text}"
+            sections.append(section)
+
+        sections.append(f"\n\n{'=' * 80}\n")
+        return AppNameCleaner.clean_all_exe_from_text("".join(sections))
+
     def _generate_uncategorized_websites_section_cleaned(self, uncategorized_apps: Dict[str, int]) -> str:
         """CLEANED: Generate section for uncategorized websites with better title extraction"""
         
@@ -4959,17 +9071,21 @@ Report generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             recent_events = self.activity_logger.get_recent_login_logout_events()
             all_events.extend(recent_events)
         
-        # Method 2: Read from activity log file
+        # Method 2: Read the date's session events from the database, the event log, or the text log written
+        # before it existed - the tail reader only reads lines appended since the previous report
         try:
-            if os.path.exists(self.config.ACTIVITY_LOG):
-                with open(self.config.ACTIVITY_LOG, "r", encoding="utf-8") as f:
-                    content = f.read()
-                    for line in content.split('\n'):
-                        if any(keyword in line.lower() for keyword in [
-                            "user logged in", "user logged out", 
-                            "system startup detected", "system shutdown detected"
-                        ]):
-                            all_events.append(line.strip())
+            events_log = self.config.ACTIVITY_EVENTS_LOG
+            if self.config.PERSISTENCE_BACKEND == "sqlite":
+                store = SQLiteTrackingStore.for_path(self.config.SQLITE_DB_FILE)
+                for ts, event in store.session_events_for_day(report_date):
+                    line = self._parse_session_line(
+                        f"[{datetime.datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S')}] {event}")
+                    if line:
+                        all_events.append(line)
+            elif self.config.ENABLE_EVENT_LOG and (os.path.exists(events_log) or DateIndexedLog.for_path(events_log).segments):
+                all_events.extend(self._session_tail(events_log, self._parse_session_event).read(report_date))
+            elif os.path.exists(self.config.ACTIVITY_LOG) or DateIndexedLog.for_path(self.config.ACTIVITY_LOG).segments:
+                all_events.extend(self._session_tail(self.config.ACTIVITY_LOG, self._parse_session_line).read(report_date))
         except Exception as e:
             self.logger.error(f"Error reading login/logout events from file: {e}")
 
@@ -4983,6 +9099,25 @@ Report generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
         return unique_events
 
+    def _session_tail(self, log_path: str, parse: Callable[[str], Optional[str]]) -> LogTailReader:
+        if log_path not in self._session_tails:
+            self._session_tails[log_path] = LogTailReader(log_path, parse)
+        return self._session_tails[log_path]
+
+    @staticmethod
+    def _parse_session_event(line: str) -> Optional[str]:
+        event = ActivityEvent.parse_line(line, {ActivityEventType.SESSION})
+        return event.log_line() if event and event.kind in ActivityEvent.SESSION_KINDS else None
+
+    @staticmethod
+    def _parse_session_line(line: str) -> Optional[str]:
+        if any(keyword in line.lower() for keyword in [
+            "user logged in", "user logged out",
+            "system startup detected", "system shutdown detected"
+        ]):
+            return line.strip()
+        return None
+
     def _classify_video_impact(self, site: str) -> str:
         site_lower = site.lower()
 
@@ -5018,13 +9153,7 @@ Report generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         return website_data
 
     def _is_browser_entry(self, app_title: str) -> bool:
-        browser_indicators = [
-            'chrome.exe', 'firefox.exe', 'msedge.exe', 'safari.exe',
-            'mozilla firefox', 'google chrome', 'microsoft edge'
-        ]
-
-        title_lower = app_title.lower()
-        return any(indicator in title_lower for indicator in browser_indicators)
+        return self.BROWSER_ENTRY_MATCHER.matches_any(app_title.lower())
 
     def _extract_browser_from_app_title(self, app_title: str) -> str:
         title_lower = app_title.lower()
@@ -5074,53 +9203,10 @@ Report generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         if 'amazon.com' in title_lower:
             return 'Amazon Shopping'
         
-        # Enhanced website patterns
-        website_patterns = {
-            # Shopping
-            'ebay': ['ebay.com', 'ebay '],
-            'etsy': ['etsy.com', 'etsy '],
-            'walmart': ['walmart.com', 'walmart '],
-            'target': ['target.com', 'target '],
-            'best_buy': ['best buy', 'bestbuy.com'],
-            
-            # Social Media
-            'youtube': ['youtube', 'youtu.be'],
-            'facebook': ['facebook', 'fb.com'],
-            'instagram': ['instagram'],
-            'twitter': ['twitter', 'x.com'],
-            'linkedin': ['linkedin'],
-            'reddit': ['reddit'],
-            'tiktok': ['tiktok'],
-            
-            # Entertainment
-            'netflix': ['netflix'],
-            'hulu': ['hulu'],
-            'disney+': ['disney', 'disneyplus'],
-            'twitch': ['twitch'],
-            'spotify': ['spotify'],
-            
-            # Gaming
-            'runescape': ['runescape', 'osrs', 'oldschool runescape'],
-            'steam': ['steam'],
-            
-            # Productive
-            'google': ['google search', 'google.com'],
-            'gmail': ['gmail', 'mail.google'],
-            'github': ['github'],
-            'stackoverflow': ['stackoverflow', 'stack overflow'],
-        }
-
-        for website, patterns in website_patterns.items():
-            for pattern in patterns:
-                if pattern in title_lower:
-                    return self.format_website_name(website)
-
-        title_lower = title.lower()
-
-        for website, patterns in website_patterns.items():
-            for pattern in patterns:
-                if pattern in title_lower:
-                    return self.format_website_name(website)
+        # Single pass over the title; the first website in WEBSITE_PATTERNS order wins
+        pattern = self.WEBSITE_MATCHER.first_in_order(title_lower)
+        if pattern:
+            return self.format_website_name(self.WEBSITE_BY_PATTERN[pattern])
 
         if ' - ' in title:
             parts = title.split(' - ')
@@ -5421,8 +9507,16 @@ class ActivityMonitor:
         self.activity_logger = CompleteEnhancedActivityLogger(self.config)
         self.session_tracker = ChainedSessionTracker()
         
-        # Initialize persistence manager
+        # Initialize persistence manager - saves are handed to the writer thread as snapshots
         self.persistence = CompleteEnhancedProductivityDataPersistence(self.config)
+        self.persistence_writer = PersistenceWriter(self.persistence)
+
+        # Tracker change versions seen by the last save / render / verification - idle loops skip all three
+        self._saved_version: Optional[Tuple[int, int]] = None
+        self._rendered_signature: Optional[Tuple[Any, ...]] = None
+        self._verified_version: Optional[Tuple[int, int]] = None
+        self.skip_stats = {'saves': 0, 'saves_skipped': 0, 'renders': 0, 'renders_skipped': 0,
+                           'verifications': 0, 'verifications_skipped': 0}
         
         # Use improved login/logout poller
         self.login_logout_poller = None
@@ -5452,6 +9546,9 @@ class ActivityMonitor:
         
         self.tracker: Optional[ForegroundTracker] = None
         self.background_video_tracker: Optional[BackgroundVideoTracker] = None
+        self.window_snapshots: Optional[WindowSnapshotService] = None
+        self.day_rollover: Optional[DayRolloverManager] = None
+        self.log_flusher: Optional[ActivityLogFlusher] = None
         self.reporter = ActivityReporter(self.config, self.activity_logger)
         self.report_generator = ProfessionalReportGenerator(self.config)
         
@@ -5466,35 +9563,34 @@ class ActivityMonitor:
     def _load_real_productivity_data(self, target_date: str) -> Optional[ProductivityData]:
         """Load real productivity data from a specific date"""
         try:
-            historical_data = self.persistence.load_historical_data(target_date)
-            
-            if not historical_data:
-                return None
-            
-            app_data = historical_data.get('app_data', {})
-            bg_data = historical_data.get('bg_data', {})
-            
-            app_times = app_data.get('app_times', {}) if app_data else {}
-            background_video_times = bg_data.get('background_video_times', {}) if bg_data else {}
-            verified_playing_times = bg_data.get('verified_playing_times', {}) if bg_data else {}
-            
-            # Categorize the loaded apps
+            # Stream the day's entries straight into their categories - compressed backups are
+            # never inflated into one big app_times dict first
             productive_apps = {}
             unproductive_apps = {}
             uncategorized_apps = {}
+            background_video_times = {}
+            verified_playing_times = {}
+            app_count = 0
             
-            for app, secs in app_times.items():
-                try:
-                    category = AppCategorizer.categorize_app(app)
-                    if category == Category.PRODUCTIVE:
-                        productive_apps[app] = int(secs)
-                    elif category == Category.UNPRODUCTIVE:
-                        unproductive_apps[app] = int(secs)
-                    elif category == Category.UNCATEGORIZED:
-                        uncategorized_apps[app] = int(secs)
-                except Exception as e:
-                    self.activity_logger.debug_log(f"Error categorizing {app}: {e}")
-                    uncategorized_apps[app] = int(secs)
+            for section, key, secs in self.persistence.iter_historical_entries(target_date):
+                if section == 'background':
+                    background_video_times[key] = secs
+                    continue
+                if section == 'verified':
+                    verified_playing_times[key] = secs
+                    continue
+
+                app_count += 1
+                category = AppCategorizer.categorize_many((key,))[key]
+                if category == Category.PRODUCTIVE:
+                    productive_apps[key] = int(secs)
+                elif category == Category.UNPRODUCTIVE:
+                    unproductive_apps[key] = int(secs)
+                elif category == Category.UNCATEGORIZED:
+                    uncategorized_apps[key] = int(secs)
+
+            if not app_count and not background_video_times:
+                return None
             
             # Calculate totals
             productive_time = sum(productive_apps.values())
@@ -5511,7 +9607,7 @@ class ActivityMonitor:
             self.activity_logger.debug_log(f"   Productive: {self._format_duration(productive_time)}")
             self.activity_logger.debug_log(f"   Unproductive: {self._format_duration(unproductive_time)}")
             self.activity_logger.debug_log(f"   Background video: {self._format_duration(background_video_time)}")
-            self.activity_logger.debug_log(f"   Total apps: {len(app_times)}")
+            self.activity_logger.debug_log(f"   Total apps: {app_count}")
             
             return ProductivityData(
                 productive_time=productive_time,
@@ -5646,7 +9742,7 @@ class ActivityMonitor:
                 if self.login_logout_poller.initialization_success:
                     status = self.login_logout_poller.get_status()
                     self.activity_logger.debug_log(f"Login/logout detection ready - Status: {status}")
-                    self.activity_logger.buffer_login_logout_event("System startup detected - monitoring started")
+                    self.activity_logger.buffer_login_logout_event("System startup detected - monitoring started", "startup")
                 else:
                     self.activity_logger.debug_log("Login/logout detection failed to initialize")
                     self.wmi_initialization_failed = True
@@ -5680,7 +9776,10 @@ class ActivityMonitor:
 
     def _perform_shutdown_tasks(self):
         """Enhanced shutdown with data persistence"""
-        self.activity_logger.buffer_login_logout_event("System shutdown detected")
+        self.activity_logger.buffer_login_logout_event("System shutdown detected", "shutdown")
+
+        if self.day_rollover:
+            self.day_rollover.stop()
         
         if self.tracker:
             self.tracker.stop()
@@ -5690,12 +9789,20 @@ class ActivityMonitor:
         if self.background_video_tracker:
             self.background_video_tracker.stop()
 
-        # Save data before generating final report
-        self.persistence.save_tracking_data(self.tracker, self.background_video_tracker)
+        if self.window_snapshots:
+            self.window_snapshots.stop()
+
+        # Save data before generating final report - block until it is on disk
+        self.persistence_writer.submit(self.persistence.capture_snapshot(self.tracker, self.background_video_tracker))
+        self.persistence_writer.flush()
 
         self.generate_and_email_daily_report()
-        self.activity_logger.buffer_login_logout_event("System logout or shutdown detected. Final productivity report emailed.")
-        self.activity_logger.flush_buffer()
+        self.activity_logger.buffer_login_logout_event("System logout or shutdown detected. Final productivity report emailed.",
+                                                       "final_report")
+        if self.log_flusher:
+            self.log_flusher.stop()
+        else:
+            self.activity_logger.flush_buffer()
 
         self.activity_logger.debug_log("Graceful shutdown completed - activity logged and data saved.")
 
@@ -5706,8 +9813,14 @@ class ActivityMonitor:
         self.activity_logger.debug_log("Activity monitor started with data persistence.")
 
         # Start core tracking immediately
+        self.window_snapshots = WindowSnapshotService.shared()
+        self.window_snapshots.interval = self.config.SLEEP_INTERVAL
+        # Event-driven tracking needs no per-second enumeration - snapshots follow foreground changes
+        self.window_snapshots.on_demand = self.config.FOREGROUND_TRACKING_MODE == "event"
+        self.window_snapshots.start()
+
         self.tracker = ForegroundTracker(self.config, self.activity_logger)
-        self.background_video_tracker = BackgroundVideoTracker(self.config, self.activity_logger)
+        self.background_video_tracker = BackgroundVideoTracker(self.config, self.activity_logger, self.window_snapshots)
         
         self.tracker.start()
         self.background_video_tracker.start()
@@ -5719,6 +9832,15 @@ class ActivityMonitor:
         # Verify loaded data
         verification = self.persistence.verify_loaded_data(self.tracker, self.background_video_tracker)
         self.activity_logger.debug_log(f"📊 Data verification: {verification}")
+        self._saved_version = self._verified_version = self._tracking_version()  # Disk already holds this
+        self.persistence_writer.start()
+        if self.config.ENABLE_DAY_ROLLOVER:
+            self.day_rollover = DayRolloverManager(self.tracker, self.background_video_tracker, self.persistence_writer)
+            self.day_rollover.start()
+        self.log_flusher = ActivityLogFlusher(self.activity_logger)
+        self.log_flusher.start()
+        if self.config.SCHEMA_BULK_MIGRATION:
+            SchemaMigrator(self.persistence, self.config.SCHEMA_MIGRATION_WORKERS).start()
 
         # Start improved WMI initialization in parallel
         wmi_thread = self._initialize_wmi_parallel()
@@ -5788,13 +9910,21 @@ class ActivityMonitor:
                     # Periodically save tracking data to disk
                     current_time = time.time()
                     if current_time - last_save_time >= save_interval:
-                        self.persistence.save_tracking_data(self.tracker, self.background_video_tracker)
+                        self._save_if_changed()
                         last_save_time = current_time
 
                    # Periodically verify data integrity AND cleanup old backups (every hour)
                     if loop_count % 60 == 0:  # Every hour
-                        verification = self.persistence.verify_loaded_data(self.tracker, self.background_video_tracker)
-                        self.activity_logger.debug_log(f"🔍 Hourly verification: {verification}")
+                        self._verify_if_changed()
+                        self.activity_logger.debug_log(f"💾 Persistence writer: {self.persistence_writer.get_stats()}")
+                        if self.persistence.rollups:
+                            self.activity_logger.debug_log(f"🗂️ Rollups: {self.persistence.rollups.get_stats()}")
+                        if self.activity_logger.log_queue_handler:
+                            self.activity_logger.debug_log(f"🪵 Log queue: {self.activity_logger.log_queue_handler.get_stats()}")
+                        self.activity_logger.debug_log(f"📝 Activity log buffer: {self.activity_logger.get_buffer_stats()}")
+                        for log_index in self.activity_logger.log_indexes:
+                            self.activity_logger.debug_log(f"📑 Log index {os.path.basename(log_index.log_path)}: {log_index.get_stats()}")
+                        self.activity_logger.debug_log(f"💤 Skipped while idle: {dict(self.skip_stats, activity_log_passes_skipped=self.reporter.passes_skipped)}")
                         
                         # Clean up old dated backups every 24 hours
                         if loop_count % 1440 == 0:  # Every 24 hours
@@ -5830,14 +9960,22 @@ class ActivityMonitor:
         except Exception as e:
             self.activity_logger.debug_log(f"Unexpected error in main loop: {e}")
         finally:
-            # Final save before shutdown
-            self.persistence.save_tracking_data(self.tracker, self.background_video_tracker)
+            if self.day_rollover:
+                self.day_rollover.stop()
+
+            # Final save before shutdown - stop() flushes before the thread exits
+            self.persistence_writer.submit(self.persistence.capture_snapshot(self.tracker, self.background_video_tracker))
+            self.persistence_writer.stop()
             
             self.running = False
             if self.tracker:
                 self.tracker.stop()
             if self.background_video_tracker:
                 self.background_video_tracker.stop()
+            if self.window_snapshots:
+                self.window_snapshots.stop()
+            if self.log_flusher:
+                self.log_flusher.stop()  # Writes the lines the trackers buffered while stopping
             
             # Clean up WMI connection
             if self.login_logout_poller and hasattr(self.login_logout_poller, 'wmi_connection'):
@@ -5856,9 +9994,9 @@ class ActivityMonitor:
                 timestamp = getattr(event, 'TimeGenerated', 'Unknown time')
                 if hasattr(event, 'EventCode'):
                     if event.EventCode == 4624:
-                        self.activity_logger.buffer_login_logout_event(f"User logged in at {timestamp}")
+                        self.activity_logger.buffer_login_logout_event(f"User logged in at {timestamp}", "login")
                     elif event.EventCode == 4634:
-                        self.activity_logger.buffer_login_logout_event(f"User logged out at {timestamp}")
+                        self.activity_logger.buffer_login_logout_event(f"User logged out at {timestamp}", "logout")
             
             if events:
                 self.activity_logger.flush_buffer()
@@ -5875,53 +10013,122 @@ class ActivityMonitor:
         except Exception as e:
             self.activity_logger.debug_log(f"Error in login/logout polling: {e}")
 
+    def _tracking_version(self) -> Tuple[int, int]:
+        """(foreground, background) change versions - equal versions mean no counter moved"""
+        return (self.tracker.change_version if self.tracker else 0,
+                self.background_video_tracker.change_version if self.background_video_tracker else 0)
+
+    def _report_signature(self) -> Tuple[Any, ...]:
+        """Everything the local report depends on that can change while the monitor runs"""
+        return (datetime.datetime.now().strftime('%Y-%m-%d'), self._tracking_version(),
+                len(self.activity_logger.login_logout_events))
+
+    def _save_if_changed(self):
+        """Hand a snapshot to the writer unless nothing changed since the last save"""
+        version = self._tracking_version()
+        if version == self._saved_version:
+            self.skip_stats['saves_skipped'] += 1
+            return
+        self.persistence_writer.submit(self.persistence.capture_snapshot(self.tracker, self.background_video_tracker))
+        self._saved_version = version
+        self.skip_stats['saves'] += 1
+
+    def _verify_if_changed(self):
+        version = self._tracking_version()
+        if version == self._verified_version:
+            self.skip_stats['verifications_skipped'] += 1
+            return
+        verification = self.persistence.verify_loaded_data(self.tracker, self.background_video_tracker)
+        self.activity_logger.debug_log(f"🔍 Hourly verification: {verification}")
+        self._verified_version = version
+        self.skip_stats['verifications'] += 1
+
     def generate_daily_report(self):
-        """Generate daily report and save locally (no emailing)"""
+        """Generate daily report and save locally (no emailing) - skipped when nothing changed"""
+        signature = self._report_signature()
+        if signature == self._rendered_signature:
+            self.skip_stats['renders_skipped'] += 1
+            return
+
         productivity_data = self._collect_productivity_data()
 
         report_content = self.report_generator.generate_daily_report(productivity_data)
         report_path = self.report_generator.save_report_to_file(report_content, productivity_data.date)
+        self._rendered_signature = signature
+        self.skip_stats['renders'] += 1
         self.activity_logger.debug_log(f"Daily report generated and saved to: {report_path}")
 
     def generate_and_email_daily_report(self) -> bool:
         """Generate daily report and email it"""
+        signature = self._report_signature()
         productivity_data = self._collect_productivity_data()
 
         report_content = self.report_generator.generate_daily_report(productivity_data)
         report_path = self.report_generator.save_report_to_file(report_content, productivity_data.date)
+        self._rendered_signature = signature
         self.activity_logger.debug_log(f"Daily report generated and saved to: {report_path}")
 
+        if self.config_manager.is_friday_only_enabled() and self.persistence.rollups:
+            # Friday-only mode mails the week so far - one rollup read plus today's counters
+            weekly_path = self.generate_period_report("week", productivity_data)
+            if weekly_path:
+                return self.email_manager.send_email_with_timing_update(
+                    "Weekly Productivity Report",
+                    "Attached is the weekly productivity report.",
+                    weekly_path
+                )
+
         return self.email_manager.send_email_with_timing_update(
             "Daily Productivity Report",
             "Attached is the daily productivity report.",
             report_path
         )
 
+    def generate_period_report(self, period: str, productivity_data: Optional[ProductivityData] = None) -> Optional[str]:
+        """Write the weekly or monthly report for the current period; returns the report path"""
+        try:
+            today = datetime.datetime.now().strftime('%Y-%m-%d')
+            app_times = self.tracker.get_app_times() if self.tracker else {}
+            bg_video_times = productivity_data.background_video_apps if productivity_data else {}
+            verified_times = productivity_data.verified_playing_apps if productivity_data else {}
+
+            rollup = self.persistence.rollups.get_with_live(period, today, app_times, bg_video_times, verified_times)
+
+            # Binary backups carry per-minute category buckets, read without decoding any title
+            daily_summaries = {}
+            closed_days = sorted(day for day in rollup['days'] if day != today)
+            if self.config.DATED_BACKUP_FORMAT == "binary" and not self.persistence.store and closed_days:
+                daily_summaries = self.persistence.load_daily_summaries(closed_days[0], closed_days[-1])
+
+            report_content = self.report_generator.generate_period_report(rollup, daily_summaries)
+            report_path = self.report_generator.save_report_to_file(report_content, f"{period}_{rollup['key']}")
+            self.activity_logger.debug_log(f"{period.capitalize()} report generated and saved to: {report_path}")
+            return report_path
+        except Exception as e:
+            self.activity_logger.debug_log(f"Error generating {period} report: {e}")
+            return None
+
     def _collect_productivity_data(self) -> ProductivityData:
         """UPDATED: Collect all productivity data including uncategorized websites and background video time"""
         
         try:
             app_times = self.tracker.get_app_times()
             
-            # Safely categorize apps with error handling
+            # Safely categorize apps - categorize_many() defaults failures to uncategorized
             productive_apps = {}
             unproductive_apps = {}
             uncategorized_apps = {}
+            categories = AppCategorizer.categorize_many(app_times)
             
             for app, secs in app_times.items():
-                try:
-                    category = AppCategorizer.categorize_app(app)
-                    if category == Category.PRODUCTIVE:
-                        productive_apps[app] = secs
-                    elif category == Category.UNPRODUCTIVE:
-                        unproductive_apps[app] = secs
-                    elif category == Category.UNCATEGORIZED:
-                        uncategorized_apps[app] = secs
-                    # category == None is ignored (system apps, etc.)
-                except Exception as e:
-                    self.logger.warning(f"Error categorizing app '{app}': {e}")
-                    # Default uncategorized if categorization fails
+                category = categories[app]
+                if category == Category.PRODUCTIVE:
+                    productive_apps[app] = secs
+                elif category == Category.UNPRODUCTIVE:
+                    unproductive_apps[app] = secs
+                elif category == Category.UNCATEGORIZED:
                     uncategorized_apps[app] = secs
+                # category == None is ignored (system apps, etc.)
 
             productive_time = sum(productive_apps.values())
             unproductive_time = sum(unproductive_apps.values())
@@ -6426,7 +10633,9 @@ def test_complete_enhanced_system():
         
         # Check dated backups
         if config.ENABLE_DATED_BACKUPS and os.path.exists(persistence.dated_backup_dir):
-            backup_files = glob.glob(os.path.join(persistence.dated_backup_dir, "*.json"))
+            backup_files = (glob.glob(os.path.join(persistence.dated_backup_dir, "*.json")) +
+                            glob.glob(os.path.join(persistence.dated_backup_dir, "*.bin")) +
+                            glob.glob(os.path.join(persistence.dated_backup_dir, "*.jsonl.gz")))
             print(f"   Dated backups: {len(backup_files)} files")
         else:
             print(f"   Dated backups: Directory not created")
@@ -0,0 +1,4 @@
+"""Headless benchmarks for the categorization and title-parsing hot paths.
+
+Run with ``python -m benchmarks.run_benchmarks`` from the repository root.
+"""
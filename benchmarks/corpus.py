@@ -0,0 +1,118 @@
+"""Synthetic window-title corpus shaped like the keys ForegroundTracker records"""
+
+import random
+from typing import Dict, List, Tuple
+
+BROWSERS = [
+    ('chrome.exe', 'Google Chrome'),
+    ('firefox.exe', 'Mozilla Firefox'),
+    ('msedge.exe', 'Microsoft Edge'),
+]
+
+WEBSITES = [
+    ('YouTube', ['{topic} - YouTube', '({n}) {topic} - YouTube']),
+    ('GitHub', ['Pull Request #{n} · acme/{project} - GitHub', 'Issue #{n}: {topic} · acme/{project}']),
+    ('Stack Overflow', ['python - {topic} - Stack Overflow']),
+    ('Gmail', ['Inbox ({n}) - user@example.com - Gmail']),
+    ('Reddit', ['{topic} : r/{project}']),
+    ('Amazon', ['Amazon.com: {topic} : Electronics']),
+    ('Netflix', ['{topic} | Netflix']),
+    ('Jira', ['[{project_upper}-{n}] {topic} - Jira']),
+    ('Google Search', ['{topic} - Google Search']),
+    ('Docs', ['{topic} - Google Docs']),
+    ('News', ['{topic} | Example News']),
+]
+
+OFFICE = [
+    ('winword.exe', '{topic} {n}.docx - Word'),
+    ('excel.exe', 'Budget {project} Q{q}.xlsx - Excel'),
+    ('powerpnt.exe', '{topic} review {n}.pptx - PowerPoint'),
+    ('olk.exe', 'Inbox - {n} unread - Outlook'),
+]
+
+IDES = [
+    ('code.exe', '{project}_{n}.py - {project} - Visual Studio Code'),
+    ('devenv.exe', '{project} ({n}) - Microsoft Visual Studio'),
+    ('pycharm64.exe', '{project} – {topic}_{n}.py'),
+    ('notepad++.exe', '*C:\\work\\{project}\\notes_{n}.txt - Notepad++'),
+]
+
+CHAT = [
+    ('ms-teams.exe', 'Chat | {topic} {n} | Microsoft Teams'),
+    ('slack.exe', '#{project}-{n} - Acme - Slack'),
+    ('discord.exe', '#{project}-{n} | {topic} - Discord'),
+]
+
+GAMES = [
+    ('steam.exe', 'Steam - {topic} {n}'),
+    ('osclient.exe', 'Old School RuneScape - World {n}'),
+    ('minecraft.exe', 'Minecraft {q}.{n} - Multiplayer'),
+]
+
+SYSTEM = [
+    ('explorer.exe', '{project} {n} - File Explorer'),
+    ('taskmgr.exe', 'Task Manager'),
+]
+
+WORDS = [
+    'quarterly', 'roadmap', 'migration', 'lofi', 'beats', 'refactor', 'invoice', 'design',
+    'kubernetes', 'holiday', 'playlist', 'review', 'budget', 'release', 'notes', 'python',
+    'headphones', 'tutorial', 'standup', 'retro', 'trailer', 'recipe', 'benchmark', 'parser',
+]
+
+PROJECTS = ['atlas', 'borealis', 'cobalt', 'dynamo', 'ember', 'falcon', 'granite', 'helix']
+
+# Rough share of each title family in a typical office workday
+FAMILY_WEIGHTS = [('browser', 45), ('office', 20), ('ide', 15), ('chat', 10), ('game', 5), ('system', 5)]
+
+
+def _fill(template: str, rng: random.Random, n: int) -> str:
+    project = rng.choice(PROJECTS)
+    return template.format(
+        topic=' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))).title(),
+        project=project,
+        project_upper=project.upper()[:4],
+        n=n,
+        q=rng.randint(1, 4),
+    )
+
+
+def generate_corpus(count: int, seed: int = 1234) -> List[Tuple[str, str, str]]:
+    """Return `count` unique (process_name, window_title, app_key) triples
+
+    app_key follows SystemMonitor.format_app_key, i.e. "<clean app name> - <title>".
+    """
+    from activity_monitor import SystemMonitor
+
+    rng = random.Random(seed)
+    families = [family for family, _ in FAMILY_WEIGHTS]
+    weights = [weight for _, weight in FAMILY_WEIGHTS]
+
+    corpus = []
+    seen = set()
+    n = 0
+    while len(corpus) < count:
+        n += 1
+        family = rng.choices(families, weights)[0]
+        if family == 'browser':
+            process_name, browser_name = rng.choice(BROWSERS)
+            _, templates = rng.choice(WEBSITES)
+            title = f"{_fill(rng.choice(templates), rng, n)} - {browser_name}"
+        else:
+            pool = {'office': OFFICE, 'ide': IDES, 'chat': CHAT, 'game': GAMES, 'system': SYSTEM}[family]
+            process_name, template = rng.choice(pool)
+            title = _fill(template, rng, n)
+
+        key = SystemMonitor.format_app_key(process_name, title)
+        if key in seen:
+            continue
+        seen.add(key)
+        corpus.append((process_name, title, key))
+
+    return corpus
+
+
+def generate_app_times(corpus: List[Tuple[str, str, str]], seed: int = 1234) -> Dict[str, int]:
+    """Seconds per app key, long-tailed like a real day's app_times"""
+    rng = random.Random(seed)
+    return {key: max(1, int(rng.paretovariate(1.2) * 10)) for _, _, key in corpus}
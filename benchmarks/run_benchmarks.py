@@ -0,0 +1,210 @@
+"""Time the categorization and title-parsing hot paths over synthetic corpora
+
+    python -m benchmarks.run_benchmarks                       # 1k / 10k / 100k titles
+    python -m benchmarks.run_benchmarks --sizes 1000 --output before.json
+    python -m benchmarks.run_benchmarks --output after.json --compare before.json
+
+Each benchmark reports ops/sec (best of --repeat passes over the corpus) and the
+allocations made during one pass, measured separately with tracemalloc so tracing
+does not skew the timings.
+"""
+
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import activity_monitor  # noqa: E402
+from activity_monitor import AppCategorizer, AppNameCleaner, CompleteEnhancedConfig, ProfessionalReportGenerator  # noqa: E402
+from benchmarks.corpus import generate_app_times, generate_corpus  # noqa: E402
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+REGRESSION_THRESHOLD = 0.10  # Flag anything more than 10% slower than the baseline
+
+
+def _build_cases(corpus: List[Tuple[str, str, str]], report_generator) -> List[Tuple[str, Callable[[], None], Callable[[], None], int]]:
+    """(name, setup, one pass over the corpus, ops per pass) for every benchmark"""
+    process_names = [process_name for process_name, _, _ in corpus]
+    keys = [key for _, _, key in corpus]
+    browser_keys = [key for key in keys if report_generator._is_browser_entry(key)] or keys
+    app_times = generate_app_times(corpus)
+
+    def no_setup():
+        pass
+
+    def categorize_cold():
+        for key in keys:
+            AppCategorizer._categorize_uncached(key)
+
+    def categorize_warm_setup():
+        AppCategorizer.invalidate_cache()
+        AppCategorizer.CACHE_MAX_SIZE = max(AppCategorizer.CACHE_MAX_SIZE, len(keys))
+        AppCategorizer.categorize_many(keys)
+
+    def categorize_warm():
+        for key in keys:
+            AppCategorizer.categorize_app(key)
+
+    def clean_app_name():
+        for process_name in process_names:
+            AppNameCleaner.clean_app_name(process_name)
+
+    def clean_app_base_name():
+        for key in keys:
+            AppNameCleaner.clean_app_base_name(key)
+
+    def clean_all_exe_from_text():
+        for process_name, title, _ in corpus:
+            AppNameCleaner.clean_all_exe_from_text(f"{process_name} - {title}")
+
+    def extract_website_from_title():
+        for key in browser_keys:
+            report_generator.extract_website_from_title(key)
+
+    def extract_clean_website_name():
+        for key in browser_keys:
+            report_generator._extract_clean_website_name(key)
+
+    def aggregate_website_data():
+        report_generator._aggregate_website_data(app_times)
+
+    return [
+        ("categorize_app (uncached)", no_setup, categorize_cold, len(keys)),
+        ("categorize_app (cached)", categorize_warm_setup, categorize_warm, len(keys)),
+        ("clean_app_name", no_setup, clean_app_name, len(process_names)),
+        ("clean_app_base_name", no_setup, clean_app_base_name, len(keys)),
+        ("clean_all_exe_from_text", no_setup, clean_all_exe_from_text, len(corpus)),
+        ("extract_website_from_title", no_setup, extract_website_from_title, len(browser_keys)),
+        ("_extract_clean_website_name", no_setup, extract_clean_website_name, len(browser_keys)),
+        ("_aggregate_website_data", no_setup, aggregate_website_data, len(app_times)),
+    ]
+
+
+def _time_case(run: Callable[[], None], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _measure_allocations(run: Callable[[], None]) -> Tuple[int, int]:
+    """(peak bytes, allocated blocks still alive) during one traced pass"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    run()
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename') if stat.count_diff > 0)
+    return peak, blocks
+
+
+def run_benchmarks(sizes: List[int], repeat: int = 3, seed: int = 1234) -> Dict[str, Any]:
+    # Keep the default logs/ folder out of the working directory
+    report_generator = ProfessionalReportGenerator(CompleteEnhancedConfig(LOG_DIR=tempfile.mkdtemp(prefix="am_bench_")))
+    original_cache_size = AppCategorizer.CACHE_MAX_SIZE
+    results: Dict[str, Any] = {
+        'meta': {
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'win32_available': activity_monitor.WIN32_AVAILABLE,
+            'repeat': repeat,
+            'seed': seed,
+        },
+        'benchmarks': {}
+    }
+
+    for size in sizes:
+        print(f"\n📊 Corpus: {size:,} unique titles")
+        corpus = generate_corpus(size, seed=seed)
+
+        for name, setup, run, ops in _build_cases(corpus, report_generator):
+            setup()
+            seconds = _time_case(run, repeat)
+            peak_bytes, blocks = _measure_allocations(run)
+            ops_per_sec = ops / seconds if seconds > 0 else float('inf')
+
+            results['benchmarks'][f"{name} @ {size}"] = {
+                'function': name,
+                'titles': size,
+                'ops': ops,
+                'seconds': round(seconds, 6),
+                'ops_per_sec': round(ops_per_sec, 1),
+                'us_per_op': round(seconds / ops * 1e6, 3) if ops else 0.0,
+                'peak_alloc_bytes': peak_bytes,
+                'retained_blocks': blocks,
+            }
+            print(f"   {name:<30} {ops_per_sec:>12,.0f} ops/s  {seconds / ops * 1e6:>8.2f} µs/op  "
+                  f"peak {peak_bytes / 1024:>9.1f} KB")
+
+    AppCategorizer.CACHE_MAX_SIZE = original_cache_size
+    AppCategorizer.invalidate_cache()
+    return results
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any],
+                    threshold: float = REGRESSION_THRESHOLD) -> List[str]:
+    """Print a side-by-side ops/sec comparison and return the names that regressed"""
+    regressions = []
+    print(f"\n🔍 Comparison against baseline from {baseline.get('meta', {}).get('timestamp', 'unknown')}")
+    for name, result in current['benchmarks'].items():
+        previous = baseline.get('benchmarks', {}).get(name)
+        if not previous:
+            print(f"   {name:<45} (new)")
+            continue
+
+        ratio = result['ops_per_sec'] / previous['ops_per_sec'] if previous['ops_per_sec'] else float('inf')
+        marker = "✅"
+        if ratio < 1 - threshold:
+            marker = "❌"
+            regressions.append(name)
+        elif ratio > 1 + threshold:
+            marker = "🚀"
+        print(f"   {marker} {name:<45} {previous['ops_per_sec']:>12,.0f} -> {result['ops_per_sec']:>12,.0f} ops/s ({ratio:.2f}x)")
+
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark categorization and title-parsing hot paths")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="Unique titles per corpus")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed passes per benchmark (best is kept)")
+    parser.add_argument('--seed', type=int, default=1234, help="Corpus generator seed")
+    parser.add_argument('--output', help="Write JSON results to this file")
+    parser.add_argument('--compare', help="Baseline JSON results to compare against")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="Relative slowdown reported as a regression")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, repeat=args.repeat, seed=args.seed)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare_results(results, baseline, args.threshold):
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
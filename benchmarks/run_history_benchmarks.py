@@ -0,0 +1,159 @@
+"""Compare dated-backup formats: on-disk size and multi-day history scan times
+
+    python -m benchmarks.run_history_benchmarks                   # 30 and 365 days
+    python -m benchmarks.run_history_benchmarks --days 30 --apps 5000 --output history.json
+
+The same synthetic days are written in every DATED_BACKUP_FORMAT (legacy pretty-printed
+JSON, compressed JSON lines, binary day files), each to its own temporary logs/ folder.
+Every scan reads the whole range through CompleteEnhancedProductivityDataPersistence, so
+the json rows are the load_historical_data baseline. The rollup rows read the month
+containing the last day from its HistoryRollupIndex file (built on the first pass).
+"""
+
+import argparse
+import datetime
+import glob
+import json
+import os
+import random
+import sys
+import tempfile
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from activity_monitor import (BinaryDayFile, CompleteEnhancedConfig,  # noqa: E402
+                              CompleteEnhancedProductivityDataPersistence)
+from benchmarks.corpus import generate_app_times, generate_corpus  # noqa: E402
+from benchmarks.run_benchmarks import _measure_allocations, _time_case  # noqa: E402
+
+DEFAULT_DAYS = [30, 365]
+FORMATS = ["json", "gzip", "binary"]
+
+
+def _write_history(stores: Dict[str, CompleteEnhancedProductivityDataPersistence],
+                   days: int, apps_per_day: int, seed: int) -> List[str]:
+    """Identical dated backups for `days` days ending yesterday, one folder per format"""
+    rng = random.Random(seed)
+    corpus = generate_corpus(apps_per_day * 3, seed=seed)
+    width = len(BinaryDayFile.BUCKET_CATEGORIES)
+    dates = []
+
+    end = datetime.date.today() - datetime.timedelta(days=1)
+    for offset in range(days - 1, -1, -1):
+        day = (end - datetime.timedelta(days=offset)).isoformat()
+        app_times = generate_app_times(rng.sample(corpus, apps_per_day), seed=rng.randint(0, 1 << 30))
+        bg_video_times = {'YouTube': float(rng.randint(60, 3600))}
+        verified_times = {'YouTube': bg_video_times['YouTube'] / 2}
+        buckets = _workday_buckets(rng, width)
+
+        stores['json']._save_json_dated_backup(day, app_times, bg_video_times, verified_times)
+        stores['gzip']._save_gzip_dated_backup(day, app_times, bg_video_times, verified_times)
+        BinaryDayFile.write(stores['binary']._binary_backup_path(day), day,
+                            app_times, bg_video_times, verified_times, buckets)
+        dates.append(day)
+    return dates
+
+
+def _workday_buckets(rng: random.Random, width: int) -> bytes:
+    """Dense minute buckets for a 7-10 hour workday: stretches of one category, short breaks, idle nights"""
+    buckets = bytearray(BinaryDayFile.MINUTES * width)
+    minute = rng.randint(7 * 60, 10 * 60)
+    end = min(minute + rng.randint(7 * 60, 10 * 60), BinaryDayFile.MINUTES)
+    column = 0
+    while minute < end:
+        if rng.random() < 0.02:
+            minute += rng.randint(5, 45)  # Break
+            continue
+        if rng.random() < 0.1:
+            column = rng.choices(range(width), weights=[6, 3, 1][:width])[0]
+        buckets[minute * width + column] = rng.randint(20, 60)
+        minute += 1
+    return bytes(buckets)
+
+
+def _backup_bytes(persistence: CompleteEnhancedProductivityDataPersistence) -> int:
+    """Size of the current dated backups"""
+    return sum(os.path.getsize(path) for path in glob.glob(os.path.join(persistence.dated_backup_dir, "*")))
+
+
+def _stream_range(persistence: CompleteEnhancedProductivityDataPersistence, dates: List[str]):
+    for day in dates:
+        for _ in persistence.iter_historical_entries(day):
+            pass
+
+
+def run_history_benchmarks(day_counts: List[int], apps_per_day: int = 2000,
+                           repeat: int = 3, seed: int = 1234) -> Dict[str, Any]:
+    results: Dict[str, Any] = {
+        'meta': {
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'apps_per_day': apps_per_day,
+            'repeat': repeat,
+            'seed': seed,
+        },
+        'benchmarks': {}
+    }
+
+    for days in day_counts:
+        stores = {
+            backup_format: CompleteEnhancedProductivityDataPersistence(CompleteEnhancedConfig(
+                LOG_DIR=tempfile.mkdtemp(prefix=f"am_history_{backup_format}_"), DATED_BACKUP_FORMAT=backup_format))
+            for backup_format in FORMATS
+        }
+        dates = _write_history(stores, days, apps_per_day, seed)
+        start, end = dates[0], dates[-1]
+
+        sizes = {backup_format: _backup_bytes(persistence) for backup_format, persistence in stores.items()}
+        print(f"\n📅 {days} days x {apps_per_day:,} apps: " + ", ".join(
+            f"{backup_format} {size / 1024:,.0f} KB ({size / sizes['json']:.0%})" for backup_format, size in sizes.items()))
+        results['sizes'] = results.get('sizes', {})
+        results['sizes'][f"{days}d"] = sizes
+        if sizes['binary'] > sizes['json']:
+            print("   ❌ binary day files are larger than the JSON backups they replace")
+            results['size_check_failed'] = True
+
+        cases = []
+        for backup_format, persistence in stores.items():
+            cases.extend([
+                (f"load_date_range ({backup_format})", lambda p=persistence: p.load_date_range(start, end)),
+                (f"iter_historical_entries ({backup_format})", lambda p=persistence: _stream_range(p, dates)),
+                (f"load_daily_summaries ({backup_format})", lambda p=persistence: p.load_daily_summaries(start, end)),
+                (f"rollups.get month ({backup_format})", lambda p=persistence: p.rollups.get("month", end)),
+            ])
+        for name, run in cases:
+            seconds = _time_case(run, repeat)
+            peak_bytes, _ = _measure_allocations(run)
+            results['benchmarks'][f"{name} @ {days}d"] = {
+                'function': name,
+                'days': days,
+                'seconds': round(seconds, 6),
+                'ms_per_day': round(seconds / days * 1e3, 3),
+                'peak_alloc_bytes': peak_bytes,
+            }
+            print(f"   {name:<38} {seconds * 1e3:>9.1f} ms  {seconds / days * 1e3:>7.2f} ms/day  "
+                  f"peak {peak_bytes / 1024:>9.1f} KB")
+
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark multi-day history scans")
+    parser.add_argument('--days', type=int, nargs='+', default=DEFAULT_DAYS, help="Days of history per scan")
+    parser.add_argument('--apps', type=int, default=2000, help="Tracked app keys per day")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed passes per benchmark (best is kept)")
+    parser.add_argument('--seed', type=int, default=1234, help="Corpus generator seed")
+    parser.add_argument('--output', help="Write JSON results to this file")
+    args = parser.parse_args(argv)
+
+    results = run_history_benchmarks(args.days, apps_per_day=args.apps, repeat=args.repeat, seed=args.seed)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results saved to {args.output}")
+    return 1 if results.get('size_check_failed') else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())